@@ -0,0 +1,126 @@
+"""
+Run the offline benchmark suite and keep the results per commit.
+
+Runs every component benchmark with --json (each in its own directory and
+interpreter, since the ML client and web app are separate programs), merges
+the results and writes them to benchmarks/results/<commit>.json together with
+the machine and Python version. Pass --compare to print the change against an
+earlier run and flag regressions.
+
+    python benchmarks/run_suite.py                    # run and store
+    python benchmarks/run_suite.py --compare main     # ... and compare with a stored run
+    python benchmarks/run_suite.py --quick            # fewer iterations
+
+--compare takes a commit (short or full hash, branch or tag resolvable by git)
+or a path to a results file.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+# (component directory, script, extra arguments for --quick)
+BENCHMARKS = [
+    ("machine-learning-client", "benchmarks/bench_angles.py", []),
+    ("web-app", "benchmarks/bench_matching.py", []),
+    ("web-app", "benchmarks/bench_gesture_index.py", ["--users", "20000"]),
+    ("web-app", "benchmarks/bench_login_flow.py", ["--requests", "100"]),
+]
+
+
+def git(*args):
+    return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True,
+                          check=True).stdout.strip()
+
+
+def run_benchmarks(quick=False):
+    results = {}
+    for directory, script, quick_args in BENCHMARKS:
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+            path = f.name
+        try:
+            command = [sys.executable, script, "--json", path] + (quick_args if quick else [])
+            print(f"$ (cd {directory} && {' '.join(command[1:])})", flush=True)
+            subprocess.run(command, cwd=os.path.join(ROOT, directory), check=True)
+            with open(path, encoding="utf-8") as f:
+                results.update(json.load(f)["benchmarks"])
+        finally:
+            os.remove(path)
+    return results
+
+
+def resolve_baseline(reference):
+    if os.path.exists(reference):
+        return reference
+    commit = git("rev-parse", "--short", reference)
+    path = os.path.join(RESULTS_DIR, f"{commit}.json")
+    if not os.path.exists(path):
+        raise SystemExit(f"No stored results for {reference} ({path})")
+    return path
+
+
+def compare(current, baseline, threshold):
+    """Print p50/p95/p99 changes; return names whose p95 regressed beyond threshold"""
+    regressions = []
+    for name, stats in sorted(current.items()):
+        base = baseline.get(name)
+        if base is None or base["unit"] != stats["unit"]:
+            print(f"{name:40s} (new)")
+            continue
+        changes = {
+            key: (stats[key] - base[key]) / base[key] if base[key] else 0.0
+            for key in ("p50", "p95", "p99")
+        }
+        flag = ""
+        if changes["p95"] > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:40s} " + "  ".join(f"{key} {change:+7.1%}" for key, change in changes.items())
+              + flag)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--compare", help="baseline commit or results file")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="p95 increase counted as a regression (default 0.10 = 10%%)")
+    parser.add_argument("--quick", action="store_true", help="fewer iterations")
+    parser.add_argument("--no-save", action="store_true", help="do not store the results")
+    args = parser.parse_args()
+
+    commit = git("rev-parse", "--short", "HEAD")
+    dirty = bool(git("status", "--porcelain", "--untracked-files=no"))
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "date": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "quick": args.quick,
+        "benchmarks": run_benchmarks(args.quick),
+    }
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{commit}{'-dirty' if dirty else ''}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Results written to {os.path.relpath(path, ROOT)}")
+
+    if args.compare:
+        with open(resolve_baseline(args.compare), encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\nChange against {baseline['commit']} ({baseline['date']}):")
+        if compare(report["benchmarks"], baseline["benchmarks"], args.threshold):
+            sys.exit(1)
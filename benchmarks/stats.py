@@ -0,0 +1,58 @@
+"""
+Timing helpers shared by the component benchmarks
+(machine-learning-client/benchmarks and web-app/benchmarks), which add this
+directory to sys.path.
+
+Results use one schema across the suite (see run_suite.py):
+    {name: {"unit": "us", "mean": ..., "p50": ..., "p95": ..., "p99": ...,
+            "ops_per_s": ...}}
+"""
+
+import json
+import time
+
+import numpy as np
+
+UNITS = {"s": 1.0, "ms": 1e3, "us": 1e6}
+
+
+def summarize(samples, unit="us"):
+    """Summarize per-operation durations (seconds) in `unit`"""
+    samples = np.asarray(samples, dtype=np.float64)
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99]) * UNITS[unit]
+    mean = samples.mean()
+    return {
+        "unit": unit,
+        "mean": float(mean * UNITS[unit]),
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "ops_per_s": float(1.0 / mean) if mean else 0.0,
+    }
+
+
+def time_calls(function, repeat=200, inner=50, warmup=5, unit="us"):
+    """
+    Time `function()` in `repeat` batches of `inner` calls and summarize the
+    per-call duration of each batch (batches smooth out timer resolution).
+    """
+    for _ in range(warmup):
+        function()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(inner):
+            function()
+        samples.append((time.perf_counter() - started) / inner)
+    return summarize(samples, unit)
+
+
+def write_results(path, results):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"benchmarks": results}, f, indent=2, sort_keys=True)
+
+
+def print_results(results):
+    for name, stats in results.items():
+        print(f"{name:32s} p50 {stats['p50']:9.2f} {stats['unit']}  p95 {stats['p95']:9.2f}  "
+              f"p99 {stats['p99']:9.2f}  {stats['ops_per_s']:12.1f} ops/s")
@@ -1,17 +1,201 @@
-from flask import Flask, jsonify
-from threading import Lock
+import json
+import time
+from collections import deque, namedtuple
+from itertools import count
+from threading import Condition
+
+from flask import Flask, Response, request
 from flask_cors import CORS
 
+import metrics
+
 app = Flask(__name__)
 CORS(app)
-latest_angles = []
-angle_lock = Lock()
+
+# Immutable view of one published frame. `payload` is the JSON body served by
+# /hand-angles, serialized once by the publisher instead of once per request.
+# `age` is how many seconds old the inference behind the angles is (non-zero
+# when the motion gate reused the previous result for a static frame).
+AngleSnapshot = namedtuple(
+    "AngleSnapshot", ["seq", "timestamp", "angles", "hand_present", "age", "payload"]
+)
+
+_seq = count(1)
+
+
+def make_snapshot(seq, angles, timestamp=None, age=0.0):
+    """Build an AngleSnapshot (including its pre-serialized JSON body)"""
+    if timestamp is None:
+        timestamp = time.time()
+    angles = tuple(angles)
+    hand_present = bool(angles) and all(a is not None for a in angles)
+    payload = json.dumps(
+        {
+            "seq": seq,
+            "timestamp": timestamp,
+            "hand_present": int(hand_present),
+            "angles": angles,
+            "age": round(age, 3),
+        }
+    ).encode("utf-8")
+    return AngleSnapshot(seq, timestamp, angles, hand_present, age, payload)
+
+
+# The current snapshot is replaced wholesale on every publish. Rebinding a
+# module global is atomic, so readers never need a lock and never observe a
+# half-written frame.
+_snapshot = make_snapshot(0, ())
+
+# Only used to wake up streaming clients; publishers and pollers never wait on it
+_changed = Condition()
+
+# Seconds between SSE keep-alive comments when no new frame arrives
+STREAM_KEEPALIVE = 15.0
+
+# Recent frames kept for multi-frame login verification (about 2 s at 30 fps)
+RECENT_FRAMES = 60
+_recent = deque(maxlen=RECENT_FRAMES)
+
+# Frames older than this (seconds) are never served by /hand-angles/recent,
+# so a login cannot replay a hand that has since left the camera
+RECENT_MAX_AGE = 2.0
+
+
+def publish_angles(angles, timestamp=None, age=0.0):
+    """
+    Publish a new frame of angles (a list of 10 floats or [None] * 10).
+
+    `age` is the time in seconds since those angles were inferred.
+    """
+    global _snapshot
+    snapshot = make_snapshot(next(_seq), angles, timestamp, age)
+    _snapshot = snapshot
+    # Reused results would only repeat a frame already in the window
+    if snapshot.hand_present and age == 0.0:
+        _recent.append(snapshot)
+    with _changed:
+        _changed.notify_all()
+    return snapshot
+
+
+def latest_snapshot():
+    """Return the most recently published AngleSnapshot"""
+    return _snapshot
+
+
+# Per-source results written by worker processes (see worker_pool); set by
+# attach_sources() when the client runs one worker per video source
+_sources = None
+# Last snapshot built for each source, so a payload is serialized once per frame
+_source_snapshots = {}
+
+
+def attach_sources(table):
+    """Serve /hand-angles/<source_id> from a worker_pool.SharedAngleTable"""
+    global _sources
+    _sources = table
+    _source_snapshots.clear()
+
+
+def source_snapshot(source_id):
+    """Return the newest AngleSnapshot for a source, or None if unknown"""
+    table = _sources
+    if table is None or source_id not in table.index:
+        return None
+    seq, timestamp, angles, age = table.read(source_id)
+    snapshot = _source_snapshots.get(source_id)
+    if snapshot is None or snapshot.seq != seq:
+        snapshot = make_snapshot(seq, angles if seq else (), timestamp, age)
+        _source_snapshots[source_id] = snapshot
+    return snapshot
+
+
+def _snapshot_response(snapshot):
+    etag = str(snapshot.seq)
+
+    # Clients that already have this frame get an empty 304 instead of a body
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(snapshot.payload, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["X-Frame-Seq"] = etag
+    return response
+
 
 @app.route("/hand-angles", methods=["GET"])
 def get_hand_angles():
-    with angle_lock:
-        hand_present = all(a is not None for a in latest_angles)
-        return jsonify({
-            "hand_present": int(hand_present),
-            "angles": latest_angles
-        })
+    return _snapshot_response(_snapshot)
+
+
+@app.route("/hand-angles/sources", methods=["GET"])
+def list_sources():
+    """IDs of the video sources served by worker processes"""
+    return {"sources": list(_sources.source_ids) if _sources is not None else []}
+
+
+@app.route("/hand-angles/<source_id>", methods=["GET"])
+def get_source_hand_angles(source_id):
+    snapshot = source_snapshot(source_id)
+    if snapshot is None:
+        return {"error": f"Unknown video source: {source_id}"}, 404
+    return _snapshot_response(snapshot)
+
+
+def stream_snapshots(keepalive=STREAM_KEEPALIVE):
+    """
+    Yield Server-Sent Events for each published snapshot whose angles differ
+    from the previously sent one. Repeated identical frames (e.g. a run of
+    "no hand" frames) are skipped; a keep-alive comment is sent when idle.
+    """
+    sent = None
+    seen = -1
+    while True:
+        snapshot = _snapshot
+        if snapshot.seq != seen:
+            seen = snapshot.seq
+            if sent is None or snapshot.angles != sent.angles:
+                sent = snapshot
+                yield b"id: %d\ndata: %s\n\n" % (snapshot.seq, snapshot.payload)
+            continue
+
+        with _changed:
+            if not _changed.wait_for(lambda: _snapshot.seq != seen, keepalive):
+                yield b": keep-alive\n\n"
+
+
+@app.route("/hand-angles/recent", methods=["GET"])
+def get_recent_hand_angles():
+    """
+    The last `k` frames in which a hand was detected, oldest first, no older
+    than `max_age` seconds (at most RECENT_MAX_AGE). With consume=1 the window
+    is emptied afterwards, so the same frames cannot back a second login.
+    """
+    k = min(max(request.args.get("k", 10, type=int), 1), RECENT_FRAMES)
+    max_age = min(request.args.get("max_age", RECENT_MAX_AGE, type=float), RECENT_MAX_AGE)
+    oldest = time.time() - max_age
+    frames = [s for s in list(_recent) if s.timestamp >= oldest][-k:]
+    if request.args.get("consume") == "1":
+        _recent.clear()
+    # Reuse each frame's pre-serialized payload instead of re-encoding
+    body = b'{"frames": [' + b",".join(s.payload for s in frames) + b"]}"
+    return Response(body, mimetype="application/json")
+
+
+@app.route("/hand-angles/stream", methods=["GET"])
+def stream_hand_angles():
+    return Response(
+        stream_snapshots(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+    """Per-stage timings, FPS, detection rate and drops (Prometheus format)"""
+    if not metrics.ENABLED:
+        return Response("Metrics are disabled; set ANGLE_METRICS=1\n", status=404)
+    return Response(
+        metrics.REGISTRY.render(), mimetype="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,127 @@
+"""
+Vectorized joint-angle engine.
+
+Computes all finger joint angles for a hand in a single NumPy pass instead of
+calling calculate_angle once per joint. Works on a single hand of shape (21, 3)
+or on stacks of recorded frames of shape (N, 21, 3).
+"""
+
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+ANGLE_LABELS = (
+    "Thumb MCP→IP",
+    "Thumb IP→Tip",
+    "Index MCP→PIP",
+    "Index PIP→DIP",
+    "Middle MCP→PIP",
+    "Middle PIP→DIP",
+    "Ring MCP→PIP",
+    "Ring PIP→DIP",
+    "Pinky MCP→PIP",
+    "Pinky PIP→DIP",
+)
+
+# (a, b, c) landmark indices for each joint; the angle is measured at b.
+# Order matches ANGLE_LABELS and the legacy extract_hand_angles output.
+JOINT_TRIPLETS = np.array(
+    [
+        [1, 2, 3],
+        [2, 3, 4],
+        [5, 6, 7],
+        [6, 7, 8],
+        [9, 10, 11],
+        [10, 11, 12],
+        [13, 14, 15],
+        [14, 15, 16],
+        [17, 18, 19],
+        [18, 19, 20],
+    ],
+    dtype=np.intp,
+)
+NUM_JOINTS = len(JOINT_TRIPLETS)
+
+_A, _B, _C = JOINT_TRIPLETS.T
+
+
+def joint_angles(points):
+    """
+    Calculate every joint angle (in degrees) for one or more hands.
+
+    points is an array of shape (21, 3) or (N, 21, 3) holding x, y, z
+    landmark coordinates. Returns an array of shape (10,) or (N, 10).
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if points.shape[-2:] != (NUM_LANDMARKS, 3):
+        raise ValueError(
+            f"Expected landmarks of shape (..., {NUM_LANDMARKS}, 3), got {points.shape}"
+        )
+
+    b = points[..., _B, :]
+    ba = points[..., _A, :] - b
+    bc = points[..., _C, :] - b
+
+    dot = np.einsum("...ij,...ij->...i", ba, bc)
+    norms = np.linalg.norm(ba, axis=-1) * np.linalg.norm(bc, axis=-1)
+
+    # Clip the cosine to avoid numerical errors outside the range [-1,1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cosine_angle = dot / norms
+    return np.degrees(np.arccos(np.clip(cosine_angle, -1.0, 1.0)))
+
+
+class AngleEngine:
+    """
+    Per-frame angle calculator that reuses preallocated buffers.
+
+    One engine should be used by a single thread at a time, since the
+    landmark and scratch buffers are shared between calls.
+    """
+
+    def __init__(self):
+        self.points = np.empty((NUM_LANDMARKS, 3), dtype=np.float64)
+        self._triplets = np.empty((NUM_JOINTS, 3, 3), dtype=np.float64)
+        self._vectors = np.empty((NUM_JOINTS, 2, 3), dtype=np.float64)
+        self._squared = np.empty((NUM_JOINTS, 2), dtype=np.float64)
+        self._norms = np.empty(NUM_JOINTS, dtype=np.float64)
+        self._cosine = np.empty(NUM_JOINTS, dtype=np.float64)
+
+    def load_landmarks(self, landmarks):
+        """Copy 21 landmark objects (with x, y, z attributes) into the buffer"""
+        self.points[:] = [(lm.x, lm.y, lm.z) for lm in landmarks]
+        return self.points
+
+    def compute(self, points=None):
+        """
+        Calculate the 10 joint angles for a single hand.
+
+        Uses the internal landmark buffer unless an explicit (21, 3) array is
+        given. The returned array is freshly allocated and safe to keep.
+        """
+        if points is None:
+            points = self.points
+
+        # Gather (a, b, c) for every joint, then build ba and bc side by side
+        np.take(points, JOINT_TRIPLETS, axis=0, out=self._triplets)
+        np.subtract(
+            self._triplets[:, 0::2], self._triplets[:, 1:2], out=self._vectors
+        )
+        ba = self._vectors[:, 0]
+        bc = self._vectors[:, 1]
+
+        np.einsum("ij,ij->i", ba, bc, out=self._cosine)
+        np.einsum("ijk,ijk->ij", self._vectors, self._vectors, out=self._squared)
+        np.multiply(self._squared[:, 0], self._squared[:, 1], out=self._norms)
+        np.sqrt(self._norms, out=self._norms)
+
+        # Clip the cosine to avoid numerical errors outside the range [-1,1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            np.divide(self._cosine, self._norms, out=self._cosine)
+        np.clip(self._cosine, -1.0, 1.0, out=self._cosine)
+        return np.degrees(np.arccos(self._cosine))
+
+    def angles_from_landmarks(self, landmarks):
+        """Load MediaPipe landmarks and return their 10 joint angles"""
+        self.load_landmarks(landmarks)
+        return self.compute()
@@ -0,0 +1,244 @@
+"""
+Offline batch extraction: recorded videos / image folders -> angle datasets.
+
+Each input (a video file or a directory of images) is processed by one worker
+of a process pool, with its own MediaPipe Hands instance. Per-frame angles
+are written in chunks as they are produced, so memory stays flat for long
+recordings:
+
+    <out>/<input name>.part-00000.npz   frame_index, timestamp_ms, file_name,
+    <out>/<input name>.part-00001.npz   hand_present, angles (N x 10 float32,
+    ...                                 NaN where no hand was found)
+    <out>/<input name>.done             JSON summary once the input is complete
+
+With --format parquet each chunk is a .parquet file (needs pyarrow) with one
+column per joint instead. Chunks are written to a temporary name and renamed,
+so an interrupted run can be restarted with the same arguments: finished
+inputs are skipped and unfinished ones resume after their last chunk.
+
+Usage:
+    python batch_angles.py sessions/*.mp4 captures/ --out dataset/ [--workers 4]
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+import cv2
+import numpy as np
+
+from angle_engine import ANGLE_LABELS, NUM_JOINTS, AngleEngine
+from preprocess import FramePreprocessor
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+FORMATS = ("npz", "parquet")
+
+
+def output_name(path):
+    """File-system safe name for an input path"""
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", os.path.normpath(path).strip(os.sep))
+
+
+def iter_frames(path, start=0):
+    """
+    Yield (frame_index, timestamp_ms, file_name, frame) from a video file or a
+    directory of images, beginning at frame `start`.
+    """
+    if os.path.isdir(path):
+        names = sorted(n for n in os.listdir(path) if n.lower().endswith(IMAGE_EXTENSIONS))
+        for index in range(start, len(names)):
+            frame = cv2.imread(os.path.join(path, names[index]))
+            if frame is not None:
+                yield index, np.nan, names[index], frame
+        return
+
+    capture = cv2.VideoCapture(path)
+    try:
+        if start:
+            capture.set(cv2.CAP_PROP_POS_FRAMES, start)
+        index = start
+        while True:
+            success, frame = capture.read()
+            if not success:
+                break
+            yield index, capture.get(cv2.CAP_PROP_POS_MSEC), "", frame
+            index += 1
+    finally:
+        capture.release()
+
+
+def _chunk_path(out_dir, name, part, fmt):
+    return os.path.join(out_dir, f"{name}.part-{part:05d}.{fmt}")
+
+
+def _write_chunk(path, columns, fmt):
+    tmp = path + ".tmp"
+    if fmt == "npz":
+        with open(tmp, "wb") as f:
+            np.savez(f, **columns)
+    else:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = {key: value for key, value in columns.items() if key != "angles"}
+        for i, label in enumerate(ANGLE_LABELS):
+            table[label] = columns["angles"][:, i]
+        pq.write_table(pa.table(table), tmp)
+    os.replace(tmp, path)
+
+
+def _read_frame_count(path, fmt):
+    if fmt == "npz":
+        with np.load(path) as chunk:
+            return int(chunk["frame_index"][-1]) + 1
+    import pyarrow.parquet as pq
+
+    return int(pq.read_table(path, columns=["frame_index"])["frame_index"][-1].as_py()) + 1
+
+
+def _resume_point(out_dir, name, fmt):
+    """Return (next_part, next_frame) from chunks already on disk"""
+    part = 0
+    while os.path.exists(_chunk_path(out_dir, name, part, fmt)):
+        part += 1
+    if part == 0:
+        return 0, 0
+    return part, _read_frame_count(_chunk_path(out_dir, name, part - 1, fmt), fmt)
+
+
+def process_source(path, out_dir, hands, chunk_size=1000, fmt="npz", max_width=1280):
+    """
+    Extract angles for every frame of one input and write them in chunks.
+
+    `hands` is any object with process(rgb_image) -> results, like
+    mp.solutions.hands.Hands. Returns a summary dict (frames, seconds,
+    fps, hands_detected, skipped).
+    """
+    name = output_name(path)
+    done_path = os.path.join(out_dir, name + ".done")
+    if os.path.exists(done_path):
+        with open(done_path, encoding="utf-8") as f:
+            return dict(json.load(f), skipped=True)
+
+    part, start = _resume_point(out_dir, name, fmt)
+    engine = AngleEngine()
+    preprocessor = FramePreprocessor(max_width=max_width, roi_tracking=False)
+
+    index = np.empty(chunk_size, dtype=np.int64)
+    timestamps = np.empty(chunk_size, dtype=np.float64)
+    files = [""] * chunk_size
+    angles = np.empty((chunk_size, NUM_JOINTS), dtype=np.float32)
+    filled = frames = detected = 0
+
+    def flush():
+        nonlocal part, filled
+        _write_chunk(
+            _chunk_path(out_dir, name, part, fmt),
+            {
+                "frame_index": index[:filled].copy(),
+                "timestamp_ms": timestamps[:filled].copy(),
+                "file_name": np.array(files[:filled]),
+                "hand_present": ~np.isnan(angles[:filled, 0]),
+                "angles": angles[:filled].copy(),
+            },
+            fmt,
+        )
+        part += 1
+        filled = 0
+
+    started = time.perf_counter()
+    for frame_index, timestamp, file_name, frame in iter_frames(path, start):
+        image_rgb, region = preprocessor.prepare(frame)
+        results = hands.process(image_rgb)
+        if results.multi_hand_landmarks:
+            points = engine.load_landmarks(results.multi_hand_landmarks[0].landmark)
+            preprocessor.to_frame_coords(points, region)
+            angles[filled] = engine.compute()
+            detected += 1
+        else:
+            angles[filled] = np.nan
+        index[filled], timestamps[filled], files[filled] = frame_index, timestamp, file_name
+        filled += 1
+        frames += 1
+        if filled == chunk_size:
+            flush()
+    if filled:
+        flush()
+    seconds = time.perf_counter() - started
+
+    summary = {
+        "input": path,
+        "frames": start + frames,
+        "processed": frames,
+        "hands_detected": detected,
+        "seconds": seconds,
+        "fps": frames / seconds if seconds else 0.0,
+    }
+    with open(done_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f)
+    return dict(summary, skipped=False)
+
+
+def _run_in_worker(path, out_dir, chunk_size, fmt, max_width, static_images):
+    import mediapipe as mp
+
+    with mp.solutions.hands.Hands(
+        static_image_mode=static_images or os.path.isdir(path),
+        max_num_hands=1,
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.5,
+    ) as hands:
+        return process_source(path, out_dir, hands, chunk_size, fmt, max_width)
+
+
+def run(inputs, out_dir, workers=None, chunk_size=1000, fmt="npz", max_width=1280,
+        static_images=False, log=print):
+    """Process all inputs in a process pool and return their summaries"""
+    os.makedirs(out_dir, exist_ok=True)
+    started = time.perf_counter()
+    summaries = []
+    # spawn: MediaPipe is not fork-safe
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+        futures = {
+            pool.submit(_run_in_worker, path, out_dir, chunk_size, fmt, max_width, static_images): path
+            for path in inputs
+        }
+        for future in as_completed(futures):
+            summary = future.result()
+            summaries.append(summary)
+            state = "already done" if summary["skipped"] else f"{summary['fps']:.1f} fps"
+            log(f"{futures[future]}: {summary['frames']} frames ({state})")
+
+    elapsed = time.perf_counter() - started
+    processed = sum(s["processed"] for s in summaries if not s["skipped"])
+    log(f"Processed {processed} frames from {len(summaries)} inputs in {elapsed:.1f} s "
+        f"({processed / elapsed if elapsed else 0.0:.1f} fps overall)")
+    return summaries
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Extract hand angles from recorded sessions")
+    parser.add_argument("inputs", nargs="+", help="video files or directories of images")
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="frames per output chunk")
+    parser.add_argument("--format", choices=FORMATS, default="npz")
+    parser.add_argument("--max-width", type=int, default=1280, help="downsize wider frames")
+    parser.add_argument("--static-images", action="store_true",
+                        help="detect on every video frame independently (no tracking)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise SystemExit("--format parquet needs pyarrow (pip install pyarrow)")
+    run(args.inputs, args.out, args.workers, args.chunk_size, args.format, args.max_width,
+        args.static_images)
@@ -0,0 +1,93 @@
+"""
+Micro-benchmark: per-joint calculate_angle calls vs. the vectorized AngleEngine.
+
+Run from the machine-learning-client directory:
+    python benchmarks/bench_angles.py [--json results.json]
+
+--json writes per-call latency percentiles (p50/p95/p99) in the schema used
+by the repository-wide suite (benchmarks/run_suite.py).
+"""
+
+import argparse
+import os
+import sys
+import timeit
+from collections import namedtuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# Shared timing helpers (stats.py) live in the repository-level benchmarks/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "benchmarks")))
+from angle_engine import JOINT_TRIPLETS, AngleEngine, joint_angles
+from main import calculate_angle, extract_hand_angles
+from stats import print_results, time_calls, write_results
+
+Landmark = namedtuple("Landmark", ["x", "y", "z"])
+
+
+def legacy_extract(landmarks):
+    """The original extract_hand_angles: one calculate_angle call per joint"""
+    return [
+        calculate_angle(landmarks[a], landmarks[b], landmarks[c])
+        for a, b, c in JOINT_TRIPLETS
+    ]
+
+
+def run(number=20000, batch_size=1000, seed=0):
+    """Time both implementations and return results in microseconds per hand"""
+    rng = np.random.default_rng(seed)
+    points = rng.random((21, 3))
+    landmarks = [Landmark(*p) for p in points]
+    engine = AngleEngine()
+
+    # Sanity check: both paths must agree before we compare their speed
+    assert np.allclose(legacy_extract(landmarks), engine.angles_from_landmarks(landmarks))
+
+    legacy = timeit.timeit(lambda: legacy_extract(landmarks), number=number)
+    vectorized = timeit.timeit(
+        lambda: engine.angles_from_landmarks(landmarks), number=number
+    )
+
+    stack = rng.random((batch_size, 21, 3))
+    batch_runs = max(1, number // batch_size)
+    batch = timeit.timeit(lambda: joint_angles(stack), number=batch_runs)
+
+    return {
+        "legacy_us": legacy / number * 1e6,
+        "engine_us": vectorized / number * 1e6,
+        "batch_us": batch / (batch_runs * batch_size) * 1e6,
+    }
+
+
+def suite(seed=0, repeat=200):
+    """Latency percentiles for the angle functions (schema of stats.py)"""
+    rng = np.random.default_rng(seed)
+    points = rng.random((21, 3))
+    landmarks = [Landmark(*p) for p in points]
+    a, b, c = landmarks[5], landmarks[6], landmarks[7]
+    stack = rng.random((100, 21, 3))
+    return {
+        "ml.calculate_angle": time_calls(lambda: calculate_angle(a, b, c), repeat),
+        "ml.extract_hand_angles.legacy": time_calls(lambda: legacy_extract(landmarks), repeat),
+        "ml.extract_hand_angles": time_calls(lambda: extract_hand_angles(landmarks), repeat),
+        "ml.joint_angles.batch100": time_calls(lambda: joint_angles(stack), repeat, inner=5),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--json", help="write suite results to this file")
+    args = parser.parse_args()
+
+    if args.json:
+        results = suite()
+        print_results(results)
+        write_results(args.json, results)
+        sys.exit(0)
+
+    results = run()
+    print(f"calculate_angle x10     : {results['legacy_us']:8.2f} us/hand")
+    print(f"AngleEngine (21,3)      : {results['engine_us']:8.2f} us/hand")
+    print(f"joint_angles (N,21,3)   : {results['batch_us']:8.2f} us/hand")
+    print(f"speed-up (single frame) : {results['legacy_us'] / results['engine_us']:8.1f}x")
@@ -0,0 +1,87 @@
+"""
+Benchmark frame preprocessing before hands.process().
+
+Compares the original flip + cvtColor copies against FramePreprocessor in
+full-frame (downsized) and ROI-tracking modes, reporting per-frame CPU time
+and bytes allocated. Uses a recorded video if given, otherwise synthetic
+frames.
+
+Run from the machine-learning-client directory:
+    python benchmarks/bench_preprocess.py [--video session.mp4] [--frames 300]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from preprocess import FramePreprocessor
+
+
+def load_frames(video=None, count=300, width=1280, height=720):
+    """Read up to `count` frames from a video file, or synthesize them"""
+    if video:
+        capture = cv2.VideoCapture(video)
+        frames = []
+        while len(frames) < count:
+            success, frame = capture.read()
+            if not success:
+                break
+            frames.append(frame)
+        capture.release()
+        return frames
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, (height, width, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def legacy_prepare(frame):
+    """The original preprocessing: mirrored copy, then an RGB copy"""
+    return cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB)
+
+
+def measure(prepare, frames):
+    """Return (CPU ms per frame, bytes allocated per frame)"""
+    prepare(frames[0])  # warm up buffers
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    started = time.process_time()
+    for frame in frames:
+        prepare(frame)
+    cpu = time.process_time() - started
+    _, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size for stat in snapshot.statistics("filename"))
+    return cpu / len(frames) * 1000.0, max(allocated, peak) / len(frames)
+
+
+def run(frames, max_width=640):
+    full = FramePreprocessor(max_width=max_width, roi_tracking=False)
+    roi = FramePreprocessor(max_width=max_width)
+    height, width = frames[0].shape[:2]
+    # Pretend a hand was found in the middle of the frame
+    roi.roi = (width // 2 - height // 6, height // 3, height // 3)
+
+    return {
+        "flip + cvtColor": measure(legacy_prepare, frames),
+        f"downsize to {max_width}px": measure(full.prepare, frames),
+        "ROI crop": measure(roi.prepare, frames),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--video", help="recorded video file (default: synthetic 1280x720)")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--max-width", type=int, default=640)
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.frames)
+    print(f"{len(frames)} frames of {frames[0].shape[1]}x{frames[0].shape[0]}")
+    for name, (cpu_ms, allocated) in run(frames, args.max_width).items():
+        print(f"{name:20s}: {cpu_ms:6.3f} ms CPU/frame, {allocated / 1024:8.1f} KiB allocated/frame")
@@ -0,0 +1,62 @@
+"""
+Benchmark the MJPEG broadcaster with a synthetic source (no camera needed).
+
+Run from the machine-learning-client directory:
+    python benchmarks/bench_streamer.py [--clients 4] [--seconds 5]
+"""
+
+import argparse
+import os
+import sys
+import time
+from threading import Thread
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from webcam_streamer import FrameBroadcaster, SyntheticSource
+
+
+def run(clients=4, seconds=5.0, width=640, height=480, quality=80, fps=0):
+    """Stream to `clients` readers for `seconds`; returns throughput figures"""
+    broadcaster = FrameBroadcaster(
+        SyntheticSource(width, height), quality=quality, max_fps=fps
+    )
+    received = [0] * clients
+    received_bytes = [0] * clients
+
+    def reader(index):
+        for chunk in broadcaster.subscribe(timeout=1):
+            received[index] += 1
+            received_bytes[index] += len(chunk)
+
+    threads = [Thread(target=reader, args=(i,), daemon=True) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    broadcaster.stop()
+    for thread in threads:
+        thread.join()
+
+    encoded = broadcaster.frames_encoded
+    return {
+        "encoded_fps": encoded / seconds,
+        "encode_ms": broadcaster.encode_seconds / max(encoded, 1) * 1000.0,
+        "client_fps": [count / seconds for count in received],
+        "client_mbps": [size * 8 / seconds / 1e6 for size in received_bytes],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--quality", type=int, default=80)
+    parser.add_argument("--fps", type=float, default=0, help="frame-rate cap (0 = none)")
+    args = parser.parse_args()
+
+    results = run(args.clients, args.seconds, args.width, args.height, args.quality, args.fps)
+    print(f"encoded frames/s : {results['encoded_fps']:.1f}")
+    print(f"encode time      : {results['encode_ms']:.2f} ms/frame (paid once for all clients)")
+    for i, (client_fps, mbps) in enumerate(zip(results["client_fps"], results["client_mbps"])):
+        print(f"client {i}         : {client_fps:.1f} frames/s, {mbps:.1f} Mbit/s")
@@ -0,0 +1,89 @@
+"""
+Motion gating in front of hand inference.
+
+Most frames on an idle kiosk are either empty or show a hand that has not
+moved, and running hands.process() on them only reproduces the previous
+result. MotionGate compares a tiny grayscale thumbnail of each frame with the
+thumbnail of the last frame that went through inference and lets a frame
+through only when:
+
+- enough of the thumbnail changed (a hand appeared, moved or left), or
+- the last inference is older than max_staleness, so published angles are
+  never more than max_staleness seconds old.
+
+While a hand is visible the change threshold is halved, so small finger
+movements still trigger inference. Thumbnails are written into reused
+buffers; a gate check costs a few microseconds.
+"""
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    - threshold: per-pixel grayscale change (0-255) that counts as motion
+    - min_changed: fraction of thumbnail pixels that must change
+    - max_staleness: seconds after which a frame is always inferred
+    - size: (width, height) of the comparison thumbnail
+    """
+
+    def __init__(self, threshold=12, min_changed=0.005, max_staleness=0.5, size=(32, 24)):
+        self.threshold = threshold
+        self.min_changed = max(int(min_changed * size[0] * size[1]), 1)
+        self.max_staleness = max_staleness
+        self.size = size
+        self.hand_present = False
+        self.checked = 0
+        self.skipped = 0
+
+        self._small = None
+        self._gray = np.empty((size[1], size[0]), dtype=np.uint8)
+        self._diff = np.empty_like(self._gray)
+        self._reference = None
+        self._inferred_at = None
+
+    def should_process(self, frame, now):
+        """
+        Return True if `frame` (BGR, captured at `now` seconds) needs
+        inference. Accepted frames become the new comparison reference.
+        """
+        if self._small is None or self._small.shape[2] != frame.shape[2]:
+            self._small = np.empty((self.size[1], self.size[0], frame.shape[2]), dtype=frame.dtype)
+        cv2.resize(frame, self.size, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        self.checked += 1
+
+        if self._reference is None or now - self._inferred_at >= self.max_staleness:
+            process = True
+        else:
+            threshold = self.threshold / 2 if self.hand_present else self.threshold
+            cv2.absdiff(self._gray, self._reference, dst=self._diff)
+            process = np.count_nonzero(self._diff > threshold) >= self.min_changed
+
+        if not process:
+            self.skipped += 1
+            return False
+        if self._reference is None:
+            self._reference = self._gray.copy()
+        else:
+            self._reference[...] = self._gray
+        self._inferred_at = now
+        return True
+
+    def record(self, hand_present):
+        """Tell the gate whether the last inferred frame contained a hand"""
+        self.hand_present = hand_present
+
+    def reset(self):
+        """Force inference on the next frame"""
+        self._reference = None
+        self.hand_present = False
+
+    def snapshot(self):
+        """Frames checked and skipped so far"""
+        return {
+            "checked": self.checked,
+            "skipped": self.skipped,
+            "skip_rate": self.skipped / self.checked if self.checked else 0.0,
+        }
@@ -1,12 +1,26 @@
 # main.py
 import cv2
+import json
+import logging
+import os
 import time
 import mediapipe as mp
 import numpy as np
-from angle_api import latest_angles, angle_lock
+from angle_api import attach_sources, publish_angles
+from angle_engine import ANGLE_LABELS, AngleEngine
+from gating import MotionGate
+from pipeline import AnglePipeline
+from preprocess import FramePreprocessor
+from worker_pool import WorkerPool, parse_sources
+from metrics import RateLimiter
 from threading import Thread
 from flask import Flask
 
+logger = logging.getLogger("hand_angles")
+
+# Reused across frames so each call avoids allocating fresh landmark arrays
+_angle_engine = AngleEngine()
+
 def run_api():
     from angle_api import app
     app.run(host="0.0.0.0", port=5050)
@@ -33,26 +47,39 @@ def extract_hand_angles(landmarks):
     """
     Given the 21 hand landmarks, return a list of angles
     for each relevant finger joint.
+
+    All 10 joints are computed in one vectorized pass by the shared
+    AngleEngine; the values match calling calculate_angle per joint.
+    """
+    return _angle_engine.angles_from_landmarks(landmarks).tolist()
+
+def run_pool(sources):
     """
-    angles = []
-    # Thumb
-    angles.append(calculate_angle(landmarks[1], landmarks[2], landmarks[3]))
-    angles.append(calculate_angle(landmarks[2], landmarks[3], landmarks[4]))
-    # Index finger
-    angles.append(calculate_angle(landmarks[5], landmarks[6], landmarks[7]))
-    angles.append(calculate_angle(landmarks[6], landmarks[7], landmarks[8]))
-    # Middle finger
-    angles.append(calculate_angle(landmarks[9], landmarks[10], landmarks[11]))
-    angles.append(calculate_angle(landmarks[10], landmarks[11], landmarks[12]))
-    # Ring finger
-    angles.append(calculate_angle(landmarks[13], landmarks[14], landmarks[15]))
-    angles.append(calculate_angle(landmarks[14], landmarks[15], landmarks[16]))
-    # Pinky
-    angles.append(calculate_angle(landmarks[17], landmarks[18], landmarks[19]))
-    angles.append(calculate_angle(landmarks[18], landmarks[19], landmarks[20]))
-    return angles
+    Run one capture + inference process per video source and serve their
+    results at /hand-angles/<source_id> until interrupted.
+    """
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    pool = WorkerPool(sources).start()
+    attach_sources(pool.table)
+    Thread(target=run_api, daemon=True).start()
+    logger.info(json.dumps({"event": "worker_pool_started", "sources": list(sources)}))
+    try:
+        while True:
+            time.sleep(1.0)
+            pool.supervise()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.stop()
 
 if __name__ == "__main__":
+    # VIDEO_SOURCES="kiosk1=http://...,kiosk2=rtsp://..." serves several
+    # login stations from one container, one worker process per camera
+    video_sources = parse_sources(os.environ.get("VIDEO_SOURCES", ""))
+    if video_sources:
+        run_pool(video_sources)
+        raise SystemExit(0)
+
     # Initialize MediaPipe Hands
     mp_hands = mp.solutions.hands
     hands = mp_hands.Hands(
@@ -72,50 +99,46 @@ if __name__ == "__main__":
 
     Thread(target=run_api, daemon=True).start()
 
-    while cap.isOpened():
-        success, image = cap.read()
-        if not success:
-            # Frame not read properly; possibly end of stream
-            break
-
-        # Flip the frame horizontally so it mirrors the user's movement
-        image = cv2.flip(image, 1)
-
-        # Convert the frame from BGR to RGB (MediaPipe expects RGB)
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        results = hands.process(image_rgb)
-
-        # If a hand is detected, extract the angles and print them
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                angles = extract_hand_angles(hand_landmarks.landmark)
-
-                with angle_lock:
-                    latest_angles.clear()
-                    latest_angles.extend(angles)
-
-                labels = [
-                    "Thumb MCP→IP", "Thumb IP→Tip",
-                    "Index MCP→PIP", "Index PIP→DIP",
-                    "Middle MCP→PIP", "Middle PIP→DIP",
-                    "Ring MCP→PIP", "Ring PIP→DIP",
-                    "Pinky MCP→PIP", "Pinky PIP→DIP"
-                ]
-
-                print("🖐️ Hand Angles:")
-                for label, angle in zip(labels, angles):
-                    print(f"{label}: {angle:.2f}°")
-                print("-" * 40)
-        else:
-            # No hand detected → set angles to None
-            with angle_lock:
-                latest_angles.clear()
-                latest_angles.extend([None] * 10)
-
-        
-        # Optional small delay to avoid pegging the CPU
-        time.sleep(0.01)
+    # Printing every angle on every frame is itself a measurable cost at
+    # 30 fps, so log one structured line per interval instead
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    log_limiter = RateLimiter(float(os.environ.get("ANGLE_LOG_INTERVAL", 1.0)))
+
+    def publish_frame(angles, age):
+        """Publisher stage: share the newest angles with the API and log them"""
+        publish_angles(angles, age=age)
+
+        if log_limiter.allow():
+            hand_present = angles[0] is not None
+            logger.info(json.dumps({
+                "event": "hand_angles",
+                "hand_present": hand_present,
+                "age": round(age, 3),
+                "angles": dict(zip(ANGLE_LABELS, (round(a, 2) for a in angles))) if hand_present else None
+            }, ensure_ascii=False))
+
+    # Capture, inference and publishing each run on their own thread, so a
+    # slow network read no longer blocks inference (and vice versa)
+    preprocessor = FramePreprocessor(
+        max_width=int(os.environ.get("INFERENCE_WIDTH", 640)),
+        roi_tracking=os.environ.get("ROI_TRACKING", "1") == "1",
+    )
+    # Skip inference on static frames; angles are re-inferred at least every
+    # MAX_STALENESS seconds regardless
+    gate = None
+    if os.environ.get("MOTION_GATING", "1") == "1":
+        gate = MotionGate(
+            threshold=float(os.environ.get("MOTION_THRESHOLD", 12)),
+            max_staleness=float(os.environ.get("MAX_STALENESS", 0.5)),
+        )
+    pipeline = AnglePipeline(
+        cap, hands, publish_frame, preprocessor=preprocessor, gate=gate
+    ).start()
+    try:
+        pipeline.join()
+    except KeyboardInterrupt:
+        pipeline.stop()
 
     cap.release()
+    logger.info(json.dumps({"event": "pipeline_stats", "stages": pipeline.get_stats()}))
     print("Finished.")
-    
@@ -0,0 +1,234 @@
+"""
+Opt-in, dependency-free metrics for the ML client.
+
+Enable with ANGLE_METRICS=1. Metrics are rendered in the Prometheus text
+exposition format by angle_api's /metrics endpoint. When disabled, the
+pipeline skips all timing calls, so there is no per-frame cost.
+"""
+
+import os
+import time
+from collections import deque
+from threading import Lock
+
+ENABLED = os.environ.get("ANGLE_METRICS", "0") == "1"
+
+# Upper bounds (seconds) suited to per-frame work at 15-60 fps
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    inner = ",".join(f'{key}="{value}"' for key, value in labels)
+    return "{" + inner + "}"
+
+
+class Counter:
+    """Monotonically increasing value"""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._value = 0
+        self._lock = Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self):
+        return self._value
+
+    def samples(self):
+        yield self.name, (), self._value
+
+
+class Gauge:
+    """Value that can go up and down, or be computed when scraped"""
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._value = 0.0
+        self._function = None
+
+    def set(self, value):
+        self._value = value
+
+    def set_function(self, function):
+        """Compute the value by calling `function` at scrape time"""
+        self._function = function
+
+    @property
+    def value(self):
+        return self._function() if self._function else self._value
+
+    def samples(self):
+        yield self.name, (), self.value
+
+
+class Histogram:
+    """Cumulative bucketed distribution of observed values"""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS, labels=()):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.labels = tuple(labels)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = Lock()
+
+    def observe(self, value):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    @property
+    def count(self):
+        return sum(self._counts)
+
+    def samples(self):
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            yield self.name + "_bucket", self.labels + (("le", le),), cumulative
+        yield self.name + "_sum", self.labels, total
+        yield self.name + "_count", self.labels, cumulative
+
+
+class HistogramFamily:
+    """Histograms sharing a name, distinguished by one label"""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, label, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label = label
+        self.buckets = buckets
+        self._children = {}
+
+    def labels(self, value):
+        child = self._children.get(value)
+        if child is None:
+            child = self._children.setdefault(
+                value,
+                Histogram(self.name, self.help, self.buckets, ((self.label, value),)),
+            )
+        return child
+
+    def samples(self):
+        for child in list(self._children.values()):
+            yield from child.samples()
+
+
+class RateMeter:
+    """Events per second over a sliding time window (e.g. achieved FPS)"""
+
+    def __init__(self, window=5.0):
+        self.window = window
+        self._events = deque()
+
+    def tick(self, now=None):
+        now = time.monotonic() if now is None else now
+        self._events.append(now)
+        while self._events and now - self._events[0] > self.window:
+            self._events.popleft()
+
+    def rate(self, now=None):
+        now = time.monotonic() if now is None else now
+        events = [t for t in list(self._events) if now - t <= self.window]
+        if len(events) < 2:
+            return 0.0
+        return (len(events) - 1) / max(events[-1] - events[0], 1e-9)
+
+
+class RateLimiter:
+    """Allows an action at most once every `interval` seconds"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._last = float("-inf")
+
+    def allow(self):
+        now = time.monotonic()
+        if now - self._last < self.interval:
+            return False
+        self._last = now
+        return True
+
+
+class Registry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# Per-stage time spent on each frame:
+# decode, prepare (resize/crop/cvtColor), process (hands.process), extract, publish
+stage_seconds = REGISTRY.register(
+    HistogramFamily("angle_stage_seconds", "Time spent per frame in each stage", "stage")
+)
+frames_total = REGISTRY.register(
+    Counter("angle_frames_total", "Frames that went through hand inference")
+)
+hands_detected_total = REGISTRY.register(
+    Counter("angle_hands_detected_total", "Frames in which a hand was detected")
+)
+frames_gated_total = REGISTRY.register(
+    Counter("angle_frames_gated_total", "Static frames that reused the previous result")
+)
+frames_dropped_total = REGISTRY.register(
+    Counter("angle_frames_dropped_total", "Frames discarded before inference or publication")
+)
+detection_rate = REGISTRY.register(
+    Gauge("angle_detection_rate", "Fraction of inferred frames with a detected hand")
+)
+fps = REGISTRY.register(Gauge("angle_fps", "Achieved published frames per second"))
+
+fps_meter = RateMeter()
+fps.set_function(fps_meter.rate)
+detection_rate.set_function(
+    lambda: hands_detected_total.value / frames_total.value if frames_total.value else 0.0
+)
+
+
+def observe_stage(stage, seconds):
+    """Record how long `stage` took for one frame (no-op unless enabled)"""
+    if ENABLED:
+        stage_seconds.labels(stage).observe(seconds)
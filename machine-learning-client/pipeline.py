@@ -0,0 +1,268 @@
+"""
+Staged capture -> inference -> publish pipeline for the ML client.
+
+Each stage runs on its own thread and hands work to the next one through a
+small bounded queue that drops the *oldest* item when full. A slow stage
+therefore never builds up a backlog: downstream always works on the newest
+frame, and the number of frames skipped is reported per stage.
+"""
+
+import time
+from collections import deque
+from threading import Condition, Lock, Thread
+
+import metrics
+from angle_engine import AngleEngine
+from preprocess import FramePreprocessor
+
+
+class StageStats:
+    """
+    Thread-safe latency and drop counters for a single pipeline stage.
+    Drops are also added to `drop_counter` (a metrics.Counter) if given.
+    """
+
+    def __init__(self, name, drop_counter=None):
+        self.name = name
+        self.drop_counter = drop_counter
+        self._lock = Lock()
+        self.processed = 0
+        self.dropped = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+
+    def record(self, latency):
+        """Record one processed item that took `latency` seconds"""
+        with self._lock:
+            self.processed += 1
+            self.last_latency = latency
+            self.total_latency += latency
+            if latency > self.max_latency:
+                self.max_latency = latency
+
+    def record_drop(self, count=1):
+        """Record items that were discarded before this stage handled them"""
+        with self._lock:
+            self.dropped += count
+        if self.drop_counter is not None:
+            self.drop_counter.inc(count)
+
+    def snapshot(self):
+        """Return the current counters as a plain dictionary (times in ms)"""
+        with self._lock:
+            avg = self.total_latency / self.processed if self.processed else 0.0
+            return {
+                "processed": self.processed,
+                "dropped": self.dropped,
+                "last_latency_ms": self.last_latency * 1000.0,
+                "avg_latency_ms": avg * 1000.0,
+                "max_latency_ms": self.max_latency * 1000.0,
+            }
+
+
+class LatestQueue:
+    """
+    Bounded queue that keeps the newest items.
+
+    put() never blocks: when the queue is full the oldest item is discarded
+    and counted as a drop on the consuming stage's stats.
+    """
+
+    def __init__(self, maxsize=1, stats=None):
+        self._items = deque()
+        self._maxsize = maxsize
+        self._stats = stats
+        self._cond = Condition()
+        self._closed = False
+
+    def put(self, item):
+        """Add an item, dropping the oldest one if the queue is full"""
+        with self._cond:
+            if len(self._items) >= self._maxsize:
+                self._items.popleft()
+                if self._stats is not None:
+                    self._stats.record_drop()
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Return the oldest queued item, or None once closed and drained"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self._closed, timeout):
+                return None
+            if self._items:
+                return self._items.popleft()
+            return None
+
+    def close(self):
+        """Wake up consumers; get() returns None once the queue is empty"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+
+class AnglePipeline:
+    """
+    Runs video capture, hand inference and angle publication concurrently.
+
+    - capture: object with read() -> (success, frame), e.g. cv2.VideoCapture
+    - hands: object with process(rgb_frame), e.g. mp.solutions.hands.Hands
+    - publish: callable receiving (angles, age): a list of 10 angles (or
+      [None] * 10) and how many seconds old the inference behind them is
+    - queue_size: bound for each inter-stage queue (1 = newest frame only)
+    - preprocessor: FramePreprocessor used before inference (default settings if None)
+    - gate: optional MotionGate; frames it rejects skip inference and
+      republish the previous angles with their age
+    """
+
+    def __init__(self, capture, hands, publish, queue_size=1, preprocessor=None, gate=None):
+        self.capture = capture
+        self.hands = hands
+        self.publish = publish
+        # Only the inference thread touches the engine's and preprocessor's buffers
+        self.engine = AngleEngine()
+        self.preprocessor = preprocessor or FramePreprocessor()
+        self.gate = gate
+
+        # Frames discarded by the inference and publish queues count as dropped
+        dropped = metrics.frames_dropped_total if metrics.ENABLED else None
+        self.stats = {
+            "capture": StageStats("capture"),
+            "inference": StageStats("inference", dropped),
+            "publish": StageStats("publish", dropped),
+            "end_to_end": StageStats("end_to_end"),
+        }
+        self.frames = LatestQueue(queue_size, self.stats["inference"])
+        self.results = LatestQueue(queue_size, self.stats["publish"])
+
+        self._running = False
+        self._threads = []
+
+    def start(self):
+        """Start all stage threads"""
+        self._running = True
+        self._threads = [
+            Thread(target=self._capture_loop, name="capture", daemon=True),
+            Thread(target=self._inference_loop, name="inference", daemon=True),
+            Thread(target=self._publish_loop, name="publish", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        """Ask every stage to finish; queued work is discarded"""
+        self._running = False
+        self.frames.close()
+        self.results.close()
+
+    def join(self, timeout=None):
+        """Wait for the stage threads to exit (e.g. when the stream ends)"""
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def is_alive(self):
+        """True while any stage thread is still running"""
+        return any(thread.is_alive() for thread in self._threads)
+
+    def get_stats(self):
+        """Per-stage latency and drop counters"""
+        stats = {name: stats.snapshot() for name, stats in self.stats.items()}
+        if self.gate is not None:
+            stats["gate"] = self.gate.snapshot()
+        return stats
+
+    def _capture_loop(self):
+        stats = self.stats["capture"]
+        try:
+            while self._running:
+                started = time.perf_counter()
+                success, frame = self.capture.read()
+                if not success:
+                    # Frame not read properly; possibly end of stream
+                    break
+                captured_at = time.perf_counter()
+                stats.record(captured_at - started)
+                metrics.observe_stage("decode", captured_at - started)
+                self.frames.put((captured_at, frame))
+        finally:
+            self.frames.close()
+
+    def _inference_loop(self):
+        stats = self.stats["inference"]
+        last_angles, inferred_at = [None] * 10, None
+        try:
+            while self._running:
+                item = self.frames.get()
+                if item is None:
+                    break
+                captured_at, frame = item
+
+                if self.gate is not None and not self.gate.should_process(frame, captured_at):
+                    # Static scene: the previous result still holds
+                    if metrics.ENABLED:
+                        metrics.frames_gated_total.inc()
+                    self.results.put((captured_at, last_angles, captured_at - inferred_at))
+                    continue
+
+                started = time.perf_counter()
+                image_rgb, region = self.preprocessor.prepare(frame)
+                prepared = time.perf_counter()
+                results = self.hands.process(image_rgb)
+                if not results.multi_hand_landmarks and self.preprocessor.roi is not None:
+                    # Lost the hand inside the ROI: retry on the full frame
+                    self.preprocessor.reset()
+                    image_rgb, region = self.preprocessor.prepare(frame)
+                    results = self.hands.process(image_rgb)
+                processed = time.perf_counter()
+
+                if results.multi_hand_landmarks:
+                    hand_landmarks = results.multi_hand_landmarks[0]
+                    points = self.engine.load_landmarks(hand_landmarks.landmark)
+                    self.preprocessor.to_frame_coords(points, region)
+                    self.preprocessor.track(points, region)
+                    angles = self.engine.compute().tolist()
+                else:
+                    # No hand detected -> set angles to None
+                    self.preprocessor.track(None, region)
+                    angles = [None] * 10
+                finished = time.perf_counter()
+                stats.record(finished - started)
+                if self.gate is not None:
+                    self.gate.record(angles[0] is not None)
+                last_angles, inferred_at = angles, captured_at
+
+                if metrics.ENABLED:
+                    metrics.observe_stage("prepare", prepared - started)
+                    metrics.observe_stage("process", processed - prepared)
+                    metrics.observe_stage("extract", finished - processed)
+                    metrics.frames_total.inc()
+                    if angles[0] is not None:
+                        metrics.hands_detected_total.inc()
+
+                self.results.put((captured_at, angles, 0.0))
+        finally:
+            self.results.close()
+
+    def _publish_loop(self):
+        stats = self.stats["publish"]
+        end_to_end = self.stats["end_to_end"]
+        while self._running:
+            item = self.results.get()
+            if item is None:
+                break
+            captured_at, angles, age = item
+
+            started = time.perf_counter()
+            self.publish(angles, age)
+            finished = time.perf_counter()
+            stats.record(finished - started)
+            end_to_end.record(finished - captured_at)
+            if metrics.ENABLED:
+                metrics.observe_stage("publish", finished - started)
+                metrics.fps_meter.tick()
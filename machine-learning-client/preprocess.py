@@ -0,0 +1,123 @@
+"""
+Frame preprocessing for hand inference.
+
+Replaces the per-frame cv2.flip + cv2.cvtColor copies with a stage that:
+
+- skips the mirror flip (joint angles are unchanged by a reflection; the flip
+  was only cosmetic),
+- downsizes frames to a configurable inference width,
+- once a hand is found, crops a padded square region of interest (ROI)
+  around the last landmarks and falls back to the full frame when the hand
+  is lost,
+- writes resize and colour-conversion output into preallocated buffers via
+  cv2's dst= arguments, so steady-state frames allocate no new images.
+
+Landmarks detected in a downsized or cropped image are mapped back to
+full-frame normalized coordinates with to_frame_coords(), so angles are
+computed exactly as they would be on the full frame.
+"""
+
+import cv2
+import numpy as np
+
+
+class FramePreprocessor:
+    """
+    - max_width: frames wider than this are downsized before inference
+    - roi_tracking: crop around the previous hand instead of using the full frame
+    - roi_padding: extra margin around the landmark bounding box (fraction of its size)
+    - roi_size: side length (pixels) of the square image fed to inference for ROIs
+    - min_roi: smallest ROI side (pixels) in the source frame
+    """
+
+    def __init__(self, max_width=640, roi_tracking=True, roi_padding=0.5, roi_size=256,
+                 min_roi=64):
+        self.max_width = max_width
+        self.roi_tracking = roi_tracking
+        self.roi_padding = roi_padding
+        self.roi_size = roi_size
+        self.min_roi = min_roi
+        self.roi = None  # (x0, y0, side) in source-frame pixels
+        self._buffers = {}
+
+    def _buffer(self, name, shape, dtype):
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = self._buffers[name] = np.empty(shape, dtype=dtype)
+        return buffer
+
+    def prepare(self, frame):
+        """
+        Return (rgb_image, region) ready for hands.process().
+
+        region is (x0, y0, side_x, side_y, frame_width, frame_height): where
+        rgb_image sits in the source frame. Pass it back to to_frame_coords()
+        and track(). rgb_image is a reused buffer, valid until the next call.
+        """
+        height, width = frame.shape[:2]
+        channels = frame.shape[2]
+
+        if self.roi is not None:
+            x0, y0, side = self.roi
+            crop = frame[y0:y0 + side, x0:x0 + side]
+            size = (self.roi_size, self.roi_size)
+            region = (x0, y0, side, side, width, height)
+        else:
+            crop = frame
+            if width > self.max_width:
+                size = (self.max_width, round(height * self.max_width / width))
+            else:
+                size = (width, height)
+            region = (0, 0, width, height, width, height)
+
+        if size != (crop.shape[1], crop.shape[0]):
+            resized = self._buffer("resized", (size[1], size[0], channels), frame.dtype)
+            crop = cv2.resize(crop, size, dst=resized, interpolation=cv2.INTER_AREA)
+        rgb = self._buffer("rgb", (size[1], size[0], 3), frame.dtype)
+        cv2.cvtColor(crop, cv2.COLOR_BGR2RGB, dst=rgb)
+        return rgb, region
+
+    @staticmethod
+    def to_frame_coords(points, region):
+        """
+        Map (21, 3) landmark points normalized to the inference image into
+        points normalized to the full source frame (in place).
+        """
+        x0, y0, side_x, side_y, width, height = region
+        if (x0, y0, side_x, side_y) == (0, 0, width, height):
+            return points
+        points[:, 0] = (x0 + points[:, 0] * side_x) / width
+        points[:, 1] = (y0 + points[:, 1] * side_y) / height
+        # MediaPipe z uses roughly the same scale as x
+        points[:, 2] *= side_x / width
+        return points
+
+    def track(self, points, region):
+        """Update the ROI from full-frame landmark points, or None if the hand was lost"""
+        if not self.roi_tracking or points is None:
+            self.roi = None
+            return
+
+        width, height = region[4], region[5]
+        xs = points[:, 0] * width
+        ys = points[:, 1] * height
+        box = max(xs.max() - xs.min(), ys.max() - ys.min())
+        if not np.isfinite(box):
+            self.roi = None
+            return
+        side = max(int(box * (1.0 + 2.0 * self.roi_padding)), self.min_roi)
+
+        if side >= min(width, height):
+            # Hand fills most of the frame: cropping would not help
+            self.roi = None
+            return
+
+        cx = (xs.max() + xs.min()) / 2.0
+        cy = (ys.max() + ys.min()) / 2.0
+        # Shift the box to stay inside the frame instead of shrinking it
+        x0 = int(min(max(cx - side / 2.0, 0), width - side))
+        y0 = int(min(max(cy - side / 2.0, 0), height - side))
+        self.roi = (x0, y0, side)
+
+    def reset(self):
+        self.roi = None
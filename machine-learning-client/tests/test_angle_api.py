@@ -0,0 +1,68 @@
+import json
+import time
+from angle_api import app, latest_snapshot, publish_angles, stream_snapshots
+
+def test_publish_swaps_in_immutable_snapshot():
+    before = latest_snapshot()
+    snapshot = publish_angles([90.0] * 10)
+    assert latest_snapshot() is snapshot
+    assert snapshot.seq > before.seq
+    assert snapshot.hand_present
+    assert isinstance(snapshot.angles, tuple)
+    assert json.loads(snapshot.payload)['angles'] == [90.0] * 10
+
+def test_hand_angles_serves_preserialized_payload_with_seq():
+    snapshot = publish_angles([None] * 10)
+    client = app.test_client()
+    response = client.get('/hand-angles')
+    assert response.status_code == 200
+    assert response.data == snapshot.payload
+    data = response.get_json()
+    assert data['seq'] == snapshot.seq
+    assert data['hand_present'] == 0
+    assert response.headers['X-Frame-Seq'] == str(snapshot.seq)
+
+def test_hand_angles_not_modified_for_seen_frame():
+    snapshot = publish_angles([45.0] * 10)
+    client = app.test_client()
+    response = client.get('/hand-angles', headers={'If-None-Match': f'"{snapshot.seq}"'})
+    assert response.status_code == 304
+    publish_angles([46.0] * 10)
+    response = client.get('/hand-angles', headers={'If-None-Match': f'"{snapshot.seq}"'})
+    assert response.status_code == 200
+
+def test_stream_skips_unchanged_frames():
+    stream = stream_snapshots(keepalive=0.01)
+    first = publish_angles([10.0] * 10)
+    assert next(stream) == b"id: %d\ndata: %s\n\n" % (first.seq, first.payload)
+    publish_angles([10.0] * 10)
+    assert next(stream) == b": keep-alive\n\n"
+    changed = publish_angles([11.0] * 10)
+    assert next(stream).startswith(b"id: %d\n" % changed.seq)
+
+def test_recent_returns_last_frames_with_a_hand():
+    for value in range(5):
+        publish_angles([float(value)] * 10)
+    publish_angles([None] * 10)
+    client = app.test_client()
+    frames = client.get('/hand-angles/recent?k=3').get_json()['frames']
+    assert [frame['angles'][0] for frame in frames] == [2.0, 3.0, 4.0]
+
+def test_reused_angles_carry_age_and_stay_out_of_recent():
+    fresh = publish_angles([33.0] * 10)
+    assert json.loads(fresh.payload)['age'] == 0.0
+    reused = publish_angles([33.0] * 10, age=0.25)
+    assert reused.age == 0.25
+    assert json.loads(reused.payload)['age'] == 0.25
+    frames = app.test_client().get('/hand-angles/recent?k=2').get_json()['frames']
+    assert frames[-1]['seq'] == fresh.seq
+
+def test_recent_skips_stale_frames_and_consume_empties_window():
+    client = app.test_client()
+    client.get('/hand-angles/recent?consume=1')
+    publish_angles([5.0] * 10, timestamp=time.time() - 10)
+    assert client.get('/hand-angles/recent?k=5').get_json()['frames'] == []
+    fresh = publish_angles([6.0] * 10)
+    frames = client.get('/hand-angles/recent?k=5&consume=1').get_json()['frames']
+    assert [frame['seq'] for frame in frames] == [fresh.seq]
+    assert client.get('/hand-angles/recent?k=5').get_json()['frames'] == []
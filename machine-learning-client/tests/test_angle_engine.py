@@ -0,0 +1,33 @@
+import numpy as np
+from collections import namedtuple
+from angle_engine import AngleEngine, JOINT_TRIPLETS, joint_angles
+from main import calculate_angle, extract_hand_angles
+
+# Simulated landmark object
+Landmark = namedtuple('Landmark', ['x', 'y', 'z'])
+
+def random_hand(seed=0):
+    rng = np.random.default_rng(seed)
+    return [Landmark(*point) for point in rng.random((21, 3))]
+
+def test_engine_matches_calculate_angle():
+    landmarks = random_hand()
+    expected = [calculate_angle(landmarks[a], landmarks[b], landmarks[c])
+                for a, b, c in JOINT_TRIPLETS]
+    assert np.allclose(AngleEngine().angles_from_landmarks(landmarks), expected)
+    assert np.allclose(extract_hand_angles(landmarks), expected)
+
+def test_joint_angles_accepts_stacks():
+    hands = [random_hand(seed) for seed in range(5)]
+    stack = np.array([[(lm.x, lm.y, lm.z) for lm in hand] for hand in hands])
+    angles = joint_angles(stack)
+    assert angles.shape == (5, 10)
+    for hand, row in zip(hands, angles):
+        assert np.allclose(AngleEngine().angles_from_landmarks(hand), row)
+
+def test_engine_results_are_not_overwritten():
+    engine = AngleEngine()
+    first = engine.angles_from_landmarks(random_hand(1))
+    snapshot = first.copy()
+    engine.angles_from_landmarks(random_hand(2))
+    assert np.array_equal(first, snapshot)
@@ -0,0 +1,62 @@
+import os
+import cv2
+import numpy as np
+from batch_angles import iter_frames, output_name, process_source
+from test_pipeline import FakeHands
+
+def write_images(directory, count):
+    os.makedirs(directory)
+    for i in range(count):
+        cv2.imwrite(os.path.join(directory, f"frame{i:03d}.png"), np.full((48, 64, 3), i, np.uint8))
+
+def load_chunks(out_dir, name):
+    parts = sorted(f for f in os.listdir(out_dir) if f.startswith(name + ".part-"))
+    chunks = [np.load(os.path.join(out_dir, part)) for part in parts]
+    return parts, {key: np.concatenate([c[key] for c in chunks]) for key in chunks[0].files}
+
+def test_image_directory_is_written_in_chunks(tmp_path):
+    images = str(tmp_path / "images")
+    out_dir = str(tmp_path / "out")
+    os.makedirs(out_dir)
+    write_images(images, 5)
+
+    summary = process_source(images, out_dir, FakeHands(), chunk_size=2)
+    assert summary['frames'] == 5 and summary['hands_detected'] == 3
+    assert summary['fps'] > 0 and not summary['skipped']
+
+    parts, data = load_chunks(out_dir, output_name(images))
+    assert len(parts) == 3
+    assert data['frame_index'].tolist() == [0, 1, 2, 3, 4]
+    assert data['file_name'][1] == 'frame001.png'
+    assert data['angles'].shape == (5, 10) and data['angles'].dtype == np.float32
+    assert data['hand_present'].tolist() == [True, False, True, False, True]
+    assert np.isnan(data['angles'][1]).all()
+
+def test_finished_inputs_are_skipped_and_partial_ones_resume(tmp_path):
+    images = str(tmp_path / "images")
+    out_dir = str(tmp_path / "out")
+    os.makedirs(out_dir)
+    write_images(images, 5)
+    name = output_name(images)
+
+    process_source(images, out_dir, FakeHands(), chunk_size=2)
+    hands = FakeHands()
+    assert process_source(images, out_dir, hands, chunk_size=2)['skipped']
+    assert hands.calls == 0
+
+    # Simulate an interruption after the first two chunks
+    os.remove(os.path.join(out_dir, name + ".done"))
+    os.remove(os.path.join(out_dir, name + ".part-00002.npz"))
+    summary = process_source(images, out_dir, hands, chunk_size=2)
+    assert hands.calls == 1
+    assert summary['processed'] == 1 and summary['frames'] == 5
+    assert load_chunks(out_dir, name)[1]['frame_index'].tolist() == [0, 1, 2, 3, 4]
+
+def test_iter_frames_reads_video_from_offset(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for i in range(6):
+        writer.write(np.full((48, 64, 3), i * 20, np.uint8))
+    writer.release()
+    assert [index for index, *_ in iter_frames(path)] == list(range(6))
+    assert [index for index, *_ in iter_frames(path, start=4)] == [4, 5]
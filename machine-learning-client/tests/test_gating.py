@@ -0,0 +1,35 @@
+import numpy as np
+from gating import MotionGate
+
+def blank(value=0):
+    return np.full((120, 160, 3), value, dtype=np.uint8)
+
+def test_static_frames_are_skipped_until_stale():
+    gate = MotionGate(max_staleness=0.5)
+    assert gate.should_process(blank(), 0.0)
+    assert not gate.should_process(blank(), 0.1)
+    assert not gate.should_process(blank(), 0.4)
+    assert gate.should_process(blank(), 0.5)
+    assert gate.snapshot()['skipped'] == 2
+
+def test_motion_triggers_inference():
+    gate = MotionGate(max_staleness=10)
+    assert gate.should_process(blank(), 0.0)
+    moved = blank()
+    moved[40:80, 60:100] = 255
+    assert gate.should_process(moved, 0.1)
+    # The moved frame is the new reference
+    assert not gate.should_process(moved.copy(), 0.2)
+
+def test_small_changes_count_only_while_a_hand_is_visible():
+    gate = MotionGate(threshold=12, max_staleness=10)
+    assert gate.should_process(blank(100), 0.0)
+    assert not gate.should_process(blank(108), 0.1)
+    gate.record(True)
+    assert gate.should_process(blank(108), 0.2)
+
+def test_reset_forces_inference():
+    gate = MotionGate(max_staleness=10)
+    gate.should_process(blank(), 0.0)
+    gate.reset()
+    assert gate.should_process(blank(), 0.1)
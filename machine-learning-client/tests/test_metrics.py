@@ -0,0 +1,44 @@
+import metrics
+from angle_api import app
+from metrics import Histogram, RateLimiter, RateMeter, Registry
+from pipeline import AnglePipeline, StageStats
+from test_pipeline import FakeCapture, FakeHands
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = registry.register(Histogram('demo_seconds', 'Demo', buckets=(0.01, 0.1)))
+    for value in (0.005, 0.05, 0.5):
+        histogram.observe(value)
+    text = registry.render()
+    assert 'demo_seconds_bucket{le="0.01"} 1' in text
+    assert 'demo_seconds_bucket{le="0.1"} 2' in text
+    assert 'demo_seconds_bucket{le="+Inf"} 3' in text
+    assert 'demo_seconds_count 3' in text
+
+def test_rate_meter_and_limiter():
+    meter = RateMeter(window=10)
+    for i in range(31):
+        meter.tick(now=i / 30)
+    assert abs(meter.rate(now=1.0) - 30.0) < 1e-6
+    limiter = RateLimiter(interval=60)
+    assert limiter.allow()
+    assert not limiter.allow()
+
+def test_metrics_endpoint_is_opt_in(monkeypatch):
+    client = app.test_client()
+    monkeypatch.setattr(metrics, 'ENABLED', False)
+    assert client.get('/metrics').status_code == 404
+
+    monkeypatch.setattr(metrics, 'ENABLED', True)
+    pipeline = AnglePipeline(FakeCapture(4), FakeHands(), lambda angles, age: None, queue_size=10)
+    pipeline.start().join(timeout=5)
+    text = client.get('/metrics').get_data(as_text=True)
+    for stage in ('decode', 'prepare', 'process', 'extract', 'publish'):
+        assert f'angle_stage_seconds_count{{stage="{stage}"}}' in text
+    assert 'angle_detection_rate' in text
+    assert '# TYPE angle_frames_dropped_total counter' in text
+
+def test_drops_feed_the_dropped_frames_counter():
+    counter = metrics.Counter('dropped_total', 'test')
+    StageStats('inference', counter).record_drop(3)
+    assert counter.value == 3
@@ -0,0 +1,91 @@
+import time
+import numpy as np
+from collections import namedtuple
+from types import SimpleNamespace
+from gating import MotionGate
+from pipeline import AnglePipeline, LatestQueue, StageStats
+
+Landmark = namedtuple('Landmark', ['x', 'y', 'z'])
+
+class FakeCapture:
+    """Yields a fixed number of blank frames, then reports end of stream"""
+    def __init__(self, frames):
+        self.remaining = frames
+
+    def read(self):
+        if self.remaining == 0:
+            return False, None
+        self.remaining -= 1
+        return True, np.zeros((4, 4, 3), dtype=np.uint8)
+
+class FakeHands:
+    """Alternates between a detected hand and an empty frame"""
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+
+    def process(self, image):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.calls % 2:
+            hand = SimpleNamespace(landmark=[Landmark(x, x * x, 0) for x in range(21)])
+            return SimpleNamespace(multi_hand_landmarks=[hand])
+        return SimpleNamespace(multi_hand_landmarks=None)
+
+class Recorder:
+    """Publish callback that keeps every (angles, age) pair"""
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, angles, age):
+        self.calls.append((angles, age))
+
+    @property
+    def angles(self):
+        return [angles for angles, _ in self.calls]
+
+def test_latest_queue_keeps_newest_and_counts_drops():
+    stats = StageStats('consumer')
+    queue = LatestQueue(maxsize=2, stats=stats)
+    for item in range(5):
+        queue.put(item)
+    assert queue.get() == 3
+    assert queue.get() == 4
+    assert stats.snapshot()['dropped'] == 3
+    queue.close()
+    assert queue.get() is None
+
+def test_pipeline_publishes_every_frame_when_fast():
+    recorder = Recorder()
+    pipeline = AnglePipeline(FakeCapture(6), FakeHands(), recorder, queue_size=10)
+    pipeline.start().join(timeout=5)
+    published = recorder.angles
+    assert len(published) == 6
+    assert len(published[0]) == 10 and published[0][0] is not None
+    assert published[1] == [None] * 10
+    stats = pipeline.get_stats()
+    assert stats['publish']['processed'] == 6
+    assert stats['end_to_end']['processed'] == 6
+
+def test_pipeline_drops_stale_frames_behind_slow_inference():
+    pipeline = AnglePipeline(FakeCapture(50), FakeHands(delay=0.01), Recorder())
+    pipeline.start().join(timeout=5)
+    stats = pipeline.get_stats()
+    assert stats['capture']['processed'] == 50
+    assert stats['inference']['dropped'] > 0
+    assert stats['inference']['processed'] + stats['inference']['dropped'] == 50
+
+def test_gated_pipeline_reuses_angles_for_static_frames():
+    recorder = Recorder()
+    hands = FakeHands()
+    gate = MotionGate(max_staleness=60)
+    pipeline = AnglePipeline(FakeCapture(5), hands, recorder, queue_size=10, gate=gate)
+    pipeline.start().join(timeout=5)
+    # Identical blank frames: only the first one goes through inference
+    assert hands.calls == 1
+    assert len(recorder.calls) == 5
+    first_angles, first_age = recorder.calls[0]
+    assert first_angles[0] is not None and first_age == 0.0
+    assert all(angles == first_angles for angles, _ in recorder.calls)
+    assert all(age > 0.0 for _, age in recorder.calls[1:])
+    assert pipeline.get_stats()['gate']['skipped'] == 4
@@ -0,0 +1,43 @@
+import numpy as np
+from angle_engine import joint_angles
+from preprocess import FramePreprocessor
+
+def test_full_frame_is_downsized_into_reused_buffer():
+    preprocessor = FramePreprocessor(max_width=320, roi_tracking=False)
+    frame = np.empty((480, 640, 3), dtype=np.uint8)
+    frame[:] = (10, 20, 30)
+    first, region = preprocessor.prepare(frame)
+    second, _ = preprocessor.prepare(frame)
+    assert first.shape == (240, 320, 3)
+    assert first is second
+    assert region == (0, 0, 640, 480, 640, 480)
+    # BGR -> RGB without the cosmetic flip
+    assert first[0, 0].tolist() == [30, 20, 10]
+
+def test_roi_landmarks_map_back_to_frame_coords():
+    preprocessor = FramePreprocessor(roi_padding=0.5)
+    rng = np.random.default_rng(1)
+    points = np.column_stack([0.4 + rng.random(21) * 0.1, 0.5 + rng.random(21) * 0.1, rng.random(21) * 0.01])
+    preprocessor.track(points, (0, 0, 640, 480, 640, 480))
+    x0, y0, side = preprocessor.roi
+    assert 64 <= side < 480
+
+    # What the detector would report inside the crop, normalized to the crop
+    region = (x0, y0, side, side, 640, 480)
+    local = points.copy()
+    local[:, 0] = (points[:, 0] * 640 - x0) / side
+    local[:, 1] = (points[:, 1] * 480 - y0) / side
+    local[:, 2] = points[:, 2] * 640 / side
+    assert np.allclose(FramePreprocessor.to_frame_coords(local, region), points)
+
+def test_lost_hand_falls_back_to_full_frame():
+    preprocessor = FramePreprocessor()
+    preprocessor.roi = (10, 10, 100)
+    preprocessor.track(None, (10, 10, 100, 100, 640, 480))
+    assert preprocessor.roi is None
+
+def test_dropping_the_flip_keeps_angles():
+    points = np.random.default_rng(2).random((21, 3))
+    mirrored = points.copy()
+    mirrored[:, 0] = 1.0 - mirrored[:, 0]
+    assert np.allclose(joint_angles(points), joint_angles(mirrored))
@@ -0,0 +1,50 @@
+import threading
+import time
+import webcam_streamer
+from webcam_streamer import FrameBroadcaster, SyntheticSource
+
+class CountingSource(SyntheticSource):
+    """Synthetic source that stops after a fixed number of frames"""
+    def __init__(self, frames):
+        super().__init__(64, 48)
+        self.remaining = frames
+
+    def read(self):
+        if self.remaining == 0:
+            return False, None
+        self.remaining -= 1
+        return super().read()
+
+def test_subscribers_share_each_encoded_frame():
+    broadcaster = FrameBroadcaster(CountingSource(20), max_fps=200)
+    first = broadcaster.subscribe(timeout=1)
+    second = broadcaster.subscribe(timeout=1)
+    chunk_a = next(first)
+    chunk_b = next(second)
+    assert chunk_a.startswith(b'--frame\r\nContent-Type: image/jpeg')
+    assert chunk_a.endswith(b'\r\n')
+    list(first)
+    list(second)
+    # One encode per captured frame, however many viewers there are
+    assert broadcaster.frames_encoded == 20
+    assert broadcaster.latest()[0] == 20
+
+def test_frames_are_resized_before_encoding():
+    broadcaster = FrameBroadcaster(CountingSource(1), width=32, height=24, max_fps=0)
+    assert next(broadcaster.subscribe(timeout=1))
+    assert broadcaster._resized.shape == (24, 32, 3)
+
+def test_concurrent_first_clients_open_the_camera_once(monkeypatch):
+    opened = []
+    def fake_capture(device):
+        opened.append(device)
+        time.sleep(0.05)  # widen the window two clients could race through
+        return SyntheticSource(32, 24)
+    monkeypatch.setattr(webcam_streamer.cv2, 'VideoCapture', fake_capture)
+    monkeypatch.setattr(webcam_streamer, 'broadcaster', None)
+    threads = [threading.Thread(target=webcam_streamer.default_broadcaster) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert opened == [0]
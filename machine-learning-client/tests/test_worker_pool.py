@@ -0,0 +1,85 @@
+import time
+import pytest
+from angle_api import app, attach_sources
+from worker_pool import SharedAngleTable, WorkerPool, parse_sources
+
+def fake_worker(source_id, url, table_name, source_ids, stop):
+    """Stands in for run_source: publishes a fixed angle per source"""
+    table = SharedAngleTable(source_ids, name=table_name)
+    try:
+        while not stop.wait(0.01):
+            table.write(source_id, [float(url)] * 10)
+    finally:
+        table.close()
+
+def test_parse_sources():
+    assert parse_sources("a=http://cam-a:8554, b=rtsp://cam-b") == {
+        'a': 'http://cam-a:8554', 'b': 'rtsp://cam-b'
+    }
+    assert parse_sources("http://cam:8554") == {'0': 'http://cam:8554'}
+    assert parse_sources("") == {}
+    for reserved in ("stream", "recent", "sources"):
+        with pytest.raises(ValueError, match=reserved):
+            parse_sources(f"a=http://cam-a:8554,{reserved}=rtsp://cam-b")
+
+def test_shared_table_round_trip():
+    table = SharedAngleTable(['left', 'right'])
+    try:
+        assert table.read('left')[0] == 0
+        table.write('left', [1.5] * 10, age=0.2, timestamp=100.0)
+        table.write('right', [None] * 10)
+        assert table.read('left') == (1, 100.0, (1.5,) * 10, 0.2)
+        assert table.read('right')[2] == (None,) * 10
+
+        reader = SharedAngleTable(['left', 'right'], name=table.name)
+        assert reader.read('left')[2] == (1.5,) * 10
+        reader.close()
+    finally:
+        table.close()
+
+def test_read_survives_writer_dying_mid_write():
+    table = SharedAngleTable(['cam'])
+    try:
+        table.write('cam', [3.0] * 10, timestamp=50.0)
+        assert table.read('cam') == (1, 50.0, (3.0,) * 10, 0.0)
+        table.rows[0][0] += 1  # a writer died between its two increments
+        started = time.monotonic()
+        assert table.read('cam') == (1, 50.0, (3.0,) * 10, 0.0)
+        assert time.monotonic() - started < 1.0
+        table.reset('cam')
+        table.write('cam', [4.0] * 10, timestamp=60.0)
+        assert table.read('cam') == (3, 60.0, (4.0,) * 10, 0.0)
+    finally:
+        table.close()
+
+def test_source_endpoint_serves_shared_rows():
+    table = SharedAngleTable(['kiosk'])
+    attach_sources(table)
+    try:
+        client = app.test_client()
+        assert client.get('/hand-angles/kiosk').get_json()['angles'] == []
+        table.write('kiosk', [42.0] * 10)
+        response = client.get('/hand-angles/kiosk')
+        assert response.get_json()['angles'] == [42.0] * 10
+        assert response.headers['X-Frame-Seq'] == '1'
+        cached = client.get('/hand-angles/kiosk', headers={'If-None-Match': '"1"'})
+        assert cached.status_code == 304
+        assert client.get('/hand-angles/missing').status_code == 404
+        assert client.get('/hand-angles/sources').get_json() == {'sources': ['kiosk']}
+    finally:
+        attach_sources(None)
+        table.close()
+
+def test_pool_runs_one_process_per_source():
+    pool = WorkerPool({'a': '1', 'b': '2'}, target=fake_worker).start()
+    try:
+        deadline = time.monotonic() + 20
+        while time.monotonic() < deadline:
+            if all(pool.table.read(source)[0] > 0 for source in ('a', 'b')):
+                break
+            time.sleep(0.05)
+        assert pool.table.read('a')[2] == (1.0,) * 10
+        assert pool.table.read('b')[2] == (2.0,) * 10
+        assert pool.alive() == {'a': True, 'b': True}
+    finally:
+        pool.stop()
@@ -1,23 +1,224 @@
-from flask import Flask, Response
+"""
+MJPEG webcam streamer.
+
+One producer thread owns the camera: it captures each frame once, encodes it
+to JPEG once and stores the ready-to-send multipart chunk in a small ring
+buffer. Every connected client reads the same chunk objects from that ring,
+so extra viewers neither steal frames from each other nor add encode cost.
+
+Usage:
+    python webcam_streamer.py [--width 640 --height 480 --quality 80 --fps 30]
+    python webcam_streamer.py --synthetic   # no camera needed (benchmarks)
+"""
+
+import argparse
+import os
+import time
+from threading import Condition, Lock, Thread
+
 import cv2
+import numpy as np
+from flask import Flask, Response
 
 app = Flask(__name__)
-cap = cv2.VideoCapture(0)
-
-def generate_frames():
-    while True:
-        success, frame = cap.read()
-        if not success:
-            break
-        _, buffer = cv2.imencode('.jpg', frame)
-        frame_bytes = buffer.tobytes()
-        yield (b'--frame\r\n'
-               b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-
-@app.route('/')
+
+
+class SyntheticSource:
+    """Camera stand-in that renders a moving test pattern"""
+
+    def __init__(self, width=640, height=480):
+        self.width = width
+        self.height = height
+        self._frame = np.zeros((height, width, 3), dtype=np.uint8)
+        self._gradient = np.linspace(0, 255, width, dtype=np.uint8)
+        self._count = 0
+
+    def isOpened(self):  # pylint: disable=invalid-name
+        return True
+
+    def read(self):
+        self._frame[:, :, 0] = self._gradient
+        self._frame[:, :, 1] = (self._count * 4) % 256
+        x = (self._count * 8) % self.width
+        self._frame[:, :, 2] = 0
+        self._frame[:, x : x + 40, 2] = 255
+        self._count += 1
+        return True, self._frame
+
+    def release(self):
+        pass
+
+
+class FrameBroadcaster:
+    """
+    Single capture-and-encode producer feeding any number of MJPEG clients.
+
+    - source: object with read() -> (success, frame), e.g. cv2.VideoCapture
+    - width/height: optional output resolution (frames are resized if set)
+    - quality: JPEG quality (0-100)
+    - max_fps: cap on produced frames per second (0 = as fast as the source)
+    - ring_size: number of recent encoded frames kept for subscribers
+    """
+
+    def __init__(self, source, width=None, height=None, quality=80, max_fps=30, ring_size=4):
+        self.source = source
+        self.size = (width, height) if width and height else None
+        self.encode_params = [int(cv2.IMWRITE_JPEG_QUALITY), int(quality)]
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.ring = [None] * ring_size
+        self.seq = 0
+        self.frames_encoded = 0
+        self.encode_seconds = 0.0
+
+        self._cond = Condition()
+        self._running = False
+        self._thread = None
+        self._start_lock = Lock()
+        self._resized = None
+
+    def start(self):
+        """Start the producer thread (idempotent)"""
+        with self._start_lock:
+            if self._thread is None:
+                self._running = True
+                self._thread = Thread(target=self._produce, daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+
+    def latest(self):
+        """Return (seq, chunk) of the newest encoded frame, or (0, None)"""
+        with self._cond:
+            if self.seq == 0:
+                return 0, None
+            return self.seq, self.ring[self.seq % len(self.ring)]
+
+    def subscribe(self, timeout=5.0):
+        """
+        Generator of multipart MJPEG chunks for one client.
+
+        Yields the shared chunk objects directly (no per-client copy). A
+        client that falls behind skips straight to the newest frame.
+        """
+        self.start()
+        seen = 0
+        while True:
+            with self._cond:
+                if not self._cond.wait_for(
+                    lambda: self.seq != seen or not self._running, timeout
+                ):
+                    return
+                if self.seq == seen:
+                    # Producer stopped and there is nothing new to send
+                    return
+                seen = self.seq
+                chunk = self.ring[seen % len(self.ring)]
+            yield chunk
+
+    def _encode(self, frame):
+        started = time.perf_counter()
+        if self.size is not None and (frame.shape[1], frame.shape[0]) != self.size:
+            if self._resized is None:
+                self._resized = np.empty(
+                    (self.size[1], self.size[0], frame.shape[2]), dtype=frame.dtype
+                )
+            frame = cv2.resize(frame, self.size, dst=self._resized, interpolation=cv2.INTER_AREA)
+        _, buffer = cv2.imencode(".jpg", frame, self.encode_params)
+        jpeg = buffer.tobytes()
+        chunk = b"".join(
+            (
+                b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: ",
+                str(len(jpeg)).encode("ascii"),
+                b"\r\n\r\n",
+                jpeg,
+                b"\r\n",
+            )
+        )
+        self.encode_seconds += time.perf_counter() - started
+        self.frames_encoded += 1
+        return chunk
+
+    def _produce(self):
+        next_frame = time.perf_counter()
+        while self._running:
+            success, frame = self.source.read()
+            if not success:
+                break
+            chunk = self._encode(frame)
+            with self._cond:
+                self.seq += 1
+                self.ring[self.seq % len(self.ring)] = chunk
+                self._cond.notify_all()
+
+            if self.min_interval:
+                next_frame += self.min_interval
+                delay = next_frame - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_frame = time.perf_counter()
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+
+
+# Created by configure(); the camera is only opened when the streamer runs
+broadcaster = None
+_configure_lock = Lock()
+
+
+def configure(source=None, **options):
+    """Create the shared broadcaster (defaults to the first local camera)"""
+    global broadcaster
+    with _configure_lock:
+        if source is None:
+            source = cv2.VideoCapture(0)
+        broadcaster = FrameBroadcaster(source, **options)
+        return broadcaster
+
+
+def default_broadcaster():
+    """The shared broadcaster; the first local camera is opened once if none was configured"""
+    global broadcaster
+    if broadcaster is None:
+        with _configure_lock:
+            if broadcaster is None:
+                broadcaster = FrameBroadcaster(cv2.VideoCapture(0))
+    return broadcaster
+
+
+@app.route("/")
 def video_feed():
-    return Response(generate_frames(),
-                    mimetype='multipart/x-mixed-replace; boundary=frame')
+    return Response(
+        default_broadcaster().subscribe(), mimetype="multipart/x-mixed-replace; boundary=frame"
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a webcam as an MJPEG stream")
+    parser.add_argument("--device", type=int, default=int(os.environ.get("CAMERA_DEVICE", 0)))
+    parser.add_argument("--width", type=int, default=int(os.environ.get("STREAM_WIDTH", 0)))
+    parser.add_argument("--height", type=int, default=int(os.environ.get("STREAM_HEIGHT", 0)))
+    parser.add_argument("--quality", type=int, default=int(os.environ.get("STREAM_QUALITY", 80)))
+    parser.add_argument("--fps", type=float, default=float(os.environ.get("STREAM_FPS", 30)))
+    parser.add_argument("--synthetic", action="store_true", help="use a generated test pattern")
+    parser.add_argument("--port", type=int, default=8554)
+    return parser.parse_args(argv)
+
 
-if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=8554)
+if __name__ == "__main__":
+    args = parse_args()
+    if args.synthetic:
+        video_source = SyntheticSource(args.width or 640, args.height or 480)
+    else:
+        video_source = cv2.VideoCapture(args.device)
+    configure(
+        video_source, width=args.width, height=args.height, quality=args.quality, max_fps=args.fps
+    ).start()
+    app.run(host="0.0.0.0", port=args.port, threaded=True)
@@ -0,0 +1,246 @@
+"""
+One capture + inference process per video source.
+
+MediaPipe inference holds the GIL for most of each frame, so several cameras
+in one process compete for a single core. WorkerPool starts a separate
+process per configured source instead; each runs the usual AnglePipeline and
+writes its newest result into one row of a SharedAngleTable. The API process
+reads those rows directly from shared memory, with no pipes or sockets in
+between.
+
+Each row is guarded by a sequence counter (a seqlock): the writer makes it
+odd while updating and even when done, and readers retry if it changed
+underneath them. Writers never wait for readers and readers never block for
+long: a counter left odd by a worker that died mid-write makes read() return
+the last consistent frame after READ_TIMEOUT, and the row is reset before the
+worker is restarted.
+"""
+
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+NUM_ANGLES = 10
+
+# Row layout: [seq, timestamp, age, angle_0 .. angle_9]; NaN marks no hand
+_SEQ, _TIMESTAMP, _AGE, _ANGLES = 0, 1, 2, 3
+ROW_SIZE = _ANGLES + NUM_ANGLES
+
+# Seconds a reader retries a row that is being written before giving up
+READ_TIMEOUT = 0.05
+
+# /hand-angles/<source_id> cannot reach a source with one of these IDs: the
+# API's fixed routes of the same name take precedence
+RESERVED_SOURCE_IDS = frozenset({"recent", "sources", "stream"})
+
+
+def parse_sources(spec):
+    """
+    Parse "id=url,id=url" (e.g. from VIDEO_SOURCES) into an ordered dict.
+
+    A value without "id=" gets its position as ID ("0", "1", ...). Raises
+    ValueError for an ID in RESERVED_SOURCE_IDS.
+    """
+    sources = {}
+    for position, item in enumerate(filter(None, (part.strip() for part in spec.split(",")))):
+        source_id, sep, url = item.partition("=")
+        if not sep:
+            source_id, url = str(position), item
+        source_id = source_id.strip()
+        if source_id in RESERVED_SOURCE_IDS:
+            raise ValueError(
+                f"Video source ID {source_id!r} is reserved (shadowed by /hand-angles/{source_id}); "
+                "choose another"
+            )
+        sources[source_id] = url.strip()
+    return sources
+
+
+class SharedAngleTable:
+    """
+    Latest angles per source in a shared memory block.
+
+    - source_ids: ordered source IDs (one row each)
+    - name: attach to an existing block instead of creating one
+    """
+
+    def __init__(self, source_ids, name=None):
+        self.source_ids = list(source_ids)
+        self.index = {source_id: i for i, source_id in enumerate(self.source_ids)}
+        size = len(self.source_ids) * ROW_SIZE * 8
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        self.rows = np.ndarray((len(self.source_ids), ROW_SIZE), dtype=np.float64, buffer=self.shm.buf)
+        self._last_read = {}
+        if self.owner:
+            self.rows[:] = 0.0
+            self.rows[:, _ANGLES:] = np.nan
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, source_id, angles, age=0.0, timestamp=None):
+        """Store a frame of angles (10 floats or [None] * 10) for a source"""
+        row = self.rows[self.index[source_id]]
+        values = [np.nan if a is None else a for a in angles]
+        row[_SEQ] += 1  # odd: update in progress
+        row[_TIMESTAMP] = time.time() if timestamp is None else timestamp
+        row[_AGE] = age
+        row[_ANGLES:] = values
+        row[_SEQ] += 1  # even: consistent
+
+    def reset(self, source_id):
+        """
+        Make a source's row consistent again after its writer died, possibly
+        mid-write (call before a new writer starts on the row)
+        """
+        row = self.rows[self.index[source_id]]
+        if row[_SEQ] % 2:
+            row[_ANGLES:] = np.nan
+            row[_SEQ] += 1
+
+    def read(self, source_id):
+        """
+        Return (seq, timestamp, angles, age) for a source; angles is a tuple
+        of floats, or of None when no hand was detected. seq 0 means the
+        source has not produced a frame yet. Raises KeyError for unknown IDs.
+
+        If the row stays mid-write for READ_TIMEOUT (its writer died), the
+        last frame this table read for the source is returned instead.
+        """
+        row = self.rows[self.index[source_id]]
+        deadline = None
+        while True:
+            seq = row[_SEQ]
+            if seq % 2 == 0:
+                values = row.copy()
+                if row[_SEQ] == seq:
+                    break
+            if deadline is None:
+                deadline = time.monotonic() + READ_TIMEOUT
+            elif time.monotonic() > deadline:
+                return self._last_read.get(source_id, (0, 0.0, (None,) * NUM_ANGLES, 0.0))
+            time.sleep(0)
+        angles = tuple(None if np.isnan(a) else float(a) for a in values[_ANGLES:])
+        result = int(seq // 2), float(values[_TIMESTAMP]), angles, float(values[_AGE])
+        self._last_read[source_id] = result
+        return result
+
+    def close(self):
+        """Detach; the creating process also frees the block"""
+        self.rows = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def run_source(source_id, url, table_name, source_ids, stop):
+    """
+    Worker process entry point: run the capture/inference pipeline for one
+    source until `stop` is set or the stream ends.
+    """
+    # Imported here so the parent process never loads MediaPipe
+    import cv2
+    import mediapipe as mp
+
+    from gating import MotionGate
+    from pipeline import AnglePipeline
+    from preprocess import FramePreprocessor
+
+    table = SharedAngleTable(source_ids, name=table_name)
+    # This process is now the row's only writer
+    table.reset(source_id)
+    capture = cv2.VideoCapture(url)
+    hands = mp.solutions.hands.Hands(
+        max_num_hands=1, min_detection_confidence=0.7, min_tracking_confidence=0.5
+    )
+    gate = None
+    if os.environ.get("MOTION_GATING", "1") == "1":
+        gate = MotionGate(
+            threshold=float(os.environ.get("MOTION_THRESHOLD", 12)),
+            max_staleness=float(os.environ.get("MAX_STALENESS", 0.5)),
+        )
+    preprocessor = FramePreprocessor(
+        max_width=int(os.environ.get("INFERENCE_WIDTH", 640)),
+        roi_tracking=os.environ.get("ROI_TRACKING", "1") == "1",
+    )
+
+    def publish(angles, age):
+        table.write(source_id, angles, age)
+
+    pipeline = AnglePipeline(capture, hands, publish, preprocessor=preprocessor, gate=gate).start()
+    try:
+        while not stop.wait(0.5):
+            if not pipeline.is_alive():
+                break
+    finally:
+        pipeline.stop()
+        pipeline.join(2.0)
+        capture.release()
+        table.close()
+
+
+class WorkerPool:
+    """
+    Starts and supervises one worker process per video source.
+
+    - sources: {source_id: video URL or device}
+    - target: worker entry point (same signature as run_source)
+    - restart_delay: seconds before a crashed or finished worker is restarted
+    """
+
+    def __init__(self, sources, target=run_source, restart_delay=2.0):
+        self.sources = dict(sources)
+        self.target = target
+        self.restart_delay = restart_delay
+        self.table = SharedAngleTable(self.sources)
+        # spawn: forking a process that already runs threads is unsafe
+        self._context = multiprocessing.get_context("spawn")
+        self._stop = self._context.Event()
+        self._processes = {}
+        self._exited_at = {}
+
+    def _spawn(self, source_id):
+        # A worker killed mid-write leaves its row's sequence odd
+        self.table.reset(source_id)
+        process = self._context.Process(
+            target=self.target,
+            args=(source_id, self.sources[source_id], self.table.name,
+                  self.table.source_ids, self._stop),
+            name=f"angles-{source_id}",
+            daemon=True,
+        )
+        process.start()
+        self._processes[source_id] = process
+
+    def start(self):
+        for source_id in self.sources:
+            self._spawn(source_id)
+        return self
+
+    def supervise(self):
+        """Restart workers that exited (call periodically from the parent)"""
+        now = time.monotonic()
+        for source_id, process in list(self._processes.items()):
+            if process.is_alive() or self._stop.is_set():
+                continue
+            exited_at = self._exited_at.setdefault(source_id, now)
+            if now - exited_at >= self.restart_delay:
+                del self._exited_at[source_id]
+                self._spawn(source_id)
+
+    def alive(self):
+        """{source_id: whether its worker process is running}"""
+        return {source_id: process.is_alive() for source_id, process in self._processes.items()}
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        for process in self._processes.values():
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self.table.close()
@@ -14,16 +14,26 @@ db.createCollection('gesture_passwords');
 db.createCollection('documents');
 db.createCollection('authentication_logs');
 db.createCollection('gesture_training_sessions');
+// Document access history: append-only, one entry per access, bucketed by document
+db.createCollection('document_access_logs', {
+  timeseries: { timeField: "timestamp", metaField: "meta", granularity: "seconds" }
+});
+// Per-save history: the patch (or, for full saves, the content) behind each revision
+db.createCollection('document_revisions');
 
 // Create indexes for better query performance
 db.users.createIndex({ "username": 1 }, { unique: true });
 db.users.createIndex({ "email": 1 }, { unique: true });
-db.gesture_passwords.createIndex({ "user_id": 1 });
-db.documents.createIndex({ "user_id": 1 });
+// A user's active gesture password (logins normally read the copy in users.active_gesture)
+db.gesture_passwords.createIndex({ "user_id": 1, "active": 1 });
+// Document listing: a user's documents newest first, paged by (updated_at, _id)
+db.documents.createIndex({ "user_id": 1, "updated_at": -1, "_id": -1 });
 db.documents.createIndex({ "updated_at": 1 });
 db.authentication_logs.createIndex({ "user_id": 1, "timestamp": 1 });
 db.authentication_logs.createIndex({ "success": 1 });
 db.gesture_training_sessions.createIndex({ "user_id": 1 });
+db.document_access_logs.createIndex({ "meta.document_id": 1, "timestamp": -1 });
+db.document_revisions.createIndex({ "document_id": 1, "revision": 1 }, { unique: true });
 
 // Create a demo user with model-based authentication
 const demoUserId = ObjectId();
@@ -36,14 +46,7 @@ db.users.insertOne({
   "email": "demo@example.com",
   "created_at": new Date(),
   "last_login": new Date(),
-  "gesture_password_id": demoGestureId,
-  "documents": [
-    {
-      "document_id": demoDocId,
-      "title": "Demo Document",
-      "last_accessed": new Date()
-    }
-  ]
+  "gesture_password_id": demoGestureId
 });
 
 db.gesture_passwords.insertOne({
@@ -68,7 +71,7 @@ db.documents.insertOne({
   "content": "<h1>Welcome to Gesture Auth</h1><p>This is a demo document protected by gesture authentication.</p>",
   "created_at": new Date(),
   "updated_at": new Date(),
-  "access_logs": []
+  "revision": 0
 });
 
 // Add a demo user with ANGLE-based authentication (new format!)
@@ -82,14 +85,7 @@ db.users.insertOne({
   "email": "angles@example.com",
   "created_at": new Date(),
   "last_login": new Date(),
-  "gesture_password_id": angleGestureIdDemo,
-  "documents": [
-    {
-      "document_id": angleDocIdDemo,
-      "title": "Hand Angles Demo Document",
-      "last_accessed": new Date()
-    }
-  ]
+  "gesture_password_id": angleGestureIdDemo
 });
 
 db.gesture_passwords.insertOne({
@@ -124,7 +120,7 @@ db.documents.insertOne({
   "content": "<h1>Hand Angle Authentication</h1><p>This document demonstrates authentication using hand angle data instead of positions.</p>",
   "created_at": new Date(),
   "updated_at": new Date(),
-  "access_logs": []
+  "revision": 0
 });
 
 print("MongoDB initialized with collections and indexes for gesture authentication system");
\ No newline at end of file
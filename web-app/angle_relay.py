@@ -0,0 +1,152 @@
+"""
+Fan-out relay for the ML client's hand-angle event stream.
+
+A single background thread holds one streaming connection to the ML client's
+/hand-angles/stream endpoint and keeps the newest event in memory. Every
+browser connected to the web-app waits on that shared event, so N viewers
+cost one upstream connection instead of N polling loops.
+
+Threaded servers iterate subscribe(); ASGI servers iterate subscribe_async(),
+whose events are handed to the event loop by the reader thread, so an open
+stream does not hold a thread.
+"""
+
+import asyncio
+import time
+from threading import Condition, Lock, Thread, current_thread
+
+import requests
+
+
+def _offer(queue, data):
+    """Queue the newest event for an async subscriber, replacing one not yet sent"""
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(data)
+
+
+class AngleRelay:
+    """Relays one upstream Server-Sent Events stream to many subscribers"""
+
+    def __init__(self, url, reconnect_delay=1.0, keepalive=15.0, session=None):
+        self.url = url
+        self.reconnect_delay = reconnect_delay
+        self.keepalive = keepalive
+        self.session = session or requests.Session()
+
+        self._cond = Condition()
+        self._event = None  # pre-formatted SSE bytes for the newest snapshot
+        self._version = 0
+        self._subscribers = 0
+        self._listeners = set()  # (event loop, asyncio.Queue) per async subscriber
+        self._thread = None
+        self._thread_lock = Lock()
+
+    @property
+    def subscribers(self):
+        return self._subscribers
+
+    def latest(self):
+        """Return the newest relayed event payload (JSON bytes) or None"""
+        with self._cond:
+            return self._event
+
+    def publish(self, data):
+        """Hand a new event payload to every waiting subscriber"""
+        with self._cond:
+            self._event = data
+            self._version += 1
+            self._cond.notify_all()
+            listeners = list(self._listeners)
+        for loop, queue in listeners:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, data)
+            except RuntimeError:
+                pass  # Event loop already closed; the subscriber is going away
+
+    def subscribe(self):
+        """
+        Generator of SSE-formatted bytes for one downstream client.
+
+        Starts the upstream reader on first use; the reader stops on its own
+        once the last subscriber has gone away.
+        """
+        with self._cond:
+            self._subscribers += 1
+        self._ensure_reader()
+        try:
+            seen = 0
+            while True:
+                with self._cond:
+                    fresh = self._cond.wait_for(
+                        lambda: self._version != seen, self.keepalive
+                    )
+                    seen = self._version
+                    data = self._event
+                if fresh and data is not None:
+                    yield b"data: " + data + b"\n\n"
+                else:
+                    yield b": keep-alive\n\n"
+        finally:
+            with self._cond:
+                self._subscribers -= 1
+
+    async def subscribe_async(self):
+        """Async generator counterpart of subscribe(), for use on an event loop"""
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=1)
+        listener = (loop, queue)
+        with self._cond:
+            self._subscribers += 1
+            self._listeners.add(listener)
+            if self._event is not None:
+                queue.put_nowait(self._event)
+        self._ensure_reader()
+        try:
+            while True:
+                try:
+                    data = await asyncio.wait_for(queue.get(), self.keepalive)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                else:
+                    yield b"data: " + data + b"\n\n"
+        finally:
+            with self._cond:
+                self._listeners.discard(listener)
+                self._subscribers -= 1
+
+    def _ensure_reader(self):
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = Thread(target=self._read_upstream, daemon=True)
+                self._thread.start()
+
+    def _read_upstream(self):
+        try:
+            while True:
+                with self._thread_lock:
+                    if self._subscribers == 0:
+                        self._thread = None
+                        return
+                try:
+                    with self.session.get(
+                        self.url, stream=True, timeout=(3, self.keepalive * 2)
+                    ) as response:
+                        response.raise_for_status()
+                        for line in response.iter_lines():
+                            if line.startswith(b"data: "):
+                                self.publish(line[len(b"data: ") :])
+                            if self._subscribers == 0:
+                                break
+                except requests.exceptions.RequestException:
+                    time.sleep(self.reconnect_delay)
+                except Exception as e:
+                    # Anything else (a bad event, a failing subscriber) must
+                    # not end the relay: log it and reconnect
+                    print("Angle relay error:", repr(e))
+                    time.sleep(self.reconnect_delay)
+        finally:
+            # However the thread ends, let the next subscriber start another
+            with self._thread_lock:
+                if self._thread is current_thread():
+                    self._thread = None
@@ -1,16 +1,45 @@
-from flask import Flask, request, jsonify, send_from_directory, redirect, render_template
+from flask import Flask, request, jsonify, send_from_directory, redirect, render_template, Response
 import requests
+from angle_relay import AngleRelay
+from upstream import UpstreamClient
 from database import (
     init_app, create_user, get_user_by_username,
-    create_gesture_password, get_user_gesture_password,
-    verify_gesture, log_authentication,
-    get_user_documents, get_document, update_document, create_document
+    create_gesture_password, get_active_gesture,
+    verify_gesture, verify_gesture_frames, log_authentication,
+    get_user_documents, get_document, update_document, create_document,
+    document_summary, encode_document_cursor, get_document_access_logs,
+    patch_document, RevisionConflict, identify_gesture, identify_gesture_frames, get_user_by_id,
+    import_users, health, document_response_cache, document_cache_epoch, cache_document_response,
+    document_cache_revalidates, get_document_version, get_listing_version
 )
+from response_cache import document_response, list_response, not_modified, validator_headers
+from user_import import FORMATS, guess_format, parse_bytes
+import hmac
+import json
 import os
 
 app = Flask(__name__)
 mongo = init_app(app)
 
+# Internal Docker hostname works here
+ML_CLIENT_URL = os.environ.get('ML_CLIENT_URL', 'http://gesture_ml_client:5050')
+
+# Pooled keep-alive client with a micro-cache of about one frame period
+ml_client = UpstreamClient(
+    ML_CLIENT_URL,
+    ttl=float(os.environ.get('HAND_ANGLES_CACHE_TTL', 1 / 30)),
+)
+
+# Upper bound on frames scored per multi-frame login attempt
+MAX_LOGIN_FRAMES = 30
+
+# Documents per /documents page (?limit= may ask for up to the maximum)
+DOCUMENT_PAGE_SIZE = 50
+MAX_DOCUMENT_PAGE_SIZE = 200
+
+# One upstream event stream shared by every browser watching live angles
+angle_relay = AngleRelay(f"{ML_CLIENT_URL}/hand-angles/stream", session=ml_client.session)
+
 @app.route('/')
 def root():
     return redirect('/home')
@@ -23,18 +52,36 @@ def home():
 def serve_index():
     return send_from_directory('./templates', 'registerlogin.html')
 
+@app.route('/health')
+def health_check():
+    """MongoDB reachability plus connection pool and log writer statistics"""
+    healthy, details = health()
+    return jsonify(dict(details, status='ok' if healthy else 'degraded')), 200 if healthy else 503
+
 @app.route('/api/hand-angles')
 def proxy_hand_angles():
     try:
-        # Internal Docker hostname works here
-        response = requests.get("http://gesture_ml_client:5050/hand-angles", timeout=1)
-        return jsonify(response.json())
+        # The ML client's JSON body is passed through as-is, no decode/encode
+        body, seq = ml_client.get_hand_angles()
+        return Response(body, mimetype='application/json', headers={'X-Frame-Seq': str(seq)})
     except requests.exceptions.RequestException as e:
         return jsonify({
             'error': 'Could not reach ML client',
             'details': str(e)
         }), 500
 
+@app.route('/api/hand-angles/metrics')
+def hand_angles_metrics():
+    """Cache hit rate and upstream latency of the hand-angle proxy"""
+    return jsonify(ml_client.get_metrics())
+
+@app.route('/api/hand-angles/stream')
+def stream_hand_angles():
+    """Server-Sent Events feed of hand angles, relayed from the ML client"""
+    return Response(angle_relay.subscribe(),
+                    mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 # Register Route
 @app.route('/register', methods=['POST'])
 def register():
@@ -58,6 +105,33 @@ def register():
         'gesture_password_id': str(gesture_id)
     })
 
+@app.route('/users/import', methods=['POST'])
+def bulk_import_users():
+    """
+    Register many users from an NDJSON or CSV request body (see user_import.py);
+    the format comes from ?format= or the Content-Type
+    """
+    error = check_import_token(request.headers.get('X-Import-Token'))
+    if error:
+        return error
+    
+    fmt = request.args.get('format') or guess_format(request.content_type)
+    if fmt not in FORMATS:
+        return jsonify({'error': f'format must be one of {", ".join(FORMATS)}'}), 400
+    
+    # Rows are parsed and written batch by batch as the body streams in
+    return jsonify(import_users(parse_bytes(request.stream, fmt)))
+
+def check_import_token(supplied):
+    """Error response unless IMPORT_TOKEN is set and `supplied` matches it"""
+    token = os.environ.get('IMPORT_TOKEN')
+    if not token:
+        # Closed unless explicitly enabled: the route creates accounts
+        return jsonify({'error': 'Bulk import is disabled; set IMPORT_TOKEN to enable it'}), 404
+    if not hmac.compare_digest((supplied or '').encode(), token.encode()):
+        return jsonify({'error': 'Invalid import token'}), 403
+    return None
+
 # Login Route
 @app.route('/login', methods=['POST'])
 def login():
@@ -65,8 +139,11 @@ def login():
     username = data.get('username')
     angle_data = data.get('angle_data')  # Can be dictionary of angles or confidence score
     gesture_password_id = data.get('gesture_password_id')  # Legacy support
+    angle_frames = data.get('angle_frames')  # List of angle samples from one login window
+    live_frames = data.get('live_frames')  # Number of recent frames to pull from the ML client
 
-    if not username or (not angle_data and not gesture_password_id):
+    if not username or (not angle_data and not gesture_password_id
+                        and not angle_frames and not live_frames):
         return jsonify({'error': 'Missing username or gesture data'}), 400
 
     user = get_user_by_username(username)
@@ -77,9 +154,51 @@ def login():
     client_ip = request.remote_addr
     user_agent = request.headers.get('User-Agent', '')
     
-    # Method 1: Legacy ID-based authentication
+    # Method 1: Multi-frame window, scored in one batch and aggregated robustly
+    if angle_frames or live_frames:
+        if live_frames:
+            try:
+                count = min(max(int(live_frames), 1), MAX_LOGIN_FRAMES)
+                angle_frames = ml_client.get_recent_frames(count, consume=True)
+            except (TypeError, ValueError):
+                return jsonify({'error': 'live_frames must be a number'}), 400
+            except requests.exceptions.RequestException as e:
+                return jsonify({
+                    'error': 'Could not reach ML client',
+                    'details': str(e)
+                }), 502
+            if len(angle_frames) < count:
+                # The ML client only serves frames from the last couple of seconds
+                return jsonify({'error': 'Not enough recent frames with a hand in view',
+                                'frames': len(angle_frames)}), 409
+        if not isinstance(angle_frames, list) or len(angle_frames) > MAX_LOGIN_FRAMES:
+            return jsonify({'error': f'angle_frames must be a list of at most {MAX_LOGIN_FRAMES} samples'}), 400
+        
+        try:
+            success, confidence = verify_gesture_frames(user, angle_frames,
+                                                        data.get('aggregate', 'median'))
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': f'Invalid angle frames: {e}'}), 400
+        
+        # Log the authentication attempt
+        log_authentication(user['_id'], success, confidence, client_ip, user_agent)
+        
+        if success:
+            return jsonify({
+                'message': 'Login successful',
+                'confidence': confidence,
+                'frames': len(angle_frames)
+            })
+        else:
+            return jsonify({
+                'error': 'Gesture verification failed',
+                'confidence': confidence,
+                'frames': len(angle_frames)
+            }), 401
+    
+    # Method 2: Legacy ID-based authentication
     if gesture_password_id and not angle_data:
-        gesture_record = get_user_gesture_password(user['_id'])
+        gesture_record = get_active_gesture(user)
         if not gesture_record:
             return jsonify({'error': 'No gesture password found'}), 404
         
@@ -94,9 +213,9 @@ def login():
         else:
             return jsonify({'error': 'Gesture does not match'}), 401
     
-    # Method 2: Angle-based authentication
+    # Method 3: Angle-based authentication
     if angle_data:
-        success, confidence = verify_gesture(user['_id'], angle_data)
+        success, confidence = verify_gesture(user, angle_data)
         
         # Log the authentication attempt
         log_authentication(user['_id'], success, confidence, client_ip, user_agent)
@@ -115,6 +234,38 @@ def login():
     # Should not reach here
     return jsonify({'error': 'Invalid request format'}), 400
 
+# Gesture-only identification (kiosk mode): no username, the gesture says who it is
+@app.route('/identify', methods=['POST'])
+def identify():
+    data = request.get_json()
+    angle_data = data.get('angle_data')  # Dictionary of joint angles
+    angle_frames = data.get('angle_frames')  # Or a list of angle samples from one window
+    
+    try:
+        if angle_frames:
+            if not isinstance(angle_frames, list) or len(angle_frames) > MAX_LOGIN_FRAMES:
+                return jsonify({'error': f'angle_frames must be a list of at most {MAX_LOGIN_FRAMES} samples'}), 400
+            user_id, confidence = identify_gesture_frames(angle_frames, data.get('aggregate', 'median'))
+        elif isinstance(angle_data, dict):
+            user_id, confidence = identify_gesture(angle_data)
+        else:
+            return jsonify({'error': 'Missing angle_data or angle_frames'}), 400
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid angle data: {e}'}), 400
+    
+    user = get_user_by_id(user_id) if user_id else None
+    if not user:
+        return jsonify({'error': 'Gesture not recognized', 'confidence': confidence}), 401
+    
+    log_authentication(user['_id'], True, confidence, request.remote_addr,
+                       request.headers.get('User-Agent', ''))
+    return jsonify({
+        'message': 'Gesture identified',
+        'username': user['username'],
+        'user_id': str(user['_id']),
+        'confidence': confidence
+    })
+
 # Document routes
 @app.route('/documents', methods=['GET'])
 def get_documents():
@@ -127,19 +278,49 @@ def get_documents():
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
-    documents = get_user_documents(user['_id'])
+    try:
+        limit = min(max(int(request.args.get('limit', DOCUMENT_PAGE_SIZE)), 1), MAX_DOCUMENT_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'error': 'Invalid limit or cursor'}), 400
     
-    # Format for JSON response
-    doc_list = []
-    for doc in documents:
-        doc_list.append({
-            'id': str(doc['_id']),
-            'title': doc['title'],
-            'created_at': doc['created_at'].isoformat(),
-            'updated_at': doc['updated_at'].isoformat()
-        })
+    key = (str(user['_id']), 'list', limit, request.args.get('cursor'))
+    cached = document_response_cache.get(key, None)
+    revalidate = document_cache_revalidates()
+    if cached is not None and revalidate and cached.version != get_listing_version(user['_id']):
+        cached = None
+    if cached is None:
+        epoch = document_cache_epoch(user['_id'])
+        # Read before the page, so a save in between shows up on the next check
+        version = get_listing_version(user['_id']) if revalidate else None
+        try:
+            # One extra document tells us whether there is a next page
+            documents = get_user_documents(user['_id'], limit + 1, request.args.get('cursor'))
+        except ValueError:
+            return jsonify({'error': 'Invalid limit or cursor'}), 400
+        # Pages are at most MAX_DOCUMENT_PAGE_SIZE summaries, so the cached body stays small
+        cached = list_response(user['_id'], ''.join(stream_document_page(documents, limit)), version)
+        cache_document_response(key, epoch, cached)
     
-    return jsonify({'documents': doc_list})
+    return cached_json(cached)
+
+def cached_json(cached):
+    """Response for a CachedResponse: its body, or an empty 304 if the client's copy is current"""
+    headers = validator_headers(cached)
+    if not_modified(cached, request.headers.get('If-None-Match'), request.headers.get('If-Modified-Since')):
+        return Response(status=304, headers=headers)
+    return Response(cached.body, mimetype='application/json', headers=headers)
+
+def stream_document_page(documents, limit):
+    """Yield a {"documents": [...], "next_cursor": ...} body one document at a time"""
+    yield '{"documents": ['
+    previous = None
+    for count, doc in enumerate(documents):
+        if count == limit:
+            yield '], "next_cursor": %s}' % json.dumps(encode_document_cursor(previous))
+            return
+        yield (',' if count else '') + json.dumps(document_summary(doc))
+        previous = doc
+    yield '], "next_cursor": null}'
 
 @app.route('/documents', methods=['POST'])
 def create_new_document():
@@ -177,17 +358,20 @@ def view_document(doc_id):
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
-    document = get_document(doc_id, user['_id'])
-    if not document:
-        return jsonify({'error': 'Document not found or access denied'}), 404
+    key = (str(user['_id']), doc_id)
+    cached = document_response_cache.get(key, None)
+    if cached is not None and document_cache_revalidates() \
+            and cached.version != get_document_version(doc_id, user['_id']):
+        cached = None
+    if cached is None:
+        epoch = document_cache_epoch(user['_id'])
+        document = get_document(doc_id, user['_id'])
+        if not document:
+            return jsonify({'error': 'Document not found or access denied'}), 404
+        cached = document_response(user['_id'], document)
+        cache_document_response(key, epoch, cached)
     
-    return jsonify({
-        'id': str(document['_id']),
-        'title': document['title'],
-        'content': document['content'],
-        'created_at': document['created_at'].isoformat(),
-        'updated_at': document['updated_at'].isoformat()
-    })
+    return cached_json(cached)
 
 @app.route('/documents/<doc_id>', methods=['PUT'])
 def update_doc(doc_id):
@@ -202,13 +386,77 @@ def update_doc(doc_id):
     
     data = request.get_json()
     content = data.get('content')
+    base_revision = data.get('base_revision')  # Optional: reject the save if the document moved on
     
     if not content:
         return jsonify({'error': 'Missing content'}), 400
+    if base_revision is not None and type(base_revision) is not int:
+        return jsonify({'error': 'base_revision must be an integer'}), 400
+    
+    try:
+        revision = update_document(doc_id, content, user['_id'], base_revision=base_revision)
+    except RevisionConflict as e:
+        return revision_conflict(e)
+    if revision is None:
+        return jsonify({'error': 'Document not found or access denied'}), 404
+    
+    return jsonify({'message': 'Document updated successfully', 'revision': revision})
+
+@app.route('/documents/<doc_id>', methods=['PATCH'])
+def patch_doc(doc_id):
+    """Apply text splices ({"base_revision": n, "ops": [...]}, see document_patch.py)"""
+    # Check for authentication (this would normally use sessions)
+    username = request.args.get('username')
+    if not username:
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    user = get_user_by_username(username)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
     
-    update_document(doc_id, content, user['_id'])
+    data = request.get_json()
+    base_revision = data.get('base_revision')
+    if type(base_revision) is not int:
+        return jsonify({'error': 'Missing or invalid base_revision'}), 400
+    
+    try:
+        revision = patch_document(doc_id, data.get('ops'), base_revision, user['_id'])
+    except RevisionConflict as e:
+        return revision_conflict(e)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid patch: {e}'}), 400
+    if revision is None:
+        return jsonify({'error': 'Document not found or access denied'}), 404
+    
+    return jsonify({'message': 'Document updated successfully', 'revision': revision})
+
+def revision_conflict(error):
+    """409 telling the client which revision to reload and rebase onto"""
+    return jsonify({
+        'error': 'Document was changed by another save',
+        'revision': error.revision
+    }), 409
+
+@app.route('/documents/<doc_id>/access-logs', methods=['GET'])
+def document_access_logs(doc_id):
+    # Check for authentication (this would normally use sessions)
+    username = request.args.get('username')
+    if not username:
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    user = get_user_by_username(username)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    
+    if not get_document(doc_id, user['_id']):
+        return jsonify({'error': 'Document not found or access denied'}), 404
     
-    return jsonify({'message': 'Document updated successfully'})
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+    return jsonify({'access_logs': [{
+        'timestamp': log['timestamp'].isoformat(),
+        'access_type': log['access_type'],
+        'gesture_confidence': log.get('gesture_confidence')
+    } for log in get_document_access_logs(doc_id, limit)]})
 
 @app.route('/capture-gesture', methods=['POST'])
 def capture_gesture():
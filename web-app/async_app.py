@@ -0,0 +1,452 @@
+"""
+ASGI serving mode for the web app (Quart + motor + httpx).
+
+Serves the same routes as app.py, but the handlers that wait on I/O -
+/api/hand-angles, /login and the document routes - await MongoDB and the ML
+client instead of blocking a thread, so one worker can keep many requests in
+flight. Run it with an ASGI server, e.g.:
+
+    hypercorn async_app:app --bind 0.0.0.0:5001 --workers 2
+
+The Flask app (python app.py) remains the default; set SERVER_MODE=asgi in
+the container to use this one instead.
+"""
+
+import asyncio
+import hmac
+import io
+import json
+import os
+
+import httpx
+import requests
+from bson import json_util
+from quart import Quart, request, jsonify, send_from_directory, redirect, render_template, Response
+
+import async_database as db
+from angle_relay import AngleRelay
+from async_upstream import AsyncUpstreamClient
+from database import (
+    log_authentication, document_summary, encode_document_cursor, RevisionConflict, import_users,
+    document_response_cache, document_cache_epoch, cache_document_response, document_cache_revalidates
+)
+from response_cache import document_response, list_response, not_modified, validator_headers
+from user_import import FORMATS, guess_format, parse_bytes
+
+app = Quart(__name__)
+# Event streams stay open indefinitely
+app.config['RESPONSE_TIMEOUT'] = None
+
+ML_CLIENT_URL = os.environ.get('ML_CLIENT_URL', 'http://gesture_ml_client:5050')
+HAND_ANGLES_CACHE_TTL = float(os.environ.get('HAND_ANGLES_CACHE_TTL', 1 / 30))
+
+# Upper bound on frames scored per multi-frame login attempt
+MAX_LOGIN_FRAMES = 30
+
+# Documents per /documents page (?limit= may ask for up to the maximum)
+DOCUMENT_PAGE_SIZE = 50
+MAX_DOCUMENT_PAGE_SIZE = 200
+
+# Created on startup, inside the server's event loop
+ml_client = None
+
+# The relay reads upstream on its own thread; see stream_hand_angles()
+angle_relay = AngleRelay(f"{ML_CLIENT_URL}/hand-angles/stream", session=requests.Session())
+
+@app.before_serving
+async def startup():
+    global ml_client
+    db.init()
+    ml_client = AsyncUpstreamClient(ML_CLIENT_URL, ttl=HAND_ANGLES_CACHE_TTL)
+
+@app.after_serving
+async def shutdown():
+    await ml_client.aclose()
+    db.close()
+
+async def current_user():
+    """Return (user, error_response) for the ?username= of the request"""
+    username = request.args.get('username')
+    if not username:
+        return None, (jsonify({'error': 'Authentication required'}), 401)
+    user = await db.get_user_by_username(username)
+    if not user:
+        return None, (jsonify({'error': 'User not found'}), 404)
+    return user, None
+
+@app.route('/')
+async def root():
+    return redirect('/home')
+
+@app.route('/home')
+async def home():
+    return await render_template('index.html')
+
+@app.route('/loginregister')
+async def serve_index():
+    return await send_from_directory('./templates', 'registerlogin.html')
+
+@app.route('/health')
+async def health_check():
+    healthy, details = await db.health()
+    return jsonify(dict(details, status='ok' if healthy else 'degraded')), 200 if healthy else 503
+
+@app.route('/api/hand-angles')
+async def proxy_hand_angles():
+    try:
+        body, seq = await ml_client.get_hand_angles()
+        return Response(body, mimetype='application/json', headers={'X-Frame-Seq': str(seq)})
+    except httpx.HTTPError as e:
+        return jsonify({
+            'error': 'Could not reach ML client',
+            'details': str(e)
+        }), 500
+
+@app.route('/api/hand-angles/metrics')
+async def hand_angles_metrics():
+    return jsonify(ml_client.get_metrics())
+
+@app.route('/api/hand-angles/stream')
+async def stream_hand_angles():
+    """Server-Sent Events feed of hand angles, relayed from the ML client"""
+    return Response(angle_relay.subscribe_async(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/register', methods=['POST'])
+async def register():
+    data = await request.get_json()
+    username = data.get('username')
+    gesture_name = data.get('gesture_name')
+    angle_data = data.get('angle_data')
+
+    if not username or not gesture_name or not angle_data:
+        return jsonify({'error': 'Missing required fields (username, gesture_name, or angle_data)'}), 400
+
+    if await db.get_user_by_username(username):
+        return jsonify({'error': 'User already exists'}), 400
+
+    user_id = await db.create_user(username, f"{username}@placeholder.com")
+    gesture_id = await db.create_gesture_password(user_id, gesture_name, angle_data=angle_data)
+
+    return jsonify({
+        'message': 'User registered successfully',
+        'user_id': str(user_id),
+        'gesture_password_id': str(gesture_id)
+    })
+
+@app.route('/users/import', methods=['POST'])
+async def bulk_import_users():
+    error = check_import_token(request.headers.get('X-Import-Token'))
+    if error:
+        return error
+
+    fmt = request.args.get('format') or guess_format(request.content_type)
+    if fmt not in FORMATS:
+        return jsonify({'error': f'format must be one of {", ".join(FORMATS)}'}), 400
+
+    # The import runs on the synchronous driver (bulk_write batches), on the
+    # thread pool so the event loop keeps serving other requests
+    lines = io.BytesIO(await request.get_data())
+    report = await asyncio.get_running_loop().run_in_executor(
+        None, lambda: import_users(parse_bytes(lines, fmt)))
+    return jsonify(report)
+
+def check_import_token(supplied):
+    """Error response unless IMPORT_TOKEN is set and `supplied` matches it"""
+    token = os.environ.get('IMPORT_TOKEN')
+    if not token:
+        return jsonify({'error': 'Bulk import is disabled; set IMPORT_TOKEN to enable it'}), 404
+    if not hmac.compare_digest((supplied or '').encode(), token.encode()):
+        return jsonify({'error': 'Invalid import token'}), 403
+    return None
+
+@app.route('/login', methods=['POST'])
+async def login():
+    data = await request.get_json()
+    username = data.get('username')
+    angle_data = data.get('angle_data')
+    gesture_password_id = data.get('gesture_password_id')
+    angle_frames = data.get('angle_frames')
+    live_frames = data.get('live_frames')
+
+    if not username or (not angle_data and not gesture_password_id
+                        and not angle_frames and not live_frames):
+        return jsonify({'error': 'Missing username or gesture data'}), 400
+
+    user = await db.get_user_by_username(username)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+
+    client_ip = request.remote_addr
+    user_agent = request.headers.get('User-Agent', '')
+
+    # Method 1: Multi-frame window, scored in one batch and aggregated robustly
+    if angle_frames or live_frames:
+        if live_frames:
+            try:
+                count = min(max(int(live_frames), 1), MAX_LOGIN_FRAMES)
+                angle_frames = await ml_client.get_recent_frames(count, consume=True)
+            except (TypeError, ValueError):
+                return jsonify({'error': 'live_frames must be a number'}), 400
+            except httpx.HTTPError as e:
+                return jsonify({
+                    'error': 'Could not reach ML client',
+                    'details': str(e)
+                }), 502
+            if len(angle_frames) < count:
+                # The ML client only serves frames from the last couple of seconds
+                return jsonify({'error': 'Not enough recent frames with a hand in view',
+                                'frames': len(angle_frames)}), 409
+        if not isinstance(angle_frames, list) or len(angle_frames) > MAX_LOGIN_FRAMES:
+            return jsonify({'error': f'angle_frames must be a list of at most {MAX_LOGIN_FRAMES} samples'}), 400
+
+        try:
+            success, confidence = await db.verify_gesture_frames(user, angle_frames,
+                                                                 data.get('aggregate', 'median'))
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': f'Invalid angle frames: {e}'}), 400
+
+        log_authentication(user['_id'], success, confidence, client_ip, user_agent)
+
+        body = {'confidence': confidence, 'frames': len(angle_frames)}
+        if success:
+            return jsonify(dict(body, message='Login successful'))
+        return jsonify(dict(body, error='Gesture verification failed')), 401
+
+    # Method 2: Legacy ID-based authentication
+    if gesture_password_id and not angle_data:
+        gesture_record = await db.get_active_gesture(user)
+        if not gesture_record:
+            return jsonify({'error': 'No gesture password found'}), 404
+
+        success = (gesture_password_id == str(gesture_record['_id']))
+        log_authentication(user['_id'], success, 1.0 if success else 0.0, client_ip, user_agent)
+
+        if success:
+            return jsonify({'message': 'Login successful'})
+        return jsonify({'error': 'Gesture does not match'}), 401
+
+    # Method 3: Angle-based authentication
+    success, confidence = await db.verify_gesture(user, angle_data)
+    log_authentication(user['_id'], success, confidence, client_ip, user_agent)
+
+    if success:
+        return jsonify({'message': 'Login successful', 'confidence': confidence})
+    return jsonify({'error': 'Gesture verification failed', 'confidence': confidence}), 401
+
+@app.route('/identify', methods=['POST'])
+async def identify():
+    data = await request.get_json()
+    angle_data = data.get('angle_data')
+    angle_frames = data.get('angle_frames')
+
+    try:
+        if angle_frames:
+            if not isinstance(angle_frames, list) or len(angle_frames) > MAX_LOGIN_FRAMES:
+                return jsonify({'error': f'angle_frames must be a list of at most {MAX_LOGIN_FRAMES} samples'}), 400
+            user_id, confidence = await db.identify_gesture_frames(angle_frames, data.get('aggregate', 'median'))
+        elif isinstance(angle_data, dict):
+            user_id, confidence = await db.identify_gesture(angle_data)
+        else:
+            return jsonify({'error': 'Missing angle_data or angle_frames'}), 400
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid angle data: {e}'}), 400
+
+    user = await db.get_user_by_id(user_id) if user_id else None
+    if not user:
+        return jsonify({'error': 'Gesture not recognized', 'confidence': confidence}), 401
+
+    log_authentication(user['_id'], True, confidence, request.remote_addr,
+                       request.headers.get('User-Agent', ''))
+    return jsonify({
+        'message': 'Gesture identified',
+        'username': user['username'],
+        'user_id': str(user['_id']),
+        'confidence': confidence
+    })
+
+@app.route('/documents', methods=['GET'])
+async def get_documents():
+    user, error = await current_user()
+    if error:
+        return error
+
+    try:
+        limit = min(max(int(request.args.get('limit', DOCUMENT_PAGE_SIZE)), 1), MAX_DOCUMENT_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'error': 'Invalid limit or cursor'}), 400
+
+    key = (str(user['_id']), 'list', limit, request.args.get('cursor'))
+    cached = document_response_cache.get(key, None)
+    revalidate = document_cache_revalidates()
+    if cached is not None and revalidate and cached.version != await db.get_listing_version(user['_id']):
+        cached = None
+    if cached is None:
+        epoch = document_cache_epoch(user['_id'])
+        # Read before the page, so a save in between shows up on the next check
+        version = await db.get_listing_version(user['_id']) if revalidate else None
+        try:
+            documents = db.get_user_documents(user['_id'], limit + 1, request.args.get('cursor'))
+        except ValueError:
+            return jsonify({'error': 'Invalid limit or cursor'}), 400
+        cached = list_response(user['_id'], await document_page_body(documents, limit), version)
+        cache_document_response(key, epoch, cached)
+
+    return cached_json(cached)
+
+async def document_page_body(documents, limit):
+    """Same body as app.stream_document_page()"""
+    parts = ['{"documents": [']
+    previous = None
+    count = 0
+    async for doc in documents:
+        if count == limit:
+            parts.append('], "next_cursor": %s}' % json.dumps(encode_document_cursor(previous)))
+            return ''.join(parts)
+        parts.append((',' if count else '') + json.dumps(document_summary(doc)))
+        previous = doc
+        count += 1
+    parts.append('], "next_cursor": null}')
+    return ''.join(parts)
+
+def cached_json(cached):
+    """Response for a CachedResponse: its body, or an empty 304 if the client's copy is current"""
+    headers = validator_headers(cached)
+    if not_modified(cached, request.headers.get('If-None-Match'), request.headers.get('If-Modified-Since')):
+        return Response('', status=304, headers=headers)
+    return Response(cached.body, mimetype='application/json', headers=headers)
+
+@app.route('/documents', methods=['POST'])
+async def create_new_document():
+    user, error = await current_user()
+    if error:
+        return error
+
+    data = await request.get_json()
+    title = data.get('title')
+    if not title:
+        return jsonify({'error': 'Missing title'}), 400
+
+    doc_id = await db.create_document(user['_id'], title, data.get('content', ''))
+    return jsonify({
+        'message': 'Document created successfully',
+        'document_id': str(doc_id)
+    })
+
+@app.route('/documents/<doc_id>', methods=['GET'])
+async def view_document(doc_id):
+    user, error = await current_user()
+    if error:
+        return error
+
+    key = (str(user['_id']), doc_id)
+    cached = document_response_cache.get(key, None)
+    if cached is not None and document_cache_revalidates() \
+            and cached.version != await db.get_document_version(doc_id, user['_id']):
+        cached = None
+    if cached is None:
+        epoch = document_cache_epoch(user['_id'])
+        document = await db.get_document(doc_id, user['_id'])
+        if not document:
+            return jsonify({'error': 'Document not found or access denied'}), 404
+        cached = document_response(user['_id'], document)
+        cache_document_response(key, epoch, cached)
+
+    return cached_json(cached)
+
+@app.route('/documents/<doc_id>', methods=['PUT'])
+async def update_doc(doc_id):
+    user, error = await current_user()
+    if error:
+        return error
+
+    data = await request.get_json()
+    content = data.get('content')
+    base_revision = data.get('base_revision')
+    if not content:
+        return jsonify({'error': 'Missing content'}), 400
+    if base_revision is not None and type(base_revision) is not int:
+        return jsonify({'error': 'base_revision must be an integer'}), 400
+
+    try:
+        revision = await db.update_document(doc_id, content, user['_id'], base_revision=base_revision)
+    except RevisionConflict as e:
+        return revision_conflict(e)
+    if revision is None:
+        return jsonify({'error': 'Document not found or access denied'}), 404
+    return jsonify({'message': 'Document updated successfully', 'revision': revision})
+
+@app.route('/documents/<doc_id>', methods=['PATCH'])
+async def patch_doc(doc_id):
+    user, error = await current_user()
+    if error:
+        return error
+
+    data = await request.get_json()
+    base_revision = data.get('base_revision')
+    if type(base_revision) is not int:
+        return jsonify({'error': 'Missing or invalid base_revision'}), 400
+
+    try:
+        revision = await db.patch_document(doc_id, data.get('ops'), base_revision, user['_id'])
+    except RevisionConflict as e:
+        return revision_conflict(e)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid patch: {e}'}), 400
+    if revision is None:
+        return jsonify({'error': 'Document not found or access denied'}), 404
+    return jsonify({'message': 'Document updated successfully', 'revision': revision})
+
+def revision_conflict(error):
+    return jsonify({
+        'error': 'Document was changed by another save',
+        'revision': error.revision
+    }), 409
+
+@app.route('/documents/<doc_id>/access-logs', methods=['GET'])
+async def document_access_logs(doc_id):
+    user, error = await current_user()
+    if error:
+        return error
+
+    if not await db.get_document(doc_id, user['_id']):
+        return jsonify({'error': 'Document not found or access denied'}), 404
+
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+    return jsonify({'access_logs': [{
+        'timestamp': log['timestamp'].isoformat(),
+        'access_type': log['access_type'],
+        'gesture_confidence': log.get('gesture_confidence')
+    } for log in await db.get_document_access_logs(doc_id, limit)]})
+
+@app.route('/capture-gesture', methods=['POST'])
+async def capture_gesture():
+    data = await request.get_json()
+    username = data.get('username')
+    angle_data = data.get('angle_data')
+
+    if not username or not angle_data:
+        return jsonify({'error': 'Missing username or angle data'}), 400
+
+    return jsonify({
+        'message': 'Gesture captured successfully',
+        'angle_data': angle_data
+    })
+
+@app.route('/data')
+async def get_all_users():
+    try:
+        users = await db.db.users.find().to_list(length=None)
+        for user in users:
+            user['_id'] = str(user['_id'])
+            if 'gesture_password_id' in user:
+                user['gesture_password_id'] = str(user['gesture_password_id'])
+        # Quart has no BSON JSON provider (Flask-PyMongo installs one for the
+        # sync app); active_gesture holds an ObjectId and a Binary template
+        return Response(json_util.dumps(users), mimetype='application/json')
+    except Exception as e:
+        return jsonify({"error": "Database fetch failed", "details": str(e)}), 500
+
+@app.route('/view')
+async def view_data_page():
+    return await send_from_directory('.', 'database_view.html')
@@ -0,0 +1,138 @@
+"""
+asyncio counterpart of upstream.UpstreamClient for the ASGI serving path.
+
+Same behaviour - pooled keep-alive connections, a micro-cache revalidated
+with If-None-Match, and coalescing of concurrent misses - but built on an
+httpx.AsyncClient, so a request waiting on the ML client suspends instead of
+holding a worker thread.
+"""
+
+import asyncio
+import time
+
+import httpx
+
+
+class AsyncUpstreamClient:
+    """Pooled, cached and coalescing async client for the ML client's angle API"""
+
+    def __init__(self, base_url, ttl=1 / 30, timeout=1, pool_size=10, transport=None):
+        self.base_url = base_url.rstrip("/")
+        self.ttl = ttl
+        self.timeout = timeout
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            transport=transport,
+        )
+
+        self._cached = None  # (fetched_at, seq, body)
+        self._flight = None
+
+        self._stats = {
+            "requests": 0,
+            "cache_hits": 0,
+            "coalesced": 0,
+            "upstream_fetches": 0,
+            "upstream_not_modified": 0,
+            "upstream_errors": 0,
+            "upstream_latency_total": 0.0,
+            "upstream_latency_max": 0.0,
+        }
+
+    async def get_hand_angles(self):
+        """
+        Return (body, seq) for the newest angle snapshot.
+
+        Raises httpx.HTTPError if the ML client is unreachable.
+        """
+        # Everything up to the first await runs without interruption on the
+        # event loop, so no lock is needed around the cache and the flight
+        self._stats["requests"] += 1
+        cached = self._cached
+        if cached is not None and time.monotonic() - cached[0] < self.ttl:
+            self._stats["cache_hits"] += 1
+            return cached[2], cached[1]
+
+        if self._flight is not None:
+            self._stats["coalesced"] += 1
+            try:
+                return await asyncio.wait_for(asyncio.shield(self._flight), self.timeout)
+            except asyncio.TimeoutError:
+                raise httpx.TimeoutException("Timed out waiting for ML client") from None
+
+        self._flight = asyncio.get_running_loop().create_future()
+        flight = self._flight
+        try:
+            result = await self._fetch(cached)
+            flight.set_result(result)
+            return result
+        except Exception as e:
+            flight.set_exception(e)
+            # Waiters will see it; avoid "exception never retrieved" otherwise
+            flight.exception()
+            raise
+        finally:
+            self._flight = None
+            # The leader was cancelled (e.g. its client disconnected): the
+            # waiters must not hang on a flight nobody will finish
+            if not flight.done():
+                flight.set_exception(httpx.RequestError("Upstream fetch was cancelled"))
+                flight.exception()
+
+    async def get_recent_frames(self, k, consume=False):
+        """
+        Return the angle lists of up to `k` fresh frames with a visible hand;
+        consume=True empties the ML client's window so they are used only once
+        """
+        params = {"k": k, "consume": "1"} if consume else {"k": k}
+        response = await self.client.get(f"{self.base_url}/hand-angles/recent", params=params)
+        response.raise_for_status()
+        return [frame["angles"] for frame in response.json()["frames"]]
+
+    async def _fetch(self, cached):
+        headers = {}
+        if cached is not None:
+            headers["If-None-Match"] = f'"{cached[1]}"'
+
+        started = time.perf_counter()
+        try:
+            response = await self.client.get(f"{self.base_url}/hand-angles", headers=headers)
+            if response.status_code != 304:
+                response.raise_for_status()
+        except httpx.HTTPError:
+            self._stats["upstream_errors"] += 1
+            raise
+        latency = time.perf_counter() - started
+
+        if response.status_code == 304 and cached is not None:
+            seq, body = cached[1], cached[2]
+        else:
+            seq, body = response.headers.get("X-Frame-Seq"), response.content
+
+        self._cached = (time.monotonic(), seq, body)
+        self._stats["upstream_fetches"] += 1
+        if response.status_code == 304:
+            self._stats["upstream_not_modified"] += 1
+        self._stats["upstream_latency_total"] += latency
+        self._stats["upstream_latency_max"] = max(self._stats["upstream_latency_max"], latency)
+        return body, seq
+
+    def get_metrics(self):
+        """Hit rate and upstream latency figures (latencies in ms)"""
+        stats = dict(self._stats)
+        fetches = stats.pop("upstream_fetches")
+        total = stats.pop("upstream_latency_total")
+        stats["upstream_fetches"] = fetches
+        stats["hit_rate"] = (
+            (stats["cache_hits"] + stats["coalesced"]) / stats["requests"]
+            if stats["requests"]
+            else 0.0
+        )
+        stats["upstream_latency_avg_ms"] = total / fetches * 1000.0 if fetches else 0.0
+        stats["upstream_latency_max_ms"] = stats.pop("upstream_latency_max") * 1000.0
+        stats["ttl_ms"] = self.ttl * 1000.0
+        return stats
+
+    async def aclose(self):
+        await self.client.aclose()
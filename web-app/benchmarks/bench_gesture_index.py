@@ -0,0 +1,65 @@
+"""
+Benchmark for the gesture identification index: top-k search with the IVF
+index against the brute-force scan, on synthetic templates clustered around
+a few hundred distinct gestures.
+
+Also reports recall@1 of the IVF search relative to the brute-force result.
+
+Run from the web-app directory:
+    python benchmarks/bench_gesture_index.py [--users 100000 --json results.json]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# Shared timing helpers (stats.py) live in the repository-level benchmarks/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "benchmarks")))
+from gesture_index import GestureIndex
+from stats import print_results, summarize, time_calls, write_results
+
+
+def synthetic_templates(users, gestures=500, seed=0):
+    """Templates scattered around `gestures` prototypes, 8° per-joint spread"""
+    rng = np.random.default_rng(seed)
+    prototypes = rng.uniform(30, 180, (gestures, 10))
+    return (prototypes[rng.integers(0, gestures, users)] + rng.normal(0, 8, (users, 10))).astype(np.float32)
+
+
+def suite(users=100000, queries=200, k=5, seed=0):
+    templates = synthetic_templates(users, seed=seed)
+    rng = np.random.default_rng(seed + 1)
+    # A presented gesture is a registered template plus tracking noise
+    probes = templates[rng.integers(0, users, queries)] + rng.normal(0, 3, (queries, 10)).astype(np.float32)
+
+    index = GestureIndex()
+    started = time.perf_counter()
+    index.build((f"user{i}", vector) for i, vector in enumerate(templates))
+    build = time.perf_counter() - started
+
+    queue = iter(np.tile(probes, (1000, 1)))
+    results = {
+        f"web.gesture_index.build.{users}": summarize([build], "s"),
+        f"web.gesture_index.search.{users}": time_calls(lambda: index.search(next(queue), k), 50, 20),
+        f"web.gesture_index.search_exact.{users}": time_calls(
+            lambda: index.search_exact(next(queue), k), 10, 5, warmup=1),
+    }
+    hits = sum(index.search(probe, 1)[0][0] == index.search_exact(probe, 1)[0][0] for probe in probes)
+    results[f"web.gesture_index.search.{users}"]["recall_at_1"] = hits / queries
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+    results = suite(args.users)
+    print_results(results)
+    print(f"recall@1 vs brute force: {results[f'web.gesture_index.search.{args.users}']['recall_at_1']:.3f}")
+    if args.json:
+        write_results(args.json, results)
@@ -0,0 +1,194 @@
+"""
+Offline load generator for the full register -> login -> documents flow.
+
+Runs the Flask app on a local port with MongoDB replaced by an in-memory
+mongomock database and the ML client replaced by a fake angle server, so it
+needs no services and gives repeatable numbers. Each scenario sends a fixed
+number of requests from `--concurrency` closed-loop clients and reports
+throughput and p50/p95/p99 latency.
+
+Run from the web-app directory:
+    python benchmarks/bench_login_flow.py [--requests 500 --concurrency 4 --json results.json]
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+import mongomock
+import requests
+from requests.adapters import HTTPAdapter
+from werkzeug.serving import make_server
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# Shared timing helpers (stats.py) live in the repository-level benchmarks/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "benchmarks")))
+from gesture_matcher import ANGLE_LABELS
+from stats import print_results, summarize, write_results
+
+TEMPLATE = [161.44, 133.85, 152.81, 70.18, 148.49, 69.31, 168.76, 40.95, 177.22, 47.28]
+
+
+class FakeAngleHandler(BaseHTTPRequestHandler):
+    """Serves /hand-angles (seq advancing at 30 fps, ETag/304) and /hand-angles/recent"""
+
+    started = time.monotonic()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        seq = int((time.monotonic() - self.started) * 30) + 1
+        if url.path == "/hand-angles":
+            etag = f'"{seq}"'
+            if self.headers.get("If-None-Match") == etag:
+                self._send(304, b"", {"ETag": etag, "X-Frame-Seq": str(seq)})
+                return
+            body = json.dumps({"seq": seq, "hand_present": 1, "angles": TEMPLATE}).encode()
+            self._send(200, body, {"ETag": etag, "X-Frame-Seq": str(seq)})
+        elif url.path == "/hand-angles/recent":
+            k = int(parse_qs(url.query).get("k", ["10"])[0])
+            frames = [{"seq": seq - i, "angles": TEMPLATE} for i in range(k)]
+            self._send(200, json.dumps({"frames": frames}).encode(), {})
+        else:
+            self._send(404, b"", {})
+
+    def _send(self, status, body, headers):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def start_services():
+    """Start the fake angle server and the web app; return the app's base URL"""
+    angles = serve(ThreadingHTTPServer(("127.0.0.1", 0), FakeAngleHandler))
+    os.environ["ML_CLIENT_URL"] = f"http://127.0.0.1:{angles.server_port}"
+
+    import database
+    from app import app
+
+    client = mongomock.MongoClient()
+    database.mongo = SimpleNamespace(db=client.gesture_auth, cx=client)
+    database.clear_caches()
+
+    # Per-request access logs would dominate the measurement
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    web = serve(make_server("127.0.0.1", 0, app, threaded=True))
+    return f"http://127.0.0.1:{web.server_port}"
+
+
+def load(base_url, make_request, total, concurrency):
+    """Send `total` requests from `concurrency` clients and summarize their latency"""
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_maxsize=concurrency))
+    counter = itertools.count()
+    latencies, errors = [], []
+
+    def client():
+        while True:
+            i = next(counter)
+            if i >= total:
+                return
+            method, path, body, expected = make_request(i)
+            started = time.perf_counter()
+            response = session.request(method, base_url + path, json=body, timeout=10)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != expected:
+                errors.append(response.status_code)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(client) for _ in range(concurrency)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+
+    summary = summarize(latencies, "ms")
+    # Achieved throughput across all clients, not 1 / mean latency
+    summary["ops_per_s"] = len(latencies) / elapsed
+    summary["errors"] = len(errors)
+    return summary
+
+
+def suite(total=500, concurrency=4, users=50):
+    base_url = start_services()
+    angle_data = dict(zip(ANGLE_LABELS, TEMPLATE))
+    # The database starts empty, so every run registers the same users
+    usernames = [f"bench{i}" for i in range(max(users, 1))]
+
+    def register(i):
+        # The first `users` registrations create the accounts used below
+        return "POST", "/register", {"username": f"bench{i}", "gesture_name": "bench",
+                                     "angle_data": angle_data}, 200
+
+    results = {"web.register": load(base_url, register, max(total, len(usernames)), concurrency)}
+
+    def login_angles(i):
+        return "POST", "/login", {"username": usernames[i % len(usernames)],
+                                  "angle_data": angle_data}, 200
+
+    def login_frames(i):
+        return "POST", "/login", {"username": usernames[i % len(usernames)],
+                                  "angle_frames": [TEMPLATE] * 15}, 200
+
+    def login_live(i):
+        return "POST", "/login", {"username": usernames[i % len(usernames)],
+                                  "live_frames": 15}, 200
+
+    def create_document(i):
+        return "POST", f"/documents?username={usernames[i % len(usernames)]}", \
+            {"title": f"Doc {i}", "content": "x" * 512}, 200
+
+    def list_documents(i):
+        return "GET", f"/documents?username={usernames[i % len(usernames)]}", None, 200
+
+    def hand_angles(i):
+        return "GET", "/api/hand-angles", None, 200
+
+    results["web.login.angle_data"] = load(base_url, login_angles, total, concurrency)
+    results["web.login.angle_frames"] = load(base_url, login_frames, total, concurrency)
+    results["web.login.live_frames"] = load(base_url, login_live, total, concurrency)
+    results["web.documents.create"] = load(base_url, create_document, total, concurrency)
+    results["web.documents.list"] = load(base_url, list_documents, total, concurrency)
+    results["web.hand_angles"] = load(base_url, hand_angles, total, concurrency)
+
+    import database
+    database.auth_log_writer.flush()
+    database.access_log_writer.flush()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = suite(args.requests, args.concurrency, args.users)
+    print_results(results)
+    for name, stats in results.items():
+        if stats["errors"]:
+            print(f"{name}: {stats['errors']} unexpected responses")
+    if args.json:
+        write_results(args.json, results)
@@ -0,0 +1,46 @@
+"""
+Micro-benchmark for gesture matching (verify_gesture_angles and the batched
+verify_gesture_samples used by multi-frame login).
+
+Run from the web-app directory:
+    python benchmarks/bench_matching.py [--json results.json]
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# Shared timing helpers (stats.py) live in the repository-level benchmarks/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "benchmarks")))
+from database import verify_gesture_angles, verify_gesture_samples
+from gesture_matcher import ANGLE_LABELS, angles_to_vector
+from stats import print_results, time_calls, write_results
+
+
+def suite(seed=0, repeat=200):
+    rng = np.random.default_rng(seed)
+    template = dict(zip(ANGLE_LABELS, rng.uniform(40, 180, len(ANGLE_LABELS)).tolist()))
+    vector = angles_to_vector(template)
+    sample = {label: value + 3.0 for label, value in template.items()}
+    frames = (vector + rng.normal(0, 3, (15, len(ANGLE_LABELS)))).tolist()
+    return {
+        "web.verify_gesture_angles.dict": time_calls(
+            lambda: verify_gesture_angles(template, sample, 0.85), repeat),
+        "web.verify_gesture_angles.vector": time_calls(
+            lambda: verify_gesture_angles(vector, sample, 0.85), repeat),
+        "web.verify_gesture_samples.15_frames": time_calls(
+            lambda: verify_gesture_samples(vector, frames, 0.85), repeat),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+    results = suite()
+    print_results(results)
+    if args.json:
+        write_results(args.json, results)
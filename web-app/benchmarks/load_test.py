@@ -0,0 +1,101 @@
+"""
+Load-test comparison of the Flask and ASGI serving modes.
+
+Drives the I/O-bound endpoints with a fixed number of concurrent clients
+(closed loop: each client sends its next request as soon as the previous one
+returns) and reports throughput, latency percentiles and errors per target.
+
+Start both modes against the same MongoDB and ML client, e.g.:
+    python app.py                                         # Flask on :5001
+    hypercorn async_app:app --bind 0.0.0.0:5002 --workers 1
+
+then, from the web-app directory:
+    python benchmarks/load_test.py --target flask=http://localhost:5001 \\
+        --target asgi=http://localhost:5002 --username alice --concurrency 64
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from gesture_matcher import NUM_ANGLES
+
+
+def endpoints(username):
+    """(name, method, path, json body) for each scenario"""
+    frames = [[90.0] * NUM_ANGLES for _ in range(15)]
+    return [
+        ("hand-angles", "GET", "/api/hand-angles", None),
+        ("login", "POST", "/login", {"username": username, "angle_frames": frames}),
+        ("documents", "GET", f"/documents?username={username}", None),
+    ]
+
+
+def run_scenario(base_url, method, path, body, concurrency, duration):
+    """Return (latencies in seconds, error count, elapsed seconds)"""
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_maxsize=concurrency))
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client():
+        nonlocal errors
+        local, failed = [], 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                response = session.request(method, base_url + path, json=body, timeout=10)
+                # 401 is a valid answer for a non-matching login gesture
+                ok = response.status_code < 500
+            except requests.exceptions.RequestException:
+                ok = False
+            local.append(time.perf_counter() - started)
+            failed += not ok
+        with lock:
+            latencies.extend(local)
+            errors += failed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(client)
+    return np.array(latencies), errors, time.perf_counter() - started
+
+
+def report(name, scenario, latencies, errors, elapsed):
+    if not len(latencies):
+        print(f"{name:8s} {scenario:12s} no completed requests")
+        return
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000.0
+    print(f"{name:8s} {scenario:12s} {len(latencies) / elapsed:9.1f} req/s  "
+          f"p50 {p50:7.1f} ms  p95 {p95:7.1f} ms  p99 {p99:7.1f} ms  errors {errors}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", action="append", required=True,
+                        help="name=base URL (repeat to compare modes)")
+    parser.add_argument("--username", default="loadtest", help="existing user for /login and /documents")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    parser.add_argument("--only", help="run a single scenario (hand-angles, login, documents)")
+    args = parser.parse_args()
+
+    for target in args.target:
+        name, _, url = target.partition("=")
+        for scenario, method, path, body in endpoints(args.username):
+            if args.only and scenario != args.only:
+                continue
+            report(name, scenario, *run_scenario(url.rstrip("/"), method, path, body,
+                                                 args.concurrency, args.duration))
@@ -0,0 +1,134 @@
+"""
+MongoDB client settings for the web app, read from environment variables.
+
+- client_options(): keyword arguments for MongoClient (pool sizing, timeouts,
+  compression, read preference). The client connects on first use.
+- write_concern(kind): write concern for a class of writes, so that logs can
+  be fire-and-forget while account changes wait for a majority.
+- PoolMonitor: connection pool (CMAP) listener whose counters are reported
+  on /health.
+
+Unset variables leave the driver default in place, except where noted.
+"""
+
+import os
+from threading import Lock
+
+from pymongo import WriteConcern
+from pymongo.monitoring import ConnectionPoolListener
+
+# (environment variable, MongoClient option, type)
+CLIENT_SETTINGS = (
+    ('MONGO_MAX_POOL_SIZE', 'maxPoolSize', int),
+    ('MONGO_MIN_POOL_SIZE', 'minPoolSize', int),
+    ('MONGO_MAX_IDLE_TIME_MS', 'maxIdleTimeMS', int),
+    ('MONGO_MAX_CONNECTING', 'maxConnecting', int),
+    ('MONGO_WAIT_QUEUE_TIMEOUT_MS', 'waitQueueTimeoutMS', int),
+    ('MONGO_SERVER_SELECTION_TIMEOUT_MS', 'serverSelectionTimeoutMS', int),
+    ('MONGO_CONNECT_TIMEOUT_MS', 'connectTimeoutMS', int),
+    ('MONGO_SOCKET_TIMEOUT_MS', 'socketTimeoutMS', int),
+    ('MONGO_HEARTBEAT_FREQUENCY_MS', 'heartbeatFrequencyMS', int),
+    ('MONGO_COMPRESSORS', 'compressors', str),
+    ('MONGO_READ_PREFERENCE', 'readPreference', str),
+    ('MONGO_APPNAME', 'appname', str),
+)
+
+# Defaults that differ from the driver's: fail over (or fail) in seconds
+# rather than the driver's 30 s server selection / 20 s connect timeouts
+CLIENT_DEFAULTS = {
+    'serverSelectionTimeoutMS': 5000,
+    'connectTimeoutMS': 5000,
+    'appname': 'gesture-web-app',
+}
+
+# Write concern per class of write: MONGO_WRITE_CONCERN_<KIND> is 0, 1, ...
+# or "majority". 'logs' covers authentication and document access logs,
+# 'users' account and gesture password changes, 'documents' document saves.
+WRITE_CONCERN_DEFAULTS = {'logs': '1', 'users': 'majority', 'documents': '1'}
+
+
+def client_options(environ=os.environ):
+    """MongoClient keyword arguments from the environment"""
+    options = dict(CLIENT_DEFAULTS)
+    for variable, option, cast in CLIENT_SETTINGS:
+        if environ.get(variable):
+            options[option] = cast(environ[variable])
+    # Never block at startup: the first operation opens the connections
+    options['connect'] = False
+    return options
+
+
+def write_concern(kind, environ=os.environ):
+    """WriteConcern for a class of writes (see WRITE_CONCERN_DEFAULTS)"""
+    w = environ.get(f'MONGO_WRITE_CONCERN_{kind.upper()}', WRITE_CONCERN_DEFAULTS[kind])
+    w = int(w) if w.isdigit() else w
+    if w == 0:
+        # Unacknowledged writes cannot have a timeout or journaling
+        return WriteConcern(w=0)
+    return WriteConcern(w=w, wtimeout=int(environ.get('MONGO_WRITE_TIMEOUT_MS', 10000)))
+
+
+class PoolMonitor(ConnectionPoolListener):
+    """Counts connection pool events across all servers the client talks to"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._counters = {
+            'open': 0, 'in_use': 0, 'waiting': 0,
+            'created': 0, 'closed': 0, 'checked_out': 0, 'checkout_failures': 0,
+            'pool_clears': 0, 'checkout_wait_ms_max': 0.0, 'checkout_wait_ms_total': 0.0,
+        }
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self._counters)
+        checkouts = stats.pop('checkout_wait_ms_total')
+        stats['checkout_wait_ms_mean'] = checkouts / stats['checked_out'] if stats['checked_out'] else 0.0
+        return stats
+
+    def _add(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                self._counters[name] += delta
+
+    def connection_created(self, event):
+        self._add(open=1, created=1)
+
+    def connection_closed(self, event):
+        self._add(open=-1, closed=1)
+
+    def connection_check_out_started(self, event):
+        self._add(waiting=1)
+
+    def connection_checked_out(self, event):
+        # duration: time spent waiting for a connection (pymongo 4.7+)
+        wait_ms = (getattr(event, 'duration', None) or 0.0) * 1000
+        with self._lock:
+            counters = self._counters
+            counters['waiting'] -= 1
+            counters['in_use'] += 1
+            counters['checked_out'] += 1
+            counters['checkout_wait_ms_total'] += wait_ms
+            counters['checkout_wait_ms_max'] = max(counters['checkout_wait_ms_max'], wait_ms)
+
+    def connection_check_out_failed(self, event):
+        self._add(waiting=-1, checkout_failures=1)
+
+    def connection_checked_in(self, event):
+        self._add(in_use=-1)
+
+    def pool_cleared(self, event):
+        self._add(pool_clears=1)
+
+    # Events that carry nothing the counters need
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
@@ -0,0 +1,50 @@
+"""
+Text patches for incremental document saves.
+
+A patch is a list of splice operations {"start": i, "end": j, "text": s},
+each replacing content[i:j] with s. Operations are applied in order, so
+offsets in later operations refer to the text produced by the earlier ones.
+Offsets count Unicode code points (Python str indices; Array.from(text) in
+the browser), not UTF-16 units or bytes.
+"""
+
+# Upper bound on splice operations in one patch
+MAX_PATCH_OPS = 100
+
+
+def apply_patch(content, ops):
+    """
+    Return `content` with the splice operations in `ops` applied.
+
+    Raises ValueError if the patch is malformed or an offset falls outside
+    the text it applies to.
+    """
+    if not isinstance(ops, list) or len(ops) > MAX_PATCH_OPS:
+        raise ValueError(f"ops must be a list of at most {MAX_PATCH_OPS} operations")
+    for op in ops:
+        if not isinstance(op, dict):
+            raise ValueError("Each operation must be an object")
+        start, end, text = op.get('start'), op.get('end', op.get('start')), op.get('text', '')
+        if type(start) is not int or type(end) is not int or not isinstance(text, str):
+            raise ValueError("Operations need integer start/end and string text")
+        if not 0 <= start <= end <= len(content):
+            raise ValueError(f"Operation {start}:{end} is outside a text of length {len(content)}")
+        content = content[:start] + text + content[end:]
+    return content
+
+
+def diff_text(old, new):
+    """
+    Smallest single splice turning `old` into `new` (common prefix and
+    suffix trimmed), as a patch for apply_patch(); [] if they are equal.
+    """
+    if old == new:
+        return []
+    limit = min(len(old), len(new))
+    start = 0
+    while start < limit and old[start] == new[start]:
+        start += 1
+    suffix = 0
+    while suffix < limit - start and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    return [{'start': start, 'end': len(old) - suffix, 'text': new[start:len(new) - suffix]}]
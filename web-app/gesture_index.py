@@ -0,0 +1,224 @@
+"""
+In-memory nearest-neighbour index over users' gesture templates.
+
+Used to identify who is presenting a gesture without a username. Each
+template's angles are embedded on the unit circle, (cos θ, sin θ) per
+joint, so that Euclidean distance respects wrap-around (350° is close to
+10°). An inverted-file (IVF) index splits the embedded templates into
+k-means clusters. A query is compared with the centroids and only the
+templates in the `nprobe` closest clusters are considered. They are ranked
+with one matrix-vector product in the embedded space, and the best `rerank`
+are scored exactly. The exact score is gesture_matcher.score_samples, the
+same wrap-aware confidence used for login.
+
+Until `min_train` templates have been added the index scans every template.
+search_exact() always does, as a correctness reference.
+"""
+
+import math
+from threading import Lock
+
+import numpy as np
+
+from gesture_matcher import NUM_ANGLES, angles_to_vector, score_samples
+
+
+def embed(vectors):
+    """(N, 10) angles in degrees -> (N, 20) points on the joints' unit circles (NaN -> 0)"""
+    radians = np.radians(np.asarray(vectors, dtype=np.float32))
+    embedded = np.concatenate([np.cos(radians), np.sin(radians)], axis=-1)
+    return np.nan_to_num(embedded, nan=0.0).astype(np.float32, copy=False)
+
+
+def nearest(points, centroids, chunk=8192):
+    """Index of the closest centroid for each point, computed in chunks"""
+    centroid_norms = (centroids ** 2).sum(axis=1)
+    labels = np.empty(len(points), dtype=np.int64)
+    for start in range(0, len(points), chunk):
+        block = points[start:start + chunk]
+        # |p - c|^2 without the |p|^2 term, which is the same for every centroid
+        labels[start:start + chunk] = (centroid_norms - 2.0 * block @ centroids.T).argmin(axis=1)
+    return labels
+
+
+def kmeans(points, clusters, iterations=10, seed=0):
+    """Plain Lloyd's k-means; empty clusters are re-seeded from random points"""
+    rng = np.random.default_rng(seed)
+    centroids = points[rng.choice(len(points), clusters, replace=False)].copy()
+    for _ in range(iterations):
+        labels = nearest(points, centroids)
+        counts = np.bincount(labels, minlength=clusters)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, points)
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        centroids[empty] = points[rng.choice(len(points), int(empty.sum()))]
+    return centroids
+
+
+class GestureIndex:
+    """
+    Thread-safe template index keyed by user id (one template per user).
+    Each entry may carry the id of the gesture password it came from, so that
+    deactivating an older password does not drop the user's current one.
+
+    - nlist: number of clusters (default: about sqrt of the number of templates)
+    - nprobe: clusters scanned per query
+    - rerank: candidates scored exactly per query (at least k)
+    - min_train: templates needed before clustering; smaller indexes are scanned in full
+    """
+
+    def __init__(self, nlist=None, nprobe=8, rerank=32, min_train=1000, seed=0):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.rerank = rerank
+        self.min_train = min_train
+        self.seed = seed
+        self._lock = Lock()
+        self._reset(capacity=1024)
+
+    def _reset(self, capacity):
+        self._vectors = np.full((capacity, NUM_ANGLES), np.nan, dtype=np.float32)
+        self._embedded = np.zeros((capacity, 2 * NUM_ANGLES), dtype=np.float32)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._user_ids = []
+        self._row_of = {}
+        self._template_ids = {}
+        self._centroids = None
+        self._lists = []
+        self._list_arrays = []
+        self._trained_size = 0
+
+    def __len__(self):
+        return len(self._row_of)
+
+    def build(self, entries):
+        """Replace the index contents with (user_id, angles[, template_id]) tuples and cluster them"""
+        entries = [(str(user_id), angles_to_vector(angles), rest[0] if rest else None)
+                   for user_id, angles, *rest in entries]
+        with self._lock:
+            self._reset(capacity=max(1024, len(entries)))
+            for user_id, vector, template_id in entries:
+                self._append(user_id, vector)
+                self._template_ids[user_id] = template_id
+            self._train()
+
+    def add(self, user_id, angles, template_id=None):
+        """Insert or replace a user's template"""
+        vector = angles_to_vector(angles)
+        with self._lock:
+            self._append(str(user_id), vector)
+            self._template_ids[str(user_id)] = template_id
+            if self._centroids is None:
+                if len(self._row_of) >= self.min_train:
+                    self._train()
+            elif len(self._row_of) > 4 * self._trained_size:
+                # Clusters sized for a much smaller index would make queries slow
+                self._train()
+
+    def remove(self, user_id, template_id=None):
+        """Drop a user's template; with template_id, only if it is the one indexed"""
+        user_id = str(user_id)
+        with self._lock:
+            if template_id is not None and self._template_ids.get(user_id) != template_id:
+                return
+            self._template_ids.pop(user_id, None)
+            row = self._row_of.pop(user_id, None)
+            if row is not None:
+                self._alive[row] = False
+
+    def search(self, angles, k=5, nprobe=None):
+        """
+        The k templates most similar to `angles`, as [(user_id, confidence)]
+        sorted best first
+        """
+        query = angles_to_vector(angles)
+        embedded = embed(query[None])[0]
+        with self._lock:
+            rows = self._candidates(embedded, nprobe or self.nprobe)
+            if len(rows) > max(self.rerank, k):
+                # Closest on the unit circles = largest dot product (|e| is the same for complete templates)
+                similarity = self._embedded[rows] @ embedded
+                rows = rows[np.argpartition(-similarity, max(self.rerank, k) - 1)[:max(self.rerank, k)]]
+            return self._top_k(query, rows, k)
+
+    def search_exact(self, angles, k=5):
+        """Brute-force version of search() over every template"""
+        query = angles_to_vector(angles)
+        with self._lock:
+            return self._top_k(query, np.flatnonzero(self._alive[:len(self._user_ids)]), k)
+
+    def _append(self, user_id, vector):
+        previous = self._row_of.get(user_id)
+        if previous is not None:
+            self._alive[previous] = False
+        row = len(self._user_ids)
+        if row == len(self._vectors):
+            self._grow()
+        self._vectors[row] = vector
+        self._embedded[row] = embed(vector[None])[0]
+        self._alive[row] = True
+        self._user_ids.append(user_id)
+        self._row_of[user_id] = row
+        if self._centroids is not None:
+            cluster = int(nearest(self._embedded[row:row + 1], self._centroids)[0])
+            self._lists[cluster].append(row)
+            self._list_arrays[cluster] = None
+
+    def _grow(self):
+        capacity = 2 * len(self._vectors)
+        for name, fill in (('_vectors', np.nan), ('_embedded', 0.0), ('_alive', False)):
+            old = getattr(self, name)
+            new = np.full((capacity,) + old.shape[1:], fill, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def _train(self):
+        """Cluster the live templates (dropping replaced rows) and fill the lists"""
+        rows = np.flatnonzero(self._alive[:len(self._user_ids)])
+        if len(rows) < self.min_train:
+            self._centroids = None
+            return
+        # Compact first so row numbers stay dense
+        user_ids = [self._user_ids[row] for row in rows]
+        vectors, embedded = self._vectors[rows], self._embedded[rows]
+        template_ids = self._template_ids
+        self._reset(capacity=max(1024, 2 * len(rows)))
+        self._template_ids = template_ids
+        self._vectors[:len(rows)], self._embedded[:len(rows)] = vectors, embedded
+        self._alive[:len(rows)] = True
+        self._user_ids = user_ids
+        self._row_of = {user_id: row for row, user_id in enumerate(user_ids)}
+
+        clusters = self.nlist or max(1, int(math.sqrt(len(rows))))
+        rng = np.random.default_rng(self.seed)
+        sample = embedded[rng.choice(len(rows), min(len(rows), 256 * clusters), replace=False)]
+        self._centroids = kmeans(sample, min(clusters, len(sample)), seed=self.seed)
+        labels = nearest(embedded, self._centroids)
+        order = np.argsort(labels, kind='stable')
+        bounds = np.searchsorted(labels[order], np.arange(len(self._centroids) + 1))
+        self._lists = [order[bounds[i]:bounds[i + 1]].tolist() for i in range(len(self._centroids))]
+        self._list_arrays = [order[bounds[i]:bounds[i + 1]] for i in range(len(self._centroids))]
+        self._trained_size = len(rows)
+
+    def _candidates(self, embedded, nprobe):
+        if self._centroids is None:
+            return np.flatnonzero(self._alive[:len(self._user_ids)])
+        distances = ((self._centroids - embedded) ** 2).sum(axis=1)
+        probes = np.argpartition(distances, min(nprobe, len(distances)) - 1)[:nprobe]
+        for cluster in probes:
+            if self._list_arrays[cluster] is None:
+                self._list_arrays[cluster] = np.array(self._lists[cluster], dtype=np.int64)
+        rows = np.concatenate([self._list_arrays[cluster] for cluster in probes])
+        return rows[self._alive[rows]]
+
+    def _top_k(self, query, rows, k):
+        if len(rows) == 0:
+            return []
+        _, confidence = score_samples(query, self._vectors[rows], 0.0)
+        if len(rows) > k:
+            best = np.argpartition(-confidence, k - 1)[:k]
+        else:
+            best = np.arange(len(rows))
+        best = best[np.argsort(-confidence[best], kind='stable')]
+        return [(self._user_ids[rows[i]], float(confidence[i])) for i in best]
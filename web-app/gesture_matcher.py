@@ -0,0 +1,121 @@
+"""
+Compact gesture templates and vectorized angle matching.
+
+Templates are stored as 10 float32 values in the fixed ANGLE_LABELS order
+(40 bytes of BSON binary) instead of a dict keyed by joint label. Matching a
+sample - or a whole batch of samples - against a template is a single NumPy
+expression with optional per-joint weights and a tolerance dead-band.
+"""
+
+import numpy as np
+from bson.binary import Binary
+
+ANGLE_LABELS = (
+    "Thumb MCP→IP", "Thumb IP→Tip",
+    "Index MCP→PIP", "Index PIP→DIP",
+    "Middle MCP→PIP", "Middle PIP→DIP",
+    "Ring MCP→PIP", "Ring PIP→DIP",
+    "Pinky MCP→PIP", "Pinky PIP→DIP"
+)
+NUM_ANGLES = len(ANGLE_LABELS)
+
+# gesture_data['schema_version'] for templates stored as angle vectors.
+# Version 1 (no schema_version field) stores a label-keyed 'angle_data' dict.
+TEMPLATE_SCHEMA_VERSION = 2
+
+# Average angle difference (degrees) at which confidence reaches 0.0
+MAX_ALLOWABLE_DIFF = 45.0
+
+
+def angles_to_vector(angle_data, fill=np.nan):
+    """
+    Convert angle data to a float32 vector in ANGLE_LABELS order.
+
+    angle_data may be a dict keyed by joint label or a sequence of 10 values.
+    Missing joints (or None values in a sequence) are set to `fill`.
+    """
+    if isinstance(angle_data, np.ndarray):
+        return angle_data.astype(np.float32, copy=False)
+    if isinstance(angle_data, dict):
+        values = [angle_data.get(label) for label in ANGLE_LABELS]
+    else:
+        values = list(angle_data)
+        if len(values) != NUM_ANGLES:
+            raise ValueError(f"Expected {NUM_ANGLES} angles, got {len(values)}")
+    return np.array([fill if v is None else float(v) for v in values], dtype=np.float32)
+
+
+def samples_to_matrix(samples):
+    """Convert a list of samples (dicts or sequences) to an (N, 10) float32 matrix"""
+    return np.stack([angles_to_vector(sample) for sample in samples])
+
+
+def vector_to_binary(vector):
+    """Pack a 10-angle vector as little-endian float32 BSON binary"""
+    return Binary(np.asarray(vector, dtype="<f4").tobytes())
+
+
+def binary_to_vector(data):
+    """Unpack a vector stored by vector_to_binary()"""
+    return np.frombuffer(data, dtype="<f4")
+
+
+def template_vector(gesture_data):
+    """Return the template angle vector from a gesture_data document (any schema)"""
+    if gesture_data.get('schema_version', 1) >= TEMPLATE_SCHEMA_VERSION:
+        return binary_to_vector(gesture_data['angle_vector'])
+    return angles_to_vector(gesture_data['angle_data'])
+
+
+def score_samples(template, samples, threshold, weights=None, tolerance=0.0):
+    """
+    Score one or many samples against a template in a single pass.
+
+    - template: 10-element vector (see angles_to_vector)
+    - samples: (10,) vector or (N, 10) matrix; NaN marks a missing joint
+    - threshold: similarity threshold (0.0-1.0) for authentication
+    - weights: optional per-joint weights (default: all joints equal)
+    - tolerance: per-joint dead-band in degrees; differences up to it count as 0
+
+    Returns (success, confidence) arrays with one entry per sample
+    (0-d arrays for a single sample).
+    """
+    samples = np.asarray(samples, dtype=np.float32)
+    template = np.asarray(template, dtype=np.float32)
+    weights = np.ones(NUM_ANGLES, dtype=np.float32) if weights is None \
+        else np.asarray(weights, dtype=np.float32)
+
+    # Absolute difference with wrap-around (350° vs 10° is 20°, not 340°)
+    diff = np.abs(samples - template) % 360.0
+    diff = np.minimum(diff, 360.0 - diff)
+    diff = np.maximum(diff - tolerance, 0.0)
+
+    present = ~np.isnan(diff)
+    joint_weights = np.where(present, weights, 0.0)
+    total_weight = joint_weights.sum(axis=-1)
+    weighted = np.where(present, diff, 0.0) * joint_weights
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        avg_difference = weighted.sum(axis=-1) / total_weight
+    confidence = np.clip(1.0 - avg_difference / MAX_ALLOWABLE_DIFF, 0.0, 1.0)
+    confidence = np.where(total_weight > 0, confidence, 0.0)
+
+    return confidence >= threshold, confidence
+
+
+def aggregate_confidence(confidences, method='median', trim=0.2):
+    """
+    Combine per-frame confidences into one robust score.
+
+    method is 'median' or 'trimmed_mean' (drops the `trim` fraction of
+    lowest and highest scores before averaging).
+    """
+    confidences = np.sort(np.asarray(confidences, dtype=np.float64))
+    if confidences.size == 0:
+        return 0.0
+    if method == 'median':
+        return float(np.median(confidences))
+    if method == 'trimmed_mean':
+        cut = int(confidences.size * trim)
+        return float(confidences[cut:confidences.size - cut].mean())
+    raise ValueError(f"Unknown aggregation method: {method}")
@@ -0,0 +1,28 @@
+"""
+Bulk-create users and gesture passwords from an NDJSON or CSV file (see
+user_import.py for the row format).
+
+Usage:
+    python import_users.py users.ndjson
+    python import_users.py users.csv [--format csv] [--batch-size 1000]
+"""
+import argparse
+from flask import Flask
+from database import init_app, import_users, IMPORT_BATCH_SIZE
+from user_import import FORMATS, guess_format, parse_rows
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('path')
+    parser.add_argument('--format', choices=FORMATS, help='default: from the file extension')
+    parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    init_app(app)
+    with app.app_context(), open(args.path, encoding='utf-8', newline='') as f:
+        report = import_users(parse_rows(f, args.format or guess_format(args.path)), args.batch_size)
+    for error in report['errors']:
+        print(f"line {error['line']} ({error['username']}): {error['error']}")
+    print(f"Imported {report['imported']} user(s), {report['failed']} failed, "
+          f"{report['rows_per_s']:.0f} rows/s")
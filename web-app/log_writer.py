@@ -0,0 +1,163 @@
+"""
+Background writer that batches log documents into MongoDB.
+
+Request handlers call write(), which only appends to an in-memory buffer. A
+daemon thread flushes the buffer with insert_many() whenever it reaches
+`batch_size` documents or `flush_interval` seconds have passed, and once more
+when the process exits.
+"""
+
+import atexit
+import time
+from collections import deque
+from threading import Condition, Thread
+
+from pymongo.errors import BulkWriteError
+
+# What write() does when `max_pending` documents are already buffered
+OVERFLOW_POLICIES = ('drop_oldest', 'drop_newest', 'block')
+
+
+class BatchLogWriter:
+    """
+    Buffered, batched insert_many() writer for append-only log collections.
+
+    - get_collection: zero-argument callable returning the target collection
+      (resolved on every flush, so the database can be swapped in tests)
+    - batch_size: flush as soon as this many documents are pending
+    - flush_interval: maximum seconds a document waits before being flushed
+    - max_pending: upper bound on buffered documents (bounded memory)
+    - overflow: 'drop_oldest', 'drop_newest' or 'block' (wait up to
+      block_timeout seconds for room, then drop the new document)
+    - retries: extra attempts for a batch that failed as a whole (e.g. the
+      server was unreachable), retry_delay seconds apart, doubling each time.
+      Documents the server rejected individually are not retried.
+    """
+
+    def __init__(self, get_collection, batch_size=100, flush_interval=1.0,
+                 max_pending=10000, overflow='drop_oldest', block_timeout=1.0,
+                 retries=0, retry_delay=0.5):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}")
+        self.get_collection = get_collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+
+        self._pending = deque()
+        self._cond = Condition()
+        self._in_flight = 0
+        self._flush_requested = False
+        self._closed = False
+        self._thread = None
+        self._stats = {'written': 0, 'dropped': 0, 'failed': 0, 'batches': 0}
+        atexit.register(self.close)
+
+    def write(self, document):
+        """Queue one document; returns False if it was dropped"""
+        with self._cond:
+            closed = self._closed
+        if closed:
+            # No background thread any more; written directly, outside the
+            # lock so other writers and stats() do not wait on the network
+            return self._insert_now([document])
+
+        with self._cond:
+            if len(self._pending) >= self.max_pending:
+                if self.overflow == 'drop_oldest':
+                    self._pending.popleft()
+                    self._stats['dropped'] += 1
+                elif self.overflow == 'drop_newest' or not self._cond.wait_for(
+                        lambda: len(self._pending) < self.max_pending, self.block_timeout):
+                    self._stats['dropped'] += 1
+                    return False
+
+            self._pending.append(document)
+            if self._thread is None:
+                self._thread = Thread(target=self._run, daemon=True)
+                self._thread.start()
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify_all()
+        return True
+
+    def flush(self, timeout=5.0):
+        """Block until every document queued so far has been written"""
+        with self._cond:
+            if self._thread is None:
+                return not self._pending
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(
+                lambda: not self._pending and not self._in_flight, timeout)
+
+    def close(self, timeout=5.0):
+        """Flush outstanding documents and stop the background thread"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        # Anything still buffered (e.g. thread never started) goes out directly
+        with self._cond:
+            batch = list(self._pending)
+            self._pending.clear()
+        if batch:
+            self._insert_now(batch)
+
+    def stats(self):
+        with self._cond:
+            return dict(self._stats, pending=len(self._pending))
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: (len(self._pending) >= self.batch_size
+                             or self._flush_requested or self._closed),
+                    self.flush_interval)
+
+                count = min(len(self._pending), self.batch_size)
+                batch = [self._pending.popleft() for _ in range(count)]
+                self._in_flight = len(batch)
+                self._flush_requested = self._flush_requested and bool(self._pending)
+                stop = self._closed and not self._pending
+                # Wake writers blocked on a full buffer
+                self._cond.notify_all()
+
+            if batch:
+                self._insert_now(batch)
+            with self._cond:
+                self._in_flight = 0
+                self._cond.notify_all()
+            if stop:
+                return
+
+    def _insert_now(self, batch):
+        written = 0
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.retry_delay * 2 ** (attempt - 1))
+            try:
+                self.get_collection().insert_many(batch, ordered=False)
+                written, error = len(batch), None
+                break
+            except BulkWriteError as e:
+                # Some documents were rejected; sending them again would not help
+                written, error = e.details.get('nInserted', 0), e
+                break
+            except Exception as e:
+                error = e
+        with self._cond:
+            self._stats['written'] += written
+            self._stats['failed'] += len(batch) - written
+            self._stats['batches'] += 1 if written else 0
+        if error is not None:
+            print("Failed to write log batch:", error)
+        return error is None
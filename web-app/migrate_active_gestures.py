@@ -0,0 +1,17 @@
+"""
+One-off migration: copy each user's active gesture password into
+users.active_gesture (or, with GESTURE_TEMPLATE_LAYOUT=separate, remove the
+copies), so logins need only the user lookup.
+
+Usage:
+    python migrate_active_gestures.py
+"""
+from flask import Flask
+from database import init_app, migrate_active_gestures
+
+if __name__ == '__main__':
+    app = Flask(__name__)
+    init_app(app)
+    with app.app_context():
+        count = migrate_active_gestures()
+    print(f"Updated {count} user(s)")
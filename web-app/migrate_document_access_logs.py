@@ -0,0 +1,19 @@
+"""
+One-off migration: move the access_logs arrays embedded in documents into the
+document_access_logs collection, and drop the per-user documents lists.
+document_access_logs is created as a time-series collection first if the
+database predates it (mongo-init.js only runs on a fresh volume).
+
+Usage:
+    python migrate_document_access_logs.py
+"""
+from flask import Flask
+from database import init_app, migrate_document_access_logs
+
+if __name__ == '__main__':
+    app = Flask(__name__)
+    init_app(app)
+    with app.app_context():
+        documents, moved, users = migrate_document_access_logs()
+    print(f"Moved {moved} access log entr{'y' if moved == 1 else 'ies'} "
+          f"from {documents} document(s); cleaned up {users} user(s)")
@@ -0,0 +1,16 @@
+"""
+One-off migration: convert dict-based gesture templates in gesture_passwords
+to the compact float32 vector format used by gesture_matcher.
+
+Usage:
+    python migrate_gesture_templates.py
+"""
+from flask import Flask
+from database import init_app, migrate_gesture_templates
+
+if __name__ == '__main__':
+    app = Flask(__name__)
+    init_app(app)
+    with app.app_context():
+        count = migrate_gesture_templates()
+    print(f"Migrated {count} gesture template(s)")
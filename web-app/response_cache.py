@@ -0,0 +1,64 @@
+"""
+Serialized document responses and their validators, for conditional GET.
+
+GET /documents/<id> and GET /documents keep their JSON bodies in
+database.document_response_cache, so repeated reads of unchanged documents
+skip both MongoDB and JSON encoding. Each response carries an ETag (and, for
+a single document, a Last-Modified) derived from the documents' updated_at,
+so browsers revalidate with If-None-Match and get an empty 304 back.
+"""
+
+import hashlib
+import json
+from collections import namedtuple
+from datetime import timezone
+
+from werkzeug.http import http_date, parse_date
+
+# kind is 'document' or 'list'; last_modified is a naive UTC datetime or
+# None; version is what database.get_document_version() or
+# get_listing_version() returned when the body was read (None if not checked)
+CachedResponse = namedtuple('CachedResponse', 'user_id kind body etag last_modified version')
+
+
+def document_response(user_id, document):
+    """CachedResponse for GET /documents/<id>"""
+    updated_at = document['updated_at']
+    body = json.dumps({
+        'id': str(document['_id']),
+        'title': document['title'],
+        'content': document['content'],
+        'created_at': document['created_at'].isoformat(),
+        'updated_at': updated_at.isoformat(),
+        'revision': document.get('revision', 0)
+    }).encode()
+    etag = '"%d-%d"' % (document.get('revision', 0), updated_at.replace(tzinfo=timezone.utc).timestamp() * 1000)
+    version = (document.get('revision', 0), updated_at)
+    return CachedResponse(str(user_id), 'document', body, etag, updated_at, version)
+
+
+def list_response(user_id, body, version=None):
+    """CachedResponse for a GET /documents page; the ETag hashes the body (ids and updated_at)"""
+    body = body.encode()
+    etag = '"%s"' % hashlib.sha1(body).hexdigest()[:20]
+    return CachedResponse(str(user_id), 'list', body, etag, None, version)
+
+
+def not_modified(cached, if_none_match, if_modified_since):
+    """Whether the request's validators still match `cached` (If-None-Match wins)"""
+    if if_none_match:
+        tags = {tag.strip() for tag in if_none_match.split(',')}
+        return '*' in tags or cached.etag in tags or 'W/' + cached.etag in tags
+    if if_modified_since and cached.last_modified is not None:
+        since = parse_date(if_modified_since)
+        # HTTP dates have whole seconds
+        return since is not None and cached.last_modified.replace(microsecond=0, tzinfo=timezone.utc) <= since
+    return False
+
+
+def validator_headers(cached):
+    # private: bodies are per user; no-cache: browsers revalidate every time
+    headers = {'ETag': cached.etag, 'Cache-Control': 'private, no-cache'}
+    if cached.last_modified is not None:
+        headers['Last-Modified'] = http_date(cached.last_modified.replace(tzinfo=timezone.utc))
+    return headers
@@ -12,46 +12,78 @@ const demoAngles = {
   "Pinky PIP→DIP": 47.28
 };
 
-async function getLiveAngles(formType) {
+const angleLabels = [
+  "Thumb MCP→IP", "Thumb IP→Tip",
+  "Index MCP→PIP", "Index PIP→DIP",
+  "Middle MCP→PIP", "Middle PIP→DIP",
+  "Ring MCP→PIP", "Ring PIP→DIP",
+  "Pinky MCP→PIP", "Pinky PIP→DIP"
+];
+
+// Shared live angle stream (at most one EventSource per page)
+let angleStream = null;
+let liveFormType = null;
+
+function fillAngleTable(formType, data) {
   const tableId = formType === 'reg' ? 'hand-angles-table-reg' : 'hand-angles-table-login';
 
-  try {
-    const response = await fetch("/api/hand-angles");
-    const data = await response.json();
+  if (!data.hand_present) {
+    document.getElementById("result").textContent = "🖐️ Hand is not in view.";
+    return;
+  }
 
-    if (!data.hand_present) {
-      document.getElementById("result").textContent = "🖐️ Hand is not in view.";
-      return;
+  const inputs = document.querySelectorAll(`#${tableId} input`);
+  inputs.forEach(input => {
+    const label = input.getAttribute('data-angle');
+    const index = angleLabels.indexOf(label);
+    const angle = data.angles[index];
+
+    if (index !== -1 && angle !== null && angle !== undefined) {
+      input.value = angle.toFixed(2);
+    } else {
+      input.value = ""; // Clear the input if no valid data
     }
+  });
 
-    const labels = [
-      "Thumb MCP→IP", "Thumb IP→Tip",
-      "Index MCP→PIP", "Index PIP→DIP",
-      "Middle MCP→PIP", "Middle PIP→DIP",
-      "Ring MCP→PIP", "Ring PIP→DIP",
-      "Pinky MCP→PIP", "Pinky PIP→DIP"
-    ];
-
-    const inputs = document.querySelectorAll(`#${tableId} input`);
-    inputs.forEach(input => {
-      const label = input.getAttribute('data-angle');
-      const index = labels.indexOf(label);
-      const angle = data.angles[index];
-
-      if (index !== -1 && angle !== null && angle !== undefined) {
-        input.value = angle.toFixed(2);
-      } else {
-        input.value = ""; // Clear the input if no valid data
-      }
-    });
+  document.getElementById("result").textContent = "✅ Hand angles updated!";
+}
 
-    document.getElementById("result").textContent = "✅ Hand angles updated!";
+async function getLiveAngles(formType) {
+  try {
+    const response = await fetch("/api/hand-angles");
+    const data = await response.json();
+    fillAngleTable(formType, data);
   } catch (err) {
     console.error("Error fetching hand angles:", err);
     document.getElementById("result").textContent = "❌ Could not connect to hand tracking system.";
   }
 }
 
+// Keep the angle table updated from the server-pushed stream instead of polling
+function toggleLiveAngles(formType) {
+  const resultEl = document.getElementById("result");
+  const wasStreaming = liveFormType === formType;
+
+  if (angleStream) {
+    angleStream.close();
+    angleStream = null;
+    liveFormType = null;
+  }
+
+  if (wasStreaming) {
+    resultEl.textContent = "⏹️ Live hand tracking stopped.";
+    return;
+  }
+
+  liveFormType = formType;
+  angleStream = new EventSource("/api/hand-angles/stream");
+  angleStream.onmessage = (event) => fillAngleTable(liveFormType, JSON.parse(event.data));
+  angleStream.onerror = () => {
+    resultEl.textContent = "❌ Lost connection to hand tracking system, retrying...";
+  };
+  resultEl.textContent = "📡 Streaming live hand angles...";
+}
+
 // Fill form with demo data for testing
 function fillDemoData(formType) {
   const tableId = formType === 'reg' ? 'hand-angles-table-reg' : 'hand-angles-table-login';
@@ -145,22 +177,25 @@ async function submitLogin() {
     return;
   }
 
-  let angle_data;
-  try {
-    angle_data = collectAngleData("hand-angles-table-login");
-  } catch (err) {
-    resultEl.textContent = err.message;
-    return;
+  // While streaming, let the server score a window of recent frames instead
+  // of a single snapshot, so one jittery frame does not fail the login
+  let payload;
+  if (liveFormType === 'login') {
+    payload = { username, live_frames: 15 };
+  } else {
+    try {
+      payload = { username, angle_data: collectAngleData("hand-angles-table-login") };
+    } catch (err) {
+      resultEl.textContent = err.message;
+      return;
+    }
   }
 
   try {
     const res = await fetch("/login", {
       method: "POST",
       headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({
-        username,
-        angle_data
-      })
+      body: JSON.stringify(payload)
     });
 
     const data = await res.json();
@@ -179,15 +214,23 @@ async function submitLogin() {
   }
 }
 
-async function loadDocuments(username) {
+async function loadDocuments(username, cursor = null) {
   try {
-    const res = await fetch(`/documents?username=${username}`);
+    // The listing is paginated; "Load more" fetches the page after `cursor`
+    const query = cursor ? `&cursor=${encodeURIComponent(cursor)}` : "";
+    const res = await fetch(`/documents?username=${username}${query}`);
     if (res.ok) {
       const data = await res.json();
       const docListEl = document.getElementById("doc-list");
-      docListEl.innerHTML = "";
+      if (!cursor) {
+        docListEl.innerHTML = "";
+      }
+      const moreButton = document.getElementById("load-more-docs");
+      if (moreButton) {
+        moreButton.remove();
+      }
       
-      if (data.documents.length === 0) {
+      if (data.documents.length === 0 && !cursor) {
         docListEl.innerHTML = "<p>No documents found. Create a new one!</p>";
       } else {
         data.documents.forEach(doc => {
@@ -202,6 +245,14 @@ async function loadDocuments(username) {
         });
       }
       
+      if (data.next_cursor) {
+        const button = document.createElement("button");
+        button.id = "load-more-docs";
+        button.textContent = "Load more";
+        button.onclick = () => loadDocuments(username, data.next_cursor);
+        docListEl.appendChild(button);
+      }
+      
       document.getElementById("document-section").style.display = "block";
     }
   } catch (err) {
@@ -212,6 +263,15 @@ async function loadDocuments(username) {
 
 let currentDocId = null;
 let currentUsername = null;
+// Last content and revision the server confirmed; saves send a patch against them
+let savedContent = "";
+let currentRevision = 0;
+let saveInFlight = null;  // Promise chain that serializes saves
+let autosaveTimer = null;
+// Set when a save hit a newer revision and the user kept their text; no more
+// autosaves (and prompts) until the document is reloaded
+let saveConflict = false;
+const AUTOSAVE_DELAY_MS = 1500;
 
 async function openDocument(docId, username) {
   try {
@@ -224,6 +284,9 @@ async function openDocument(docId, username) {
       
       currentDocId = docId;
       currentUsername = username;
+      savedContent = doc.content;
+      currentRevision = doc.revision || 0;
+      saveConflict = false;
     }
   } catch (err) {
     console.error("Error opening document:", err);
@@ -232,25 +295,65 @@ async function openDocument(docId, username) {
 }
 
 function closeEditor() {
+  clearTimeout(autosaveTimer);
   document.getElementById("editor").style.display = "none";
   currentDocId = null;
 }
 
-async function saveDocument() {
+// Single splice turning oldText into newText, with offsets in code points
+// to match the server (see document_patch.py)
+function diffText(oldText, newText) {
+  const a = Array.from(oldText);
+  const b = Array.from(newText);
+  const limit = Math.min(a.length, b.length);
+  let start = 0;
+  while (start < limit && a[start] === b[start]) start++;
+  let suffix = 0;
+  while (suffix < limit - start && a[a.length - 1 - suffix] === b[b.length - 1 - suffix]) suffix++;
+  return [{ start, end: a.length - suffix, text: b.slice(start, b.length - suffix).join("") }];
+}
+
+function scheduleAutosave() {
+  clearTimeout(autosaveTimer);
+  if (saveConflict) return;
+  autosaveTimer = setTimeout(() => saveDocument(true), AUTOSAVE_DELAY_MS);
+}
+
+async function saveDocument(quiet = false) {
   if (!currentDocId || !currentUsername) return;
-  
+  // One save at a time: each patch is based on the revision the previous one produced
+  saveInFlight = (saveInFlight || Promise.resolve()).then(() => sendChanges(quiet));
+  await saveInFlight;
+}
+
+async function sendChanges(quiet) {
   const content = document.getElementById("doc-content").value;
+  if (content === savedContent) {
+    if (!quiet) alert("Document saved successfully!");
+    return;
+  }
   
   try {
     const res = await fetch(`/documents/${currentDocId}?username=${currentUsername}`, {
-      method: "PUT",
+      method: "PATCH",
       headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ content })
+      body: JSON.stringify({ base_revision: currentRevision, ops: diffText(savedContent, content) })
     });
     
     if (res.ok) {
-      alert("Document saved successfully!");
-      loadDocuments(currentUsername);
+      currentRevision = (await res.json()).revision;
+      savedContent = content;
+      if (!quiet) {
+        alert("Document saved successfully!");
+        loadDocuments(currentUsername);
+      }
+    } else if (res.status === 409) {
+      clearTimeout(autosaveTimer);
+      if (confirm("This document was changed elsewhere. Discard your unsaved changes and reload it?")) {
+        openDocument(currentDocId, currentUsername);
+      } else {
+        saveConflict = true;
+      }
     } else {
       alert("Error saving document");
     }
@@ -260,6 +363,11 @@ async function saveDocument() {
   }
 }
 
+document.addEventListener("DOMContentLoaded", () => {
+  const editor = document.getElementById("doc-content");
+  if (editor) editor.addEventListener("input", scheduleAutosave);
+});
+
 async function createNewDocument() {
   const username = document.getElementById("login-username").value.trim();
   if (!username) return;
@@ -0,0 +1,55 @@
+import sys
+import os
+from types import SimpleNamespace
+import mongomock
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import database
+from gesture_matcher import ANGLE_LABELS
+
+# Angles of a recorded peace sign, in ANGLE_LABELS order: the gesture template
+# tests register users with unless they need a particular one
+TEMPLATE = [161.44, 133.85, 152.81, 70.18, 148.49, 69.31, 168.76, 40.95, 177.22, 47.28]
+
+def registration(username, angles=TEMPLATE):
+    """/register request body for `username` with `angles` as the template"""
+    return {'username': username, 'gesture_name': 'peace_sign', 'angle_data': dict(zip(ANGLE_LABELS, angles))}
+
+# mongomock 4.x predates the `sort` option that newer pymongo passes when
+# building UpdateOne/ReplaceOne bulk operations; accept and ignore it.
+_add_update = mongomock.collection.BulkOperationBuilder.add_update
+_add_replace = mongomock.collection.BulkOperationBuilder.add_replace
+mongomock.collection.BulkOperationBuilder.add_update = \
+    lambda self, *args, sort=None, **kwargs: _add_update(self, *args, **kwargs)
+mongomock.collection.BulkOperationBuilder.add_replace = \
+    lambda self, *args, sort=None, **kwargs: _add_replace(self, *args, **kwargs)
+
+# mongomock has no time-series collections; create a plain one instead
+_create_collection = mongomock.database.Database.create_collection
+mongomock.database.Database.create_collection = \
+    lambda self, name, timeseries=None, **kwargs: _create_collection(self, name, **kwargs)
+
+@pytest.fixture
+def mock_mongo(monkeypatch):
+    """Point the database module at an in-memory mongomock stand-in"""
+    client = mongomock.MongoClient()
+    stand_in = SimpleNamespace(db=client.gesture_auth, cx=client)
+    monkeypatch.setattr(database, 'mongo', stand_in)
+    database.clear_caches()
+    yield stand_in
+    # Write queued log entries while the stand-in is still in place
+    database.auth_log_writer.flush()
+    database.access_log_writer.flush()
+    database.clear_caches()
+
+@pytest.fixture
+def registered_user(mock_mongo):
+    """Register users through the Flask app: registered_user(username, angles=TEMPLATE) -> user_id"""
+    from app import app
+    client = app.test_client()
+
+    def register(username, angles=TEMPLATE):
+        response = client.post('/register', json=registration(username, angles))
+        assert response.status_code == 200
+        return response.get_json()['user_id']
+    return register
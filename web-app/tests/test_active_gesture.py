@@ -0,0 +1,51 @@
+import database
+from bson.objectid import ObjectId
+from app import app
+from gesture_matcher import ANGLE_LABELS
+from conftest import TEMPLATE as peace
+fist = [90.0, 80.0, 60.0, 50.0, 60.0, 50.0, 60.0, 50.0, 60.0, 50.0]
+
+def login(client, username, angles):
+    return client.post('/login', json={'username': username,
+                                       'angle_data': dict(zip(ANGLE_LABELS, angles))}).status_code
+
+def test_login_reads_only_the_user_document(mock_mongo, registered_user):
+    client = app.test_client()
+    registered_user('embedded')
+    user = mock_mongo.db.users.find_one({'username': 'embedded'})
+    assert user['active_gesture']['_id'] == user['gesture_password_id']
+    assert len(user['active_gesture']['gesture_data']['angle_vector']) == 40
+
+    # Without the gesture_passwords collection the user lookup alone is enough
+    mock_mongo.db.gesture_passwords.drop()
+    database.clear_caches()
+    assert login(client, 'embedded', peace) == 200
+    assert login(client, 'embedded', fist) == 401
+
+def test_rotation_switches_the_active_password(mock_mongo, registered_user):
+    client = app.test_client()
+    user_id = registered_user('rotator')
+    new_id = database.create_gesture_password(user_id, 'fist', angle_data=fist)
+    assert login(client, 'rotator', fist) == 200
+    assert login(client, 'rotator', peace) == 401
+    assert mock_mongo.db.gesture_passwords.count_documents({'user_id': ObjectId(user_id), 'active': True}) == 1
+    assert database.get_user_gesture_password(user_id)['_id'] == new_id
+
+def test_separate_layout_and_backfill(mock_mongo, registered_user, monkeypatch):
+    monkeypatch.setattr(database, 'GESTURE_TEMPLATE_LAYOUT', 'separate')
+    client = app.test_client()
+    registered_user('separate')
+    assert 'active_gesture' not in mock_mongo.db.users.find_one({'username': 'separate'})
+    assert login(client, 'separate', peace) == 200
+
+    # Legacy dict template, then switch to the embedded layout and backfill
+    user_id = database.create_user('legacy', 'legacy@example.com')
+    mock_mongo.db.gesture_passwords.insert_one({
+        'user_id': user_id, 'active': True,
+        'gesture_data': {'storage_type': 'angles', 'confidence_threshold': 0.85,
+                         'angle_data': dict(zip(ANGLE_LABELS, fist))}
+    })
+    monkeypatch.setattr(database, 'GESTURE_TEMPLATE_LAYOUT', 'embedded')
+    assert database.migrate_active_gestures() == 2
+    assert mock_mongo.db.users.count_documents({'active_gesture': {'$exists': True}}) == 2
+    assert login(client, 'legacy', fist) == 200
@@ -0,0 +1,100 @@
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from angle_relay import AngleRelay
+
+class FakeStream:
+    """Minimal stand-in for a streaming requests.Response"""
+    def __init__(self, lines, release):
+        self.lines = lines
+        self.release = release
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self):
+        for line in self.lines:
+            yield line
+        # Hold the connection open like a real event stream
+        self.release.wait(1)
+        yield b": keep-alive"
+
+class FakeSession:
+    def __init__(self, lines):
+        self.lines = lines
+        self.connections = 0
+        self.release = threading.Event()
+
+    def get(self, url, stream=False, timeout=None):
+        self.connections += 1
+        return FakeStream(self.lines, self.release)
+
+def test_relay_fans_out_single_upstream_connection():
+    session = FakeSession([b'id: 1', b'data: {"seq": 1}', b''])
+    relay = AngleRelay('http://ml/hand-angles/stream', session=session, keepalive=1)
+
+    first = relay.subscribe()
+    second = relay.subscribe()
+    assert next(first) == b'data: {"seq": 1}\n\n'
+    assert next(second) == b'data: {"seq": 1}\n\n'
+    assert session.connections == 1
+
+    first.close()
+    second.close()
+    session.release.set()
+    assert relay.subscribers == 0
+
+def test_relay_pushes_only_new_events():
+    relay = AngleRelay('http://unused', session=FakeSession([]), keepalive=0.01)
+    relay.publish(b'{"seq": 5}')
+    subscriber = relay.subscribe()
+    assert next(subscriber) == b'data: {"seq": 5}\n\n'
+    assert next(subscriber) == b': keep-alive\n\n'
+    relay.publish(b'{"seq": 6}')
+    assert next(subscriber) == b'data: {"seq": 6}\n\n'
+    subscriber.close()
+
+def test_async_subscriber_receives_events_on_its_event_loop():
+    import asyncio
+    relay = AngleRelay('http://unused', session=FakeSession([]), keepalive=0.05)
+    relay.publish(b'{"seq": 1}')
+
+    async def scenario():
+        subscriber = relay.subscribe_async()
+        assert await subscriber.__anext__() == b'data: {"seq": 1}\n\n'
+        assert await subscriber.__anext__() == b': keep-alive\n\n'
+        # Published from another thread, as the upstream reader does
+        threading.Thread(target=relay.publish, args=(b'{"seq": 2}',)).start()
+        assert await subscriber.__anext__() == b'data: {"seq": 2}\n\n'
+        await subscriber.aclose()
+
+    asyncio.run(scenario())
+    assert relay.subscribers == 0 and not relay._listeners
+
+class BrokenSession:
+    """Raises a non-requests error on the first connection, then streams normally"""
+    def __init__(self):
+        self.inner = FakeSession([b'data: {"seq": 9}'])
+        self.calls = 0
+
+    def get(self, url, stream=False, timeout=None):
+        self.calls += 1
+        if self.calls == 1:
+            raise RuntimeError("decoder blew up")
+        return self.inner.get(url, stream, timeout)
+
+def test_relay_survives_unexpected_reader_errors():
+    session = BrokenSession()
+    relay = AngleRelay('http://ml/hand-angles/stream', session=session, keepalive=1, reconnect_delay=0.01)
+    subscriber = relay.subscribe()
+    assert next(subscriber) == b'data: {"seq": 9}\n\n'
+    assert session.calls == 2
+    subscriber.close()
+    session.inner.release.set()
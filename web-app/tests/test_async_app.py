@@ -0,0 +1,115 @@
+import asyncio
+import pytest
+
+pytest.importorskip('quart')
+httpx = pytest.importorskip('httpx')
+mongomock_motor = pytest.importorskip('mongomock_motor')
+
+import async_app
+import async_database
+from async_upstream import AsyncUpstreamClient
+from gesture_matcher import ANGLE_LABELS
+from conftest import TEMPLATE as template, registration
+
+@pytest.fixture
+def motor_db(mock_mongo, monkeypatch):
+    """Motor view of the mock_mongo data, as init() shares one client between drivers"""
+    db = mongomock_motor.AsyncMongoMockClient(mock_mongo_client=mock_mongo.cx).gesture_auth
+    monkeypatch.setattr(async_database, 'db', db)
+    return db
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+def test_register_and_login(motor_db):
+    async def scenario():
+        client = async_app.app.test_client()
+        response = await client.post('/register', json=registration('async_user'))
+        assert response.status_code == 200
+        response = await client.post('/login', json={'username': 'async_user',
+                                                     'angle_frames': [template] * 5})
+        assert response.status_code == 200
+        assert (await response.get_json())['frames'] == 5
+
+        response = await client.post('/login', json={'username': 'async_user',
+                                                     'angle_data': {label: 0.0 for label in ANGLE_LABELS}})
+        assert response.status_code == 401
+    run(scenario())
+
+def test_identify(motor_db, registered_user):
+    registered_user('async_kiosk')
+    async def scenario():
+        client = async_app.app.test_client()
+        response = await client.post('/identify', json={'angle_frames': [template] * 3})
+        assert (await response.get_json())['username'] == 'async_kiosk'
+    run(scenario())
+
+def test_user_data(motor_db):
+    async def scenario():
+        client = async_app.app.test_client()
+        assert (await client.post('/register', json=registration('listed'))).status_code == 200
+        response = await client.get('/data')
+        assert response.status_code == 200
+        user, = await response.get_json()
+        assert user['username'] == 'listed' and isinstance(user['_id'], str)
+        assert user['active_gesture']['_id'] == {'$oid': user['gesture_password_id']}
+    run(scenario())
+
+def test_bulk_import(motor_db, monkeypatch):
+    monkeypatch.setenv('IMPORT_TOKEN', 'secret')
+    async def scenario():
+        client = async_app.app.test_client()
+        body = 'username,gesture_name,angles\nimported,wave,' + ' '.join(map(str, template))
+        response = await client.post('/users/import', data=body,
+                                     headers={'Content-Type': 'text/csv', 'X-Import-Token': 'secret'})
+        assert (await response.get_json())['imported'] == 1
+        response = await client.post('/login', json={'username': 'imported', 'angle_frames': [template]})
+        assert response.status_code == 200
+    run(scenario())
+
+def test_document_routes(motor_db, registered_user):
+    registered_user('async_writer')
+    async def scenario():
+        client = async_app.app.test_client()
+        response = await client.post('/documents?username=async_writer',
+                                     json={'title': 'Notes', 'content': 'v1'})
+        doc_id = (await response.get_json())['document_id']
+
+        response = await client.put(f'/documents/{doc_id}?username=async_writer', json={'content': 'v2'})
+        assert (await response.get_json())['revision'] == 1
+        response = await client.patch(f'/documents/{doc_id}?username=async_writer',
+                                      json={'base_revision': 0, 'ops': []})
+        assert response.status_code == 409
+        response = await client.patch(f'/documents/{doc_id}?username=async_writer',
+                                      json={'base_revision': 1, 'ops': [{'start': 1, 'end': 2, 'text': '3'}]})
+        assert (await response.get_json())['revision'] == 2
+        response = await client.get(f'/documents/{doc_id}?username=async_writer')
+        assert (await response.get_json())['content'] == 'v3'
+        response = await client.get(f'/documents/{doc_id}?username=async_writer',
+                                    headers={'If-None-Match': response.headers['ETag']})
+        assert response.status_code == 304
+        response = await client.get('/documents?username=async_writer')
+        assert [d['title'] for d in (await response.get_json())['documents']] == ['Notes']
+        response = await client.get('/documents')
+        assert response.status_code == 401
+    run(scenario())
+
+def test_health(motor_db):
+    async def scenario():
+        response = await async_app.app.test_client().get('/health')
+        assert response.status_code == 200
+        assert 'pool' in await response.get_json()
+    run(scenario())
+
+def test_hand_angles_proxy(monkeypatch):
+    def ml_client(request):
+        return httpx.Response(200, content=b'{"seq": 7}', headers={'X-Frame-Seq': '7'})
+
+    async def scenario():
+        monkeypatch.setattr(async_app, 'ml_client', AsyncUpstreamClient(
+            'http://ml', transport=httpx.MockTransport(ml_client)))
+        response = await async_app.app.test_client().get('/api/hand-angles')
+        assert response.status_code == 200
+        assert response.headers['X-Frame-Seq'] == '7'
+        assert await response.get_data() == b'{"seq": 7}'
+    run(scenario())
@@ -0,0 +1,89 @@
+import asyncio
+import json
+import pytest
+
+httpx = pytest.importorskip('httpx')
+from async_upstream import AsyncUpstreamClient
+
+class FakeMLClient:
+    """httpx transport serving /hand-angles with seq-based ETags"""
+    def __init__(self, delay=0.0):
+        self.seq = 1
+        self.requests = 0
+        self.delay = delay
+
+    async def __call__(self, request):
+        self.requests += 1
+        await asyncio.sleep(self.delay)
+        etag = f'"{self.seq}"'
+        if request.headers.get('If-None-Match') == etag:
+            return httpx.Response(304, headers={'ETag': etag, 'X-Frame-Seq': str(self.seq)})
+        body = json.dumps({'seq': self.seq, 'angles': [1.0] * 10}).encode()
+        return httpx.Response(200, content=body, headers={'ETag': etag, 'X-Frame-Seq': str(self.seq)})
+
+def make_client(fake, ttl=60.0):
+    return AsyncUpstreamClient('http://ml', ttl=ttl, transport=httpx.MockTransport(fake))
+
+def test_cached_within_ttl_and_revalidated_after():
+    async def scenario():
+        fake = FakeMLClient()
+        client = make_client(fake, ttl=0.0)
+        body, seq = await client.get_hand_angles()
+        assert seq == '1' and json.loads(body)['seq'] == 1
+        # Unchanged frame: 304 keeps the cached body
+        assert await client.get_hand_angles() == (body, '1')
+        assert client.get_metrics()['upstream_not_modified'] == 1
+        await client.aclose()
+    asyncio.run(scenario())
+
+def test_concurrent_misses_share_one_fetch():
+    async def scenario():
+        fake = FakeMLClient(delay=0.05)
+        client = make_client(fake)
+        results = await asyncio.gather(*(client.get_hand_angles() for _ in range(20)))
+        assert fake.requests == 1
+        assert len(set(results)) == 1
+        assert client.get_metrics()['coalesced'] == 19
+        await client.aclose()
+    asyncio.run(scenario())
+
+def test_errors_reach_every_waiter():
+    async def failing(request):
+        await asyncio.sleep(0.01)
+        raise httpx.ConnectError('down')
+
+    async def scenario():
+        client = make_client(failing)
+        results = await asyncio.gather(*(client.get_hand_angles() for _ in range(3)),
+                                       return_exceptions=True)
+        assert all(isinstance(r, httpx.ConnectError) for r in results)
+        assert client.get_metrics()['upstream_errors'] == 1
+        await client.aclose()
+    asyncio.run(scenario())
+
+def test_waiters_are_released_when_the_leader_is_cancelled():
+    async def scenario():
+        client = make_client(FakeMLClient(delay=10.0))
+        leader = asyncio.ensure_future(client.get_hand_angles())
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(client.get_hand_angles())
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(httpx.RequestError):
+            await asyncio.wait_for(follower, 1.0)
+        assert client._flight is None
+        await client.aclose()
+    asyncio.run(scenario())
+
+def test_waiters_time_out_on_a_slow_fetch():
+    async def scenario():
+        client = make_client(FakeMLClient(delay=10.0))
+        client.timeout = 0.05
+        leader = asyncio.ensure_future(client.get_hand_angles())
+        await asyncio.sleep(0.01)
+        with pytest.raises(httpx.TimeoutException):
+            await client.get_hand_angles()
+        leader.cancel()
+        await asyncio.gather(leader, return_exceptions=True)
+        await client.aclose()
+    asyncio.run(scenario())
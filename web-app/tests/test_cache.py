@@ -0,0 +1,48 @@
+import time
+import database
+from database import (
+    TTLCache, create_user, get_user_by_username,
+    create_gesture_password, get_user_gesture_password, verify_gesture
+)
+
+angles = {
+    "Thumb MCP→IP": 161.44, "Thumb IP→Tip": 133.85,
+    "Index MCP→PIP": 152.81, "Index PIP→DIP": 70.18,
+    "Middle MCP→PIP": 148.49, "Middle PIP→DIP": 69.31,
+    "Ring MCP→PIP": 168.76, "Ring PIP→DIP": 40.95,
+    "Pinky MCP→PIP": 177.22, "Pinky PIP→DIP": 47.28
+}
+
+def test_ttl_cache_evicts_lru_and_expires():
+    cache = TTLCache(maxsize=2, ttl=0.05)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b', None) is None
+    assert cache.get('a') == 1
+    time.sleep(0.06)
+    assert cache.get('a', None) is None
+
+def test_login_lookups_hit_cache(mock_mongo):
+    user_id = create_user('cached_user', 'cached@example.com')
+    create_gesture_password(user_id, 'wave', angle_data=angles)
+
+    get_user_by_username('cached_user')
+    verify_gesture(user_id, angles)
+    # Remove the backing data: repeated lookups must not touch MongoDB
+    mock_mongo.db.users.delete_many({})
+    mock_mongo.db.gesture_passwords.delete_many({})
+
+    assert get_user_by_username('cached_user')['_id'] == user_id
+    assert verify_gesture(user_id, angles)[0]
+
+def test_writes_invalidate_cached_entries(mock_mongo):
+    assert get_user_by_username('late_user') is None
+    user_id = create_user('late_user', 'late@example.com')
+    assert get_user_by_username('late_user')['_id'] == user_id
+
+    assert get_user_gesture_password(user_id) is None
+    gesture_id = create_gesture_password(user_id, 'fist', angle_data=angles)
+    assert get_user_gesture_password(user_id)['_id'] == gesture_id
+    assert get_user_by_username('late_user')['gesture_password_id'] == gesture_id
@@ -0,0 +1,54 @@
+import time
+from flask import Flask
+from pymongo import WriteConcern
+from pymongo.monitoring import (
+    ConnectionCreatedEvent, ConnectionCheckOutStartedEvent, ConnectionCheckedOutEvent,
+    ConnectionCheckedInEvent, ConnectionCheckOutFailedEvent, ConnectionCheckOutFailedReason
+)
+import database
+from app import app
+from db_config import client_options, write_concern, PoolMonitor
+
+def test_client_options_from_environment():
+    options = client_options({'MONGO_MAX_POOL_SIZE': '20', 'MONGO_COMPRESSORS': 'zstd,zlib',
+                              'MONGO_SERVER_SELECTION_TIMEOUT_MS': '1500'})
+    assert options['maxPoolSize'] == 20 and options['compressors'] == 'zstd,zlib'
+    assert options['serverSelectionTimeoutMS'] == 1500 and options['connect'] is False
+    assert 'socketTimeoutMS' not in options
+
+def test_write_concern_per_kind():
+    assert write_concern('users', {}).document['w'] == 'majority'
+    assert write_concern('logs', {'MONGO_WRITE_CONCERN_LOGS': '0'}) == WriteConcern(w=0)
+    assert write_concern('documents', {}).document['w'] == 1
+
+def test_init_app_does_not_connect(monkeypatch):
+    monkeypatch.setenv('MONGODB_URI', 'mongodb://unreachable.invalid:27017/gesture_auth')
+    monkeypatch.setattr(database, 'mongo', None)
+    started = time.perf_counter()
+    mongo = database.init_app(Flask(__name__))
+    assert time.perf_counter() - started < 1.0
+    assert mongo.db.name == 'gesture_auth'
+    mongo.cx.close()
+
+def test_pool_monitor_counts_checkouts():
+    monitor = PoolMonitor()
+    address = ('db', 27017)
+    monitor.connection_created(ConnectionCreatedEvent(address, 1))
+    monitor.connection_check_out_started(ConnectionCheckOutStartedEvent(address))
+    monitor.connection_checked_out(ConnectionCheckedOutEvent(address, 1, 0.004))
+    stats = monitor.snapshot()
+    assert (stats['open'], stats['in_use'], stats['waiting']) == (1, 1, 0)
+    assert abs(stats['checkout_wait_ms_max'] - 4.0) < 1e-9
+    monitor.connection_checked_in(ConnectionCheckedInEvent(address, 1))
+    monitor.connection_check_out_started(ConnectionCheckOutStartedEvent(address))
+    monitor.connection_check_out_failed(ConnectionCheckOutFailedEvent(
+        address, ConnectionCheckOutFailedReason.TIMEOUT, 1.0))
+    stats = monitor.snapshot()
+    assert (stats['in_use'], stats['waiting'], stats['checkout_failures']) == (0, 0, 1)
+
+def test_health_endpoint(mock_mongo):
+    response = app.test_client().get('/health')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['status'] == 'ok' and body['mongo']['status'] == 'ok'
+    assert 'in_use' in body['pool'] and 'pending' in body['log_writers']['authentication_logs']
@@ -0,0 +1,81 @@
+from datetime import datetime
+from werkzeug.http import http_date
+import database
+from app import app
+from response_cache import list_response
+
+def make_document(client, register, username, content='v1'):
+    register(username)
+    response = client.post(f'/documents?username={username}', json={'title': 'Cached', 'content': content})
+    return response.get_json()['document_id']
+
+def test_repeated_reads_come_from_cache_and_revalidate(mock_mongo, registered_user):
+    client = app.test_client()
+    doc_id = make_document(client, registered_user, 'reader')
+    url = f'/documents/{doc_id}?username=reader'
+
+    first = client.get(url)
+    etag, last_modified = first.headers['ETag'], first.headers['Last-Modified']
+    assert first.get_json()['content'] == 'v1'
+    assert first.headers['Cache-Control'] == 'private, no-cache'
+
+    # Served without touching MongoDB
+    mock_mongo.db.documents.update_one({}, {'$set': {'content': 'changed behind our back'}})
+    assert client.get(url).get_data() == first.get_data()
+
+    not_modified = client.get(url, headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304 and not_modified.get_data() == b''
+    assert not_modified.headers['ETag'] == etag
+    assert client.get(url, headers={'If-None-Match': f'"other", W/{etag}'}).status_code == 304
+    assert client.get(url, headers={'If-Modified-Since': last_modified}).status_code == 304
+    assert client.get(url, headers={'If-Modified-Since': http_date(0)}).status_code == 200
+
+def test_saves_invalidate_cached_responses(mock_mongo, registered_user):
+    client = app.test_client()
+    doc_id = make_document(client, registered_user, 'writer')
+    url = f'/documents/{doc_id}?username=writer'
+    etag = client.get(url).headers['ETag']
+    list_etag = client.get('/documents?username=writer').headers['ETag']
+    assert client.get('/documents?username=writer', headers={'If-None-Match': list_etag}).status_code == 304
+
+    client.put(url, json={'content': 'v2'})
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200 and response.get_json()['content'] == 'v2'
+    assert response.headers['ETag'] != etag
+
+    client.patch(url, json={'base_revision': 1, 'ops': [{'start': 1, 'end': 2, 'text': '3'}]})
+    assert client.get(url).get_json()['content'] == 'v3'
+    assert client.get('/documents?username=writer', headers={'If-None-Match': list_etag}).status_code == 200
+
+    client.post('/documents?username=writer', json={'title': 'Second'})
+    titles = [doc['title'] for doc in client.get('/documents?username=writer').get_json()['documents']]
+    assert titles == ['Second', 'Cached']
+
+def test_read_racing_a_save_is_not_cached(mock_mongo):
+    epoch = database.document_cache_epoch('u1')
+    database.invalidate_document_responses('u1', 'd1')
+    database.cache_document_response(('u1', 'list', 20, None), epoch, list_response('u1', '{}'))
+    assert database.document_response_cache.stats()['size'] == 0
+
+    database.cache_document_response(('u1', 'list', 20, None), epoch + 1, list_response('u1', '{}'))
+    assert database.document_response_cache.stats()['size'] == 1
+
+def test_saves_by_other_workers_are_seen_when_revalidating(mock_mongo, registered_user, monkeypatch):
+    monkeypatch.setattr(database, 'documents_shared', True)
+    client = app.test_client()
+    doc_id = make_document(client, registered_user, 'shared')
+    url = f'/documents/{doc_id}?username=shared'
+    etag = client.get(url).headers['ETag']
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+    client.get('/documents?username=shared')
+
+    # Another worker saves: this process's cache is not invalidated
+    document = mock_mongo.db.documents.find_one()
+    mock_mongo.db.documents.update_one({'_id': document['_id']}, {
+        '$set': {'content': 'from worker B', 'updated_at': datetime.utcnow()}, '$inc': {'revision': 1}})
+    mock_mongo.db.documents.insert_one(dict(document, _id=database.ObjectId(), title='New',
+                                            updated_at=datetime.utcnow()))
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200 and response.get_json()['revision'] == 1
+    titles = [doc['title'] for doc in client.get('/documents?username=shared').get_json()['documents']]
+    assert titles == ['New', 'Cached']
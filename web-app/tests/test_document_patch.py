@@ -0,0 +1,21 @@
+import pytest
+from document_patch import apply_patch, diff_text
+
+@pytest.mark.parametrize('old,new', [
+    ('', 'hello'), ('hello', ''), ('hello world', 'hello brave world'),
+    ('aaaa', 'aa'), ('abc', 'abc'), ('naïve 👋 text', 'naïve 👋👋 text')
+])
+def test_diff_round_trips(old, new):
+    assert apply_patch(old, diff_text(old, new)) == new
+
+def test_ops_apply_in_order():
+    ops = [{'start': 0, 'end': 5, 'text': 'Goodbye'}, {'start': 7, 'end': 7, 'text': ','}]
+    assert apply_patch('Hello world', ops) == 'Goodbye, world'
+
+@pytest.mark.parametrize('ops', [
+    None, [{'start': 3, 'end': 2, 'text': ''}], [{'start': 0, 'end': 99, 'text': ''}],
+    [{'start': '0', 'end': 1}], [{'start': 0, 'end': 1, 'text': 5}], ['0:1']
+])
+def test_invalid_patches_are_rejected(ops):
+    with pytest.raises(ValueError):
+        apply_patch('abc', ops)
@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta
+from bson.objectid import ObjectId
+import database
+from app import app
+
+def test_listing_pages_newest_first_without_content(mock_mongo, registered_user):
+    client = app.test_client()
+    registered_user('pager')
+    for i in range(5):
+        client.post('/documents?username=pager', json={'title': f'Doc {i}', 'content': 'x' * 1000})
+    # Give two documents the same timestamp to exercise the _id tie-break
+    same = datetime(2030, 1, 1)
+    docs = list(mock_mongo.db.documents.find().sort('_id', 1))
+    for doc, updated_at in zip(docs, [same, same, same - timedelta(days=1),
+                                      same - timedelta(days=2), same - timedelta(days=3)]):
+        mock_mongo.db.documents.update_one({'_id': doc['_id']}, {'$set': {'updated_at': updated_at}})
+
+    seen, cursor = [], None
+    while True:
+        url = '/documents?username=pager&limit=2' + (f'&cursor={cursor}' if cursor else '')
+        page = client.get(url).get_json()
+        assert len(page['documents']) <= 2
+        assert all(set(doc) == {'id', 'title', 'created_at', 'updated_at'} for doc in page['documents'])
+        seen += [doc['title'] for doc in page['documents']]
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    assert seen == ['Doc 1', 'Doc 0', 'Doc 2', 'Doc 3', 'Doc 4']
+
+def test_listing_defaults_and_bad_cursor(registered_user):
+    client = app.test_client()
+    registered_user('lister')
+    assert client.get('/documents?username=lister').get_json() == {'documents': [], 'next_cursor': None}
+    client.post('/documents?username=lister', json={'title': 'Only'})
+    page = client.get('/documents?username=lister').get_json()
+    assert [doc['title'] for doc in page['documents']] == ['Only'] and page['next_cursor'] is None
+    assert client.get('/documents?username=lister&cursor=nonsense').status_code == 400
+    huge = f'99999999999999999999999.{ObjectId()}'
+    assert client.get(f'/documents?username=lister&cursor={huge}').status_code == 400
+    assert client.get(f'/documents?username=lister&cursor=-99999999999999.{ObjectId()}').status_code == 400
+    assert client.get('/documents?username=lister&limit=abc').status_code == 400
+
+def test_edits_go_to_access_log_collection(mock_mongo, registered_user):
+    client = app.test_client()
+    user_id = registered_user('editor')
+    doc_id = client.post('/documents?username=editor', json={'title': 'Log'}).get_json()['document_id']
+    for i in range(3):
+        assert client.put(f'/documents/{doc_id}?username=editor', json={'content': f'v{i}'}).status_code == 200
+    database.access_log_writer.flush()
+
+    stored = mock_mongo.db.documents.find_one()
+    assert 'access_logs' not in stored
+    assert 'documents' not in mock_mongo.db.users.find_one()
+    logs = client.get(f'/documents/{doc_id}/access-logs?username=editor').get_json()['access_logs']
+    assert [log['access_type'] for log in logs] == ['edit'] * 3
+    assert mock_mongo.db.document_access_logs.find_one()['meta']['user_id'] == ObjectId(user_id)
+
+    registered_user('stranger')
+    assert client.put(f'/documents/{doc_id}?username=stranger', json={'content': 'x'}).status_code == 404
+    assert client.get(f'/documents/{doc_id}/access-logs?username=stranger').status_code == 404
+
+def test_migrate_embedded_access_logs(mock_mongo):
+    user_id = ObjectId()
+    mock_mongo.db.users.insert_one({'_id': user_id, 'username': 'legacy',
+                                    'documents': [{'title': 'Old'}]})
+    for count in (0, 2, 5):
+        mock_mongo.db.documents.insert_one({
+            'user_id': user_id, 'title': f'{count} edits', 'content': '',
+            'access_logs': [{'timestamp': datetime(2024, 1, 1, 0, i), 'access_type': 'edit',
+                             'gesture_confidence': 1.0} for i in range(count)]
+        })
+
+    assert database.migrate_document_access_logs(batch_size=2) == (3, 7, 1)
+    assert mock_mongo.db.documents.count_documents({'access_logs': {'$exists': True}}) == 0
+    assert mock_mongo.db.users.count_documents({'documents': {'$exists': True}}) == 0
+    assert mock_mongo.db.document_access_logs.count_documents({}) == 7
+    # Nothing left to move on a second run
+    assert database.migrate_document_access_logs() == (0, 0, 0)
+
+def test_migration_creates_the_time_series_collection(mock_mongo, monkeypatch):
+    created = []
+    create_collection = mock_mongo.db.create_collection
+    monkeypatch.setattr(mock_mongo.db, 'create_collection',
+                        lambda name, **kwargs: created.append((name, kwargs)) or create_collection(name, **kwargs))
+    database.migrate_document_access_logs()
+    database.migrate_document_access_logs()
+    assert created == [('document_access_logs', {'timeseries': database.DOCUMENT_ACCESS_LOG_TIMESERIES})]
+    index_keys = [index['key'] for index in mock_mongo.db.document_access_logs.index_information().values()]
+    assert [('meta.document_id', 1), ('timestamp', -1)] in index_keys
+
+def test_patch_updates_with_revision_check(mock_mongo, registered_user):
+    client = app.test_client()
+    registered_user('patcher')
+    doc_id = client.post('/documents?username=patcher',
+                         json={'title': 'Draft', 'content': 'Hello world'}).get_json()['document_id']
+    url = f'/documents/{doc_id}?username=patcher'
+    assert client.get(url).get_json()['revision'] == 0
+
+    response = client.patch(url, json={'base_revision': 0,
+                                       'ops': [{'start': 5, 'end': 5, 'text': ', brave'}]})
+    assert response.status_code == 200 and response.get_json()['revision'] == 1
+    assert client.get(url).get_json()['content'] == 'Hello, brave world'
+
+    # A second editor still on revision 0 is refused, not merged over
+    stale = client.patch(url, json={'base_revision': 0, 'ops': [{'start': 0, 'end': 5, 'text': 'Bye'}]})
+    assert stale.status_code == 409 and stale.get_json()['revision'] == 1
+    assert client.put(url, json={'content': 'x', 'base_revision': 0}).status_code == 409
+    assert client.patch(url, json={'base_revision': 1,
+                                   'ops': [{'start': 0, 'end': 99, 'text': ''}]}).status_code == 400
+    assert client.patch(url, json={'ops': []}).status_code == 400
+
+    # Full-content PUT still works and moves the revision on
+    assert client.put(url, json={'content': 'Rewritten'}).get_json()['revision'] == 2
+    revisions = list(mock_mongo.db.document_revisions.find().sort('revision', 1))
+    assert [r['revision'] for r in revisions] == [1, 2]
+    assert 'content' not in revisions[0] and revisions[0]['ops'][0]['text'] == ', brave'
+
+def test_patch_legacy_document_without_revision(mock_mongo, registered_user):
+    client = app.test_client()
+    user_id = registered_user('legacy_editor')
+    doc_id = mock_mongo.db.documents.insert_one({
+        'user_id': ObjectId(user_id), 'title': 'Old', 'content': 'abc',
+        'created_at': datetime(2024, 1, 1), 'updated_at': datetime(2024, 1, 1)
+    }).inserted_id
+    response = client.patch(f'/documents/{doc_id}?username=legacy_editor',
+                            json={'base_revision': 0, 'ops': [{'start': 3, 'end': 3, 'text': 'd'}]})
+    assert response.get_json()['revision'] == 1
+    assert mock_mongo.db.documents.find_one({'_id': doc_id})['content'] == 'abcd'
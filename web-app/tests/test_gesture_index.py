@@ -0,0 +1,54 @@
+import numpy as np
+from gesture_index import GestureIndex
+
+def clustered_templates(count, seed=0):
+    rng = np.random.default_rng(seed)
+    prototypes = rng.uniform(30, 180, (20, 10))
+    return (prototypes[rng.integers(0, 20, count)] + rng.normal(0, 8, (count, 10))).astype(np.float32)
+
+def test_ivf_search_agrees_with_brute_force():
+    templates = clustered_templates(3000)
+    index = GestureIndex(nprobe=4, min_train=500)
+    index.build((f'user{i}', vector) for i, vector in enumerate(templates))
+    rng = np.random.default_rng(1)
+    for i in rng.integers(0, len(templates), 50):
+        query = templates[i] + rng.normal(0, 2, 10)
+        assert index.search(query, 1)[0][0] == index.search_exact(query, 1)[0][0]
+    results = index.search(templates[7], 5)
+    assert results[0] == ('user7', 1.0)
+    assert [c for _, c in results] == sorted((c for _, c in results), reverse=True)
+
+def test_add_replace_and_remove_after_training():
+    index = GestureIndex(min_train=100)
+    index.build((f'user{i}', vector) for i, vector in enumerate(clustered_templates(200)))
+    target = np.full(10, 90.0)
+    index.add('new', target)
+    assert index.search(target, 1)[0][0] == 'new'
+    index.add('new', target + 40)  # Re-registration replaces the old template
+    assert index.search(target + 40, 1)[0][0] == 'new'
+    assert len(index) == 201
+    index.remove('new')
+    assert all(user != 'new' for user, _ in index.search_exact(target + 40, 10))
+
+def test_remove_with_template_id_only_drops_that_template():
+    index = GestureIndex()
+    index.build([('user', [90.0] * 10, 'old')])
+    index.add('user', [45.0] * 10, 'new')
+    index.remove('user', 'old')
+    assert index.search([45.0] * 10, 1)[0][0] == 'user'
+    index.remove('user', 'new')
+    assert len(index) == 0
+
+def test_distance_wraps_around():
+    index = GestureIndex()
+    index.add('near', [359.0] * 10)
+    index.add('far', [300.0] * 10)
+    (user, confidence), _ = index.search([1.0] * 10, 2)
+    assert user == 'near' and confidence > 0.9
+
+def test_trains_once_enough_templates_are_added():
+    index = GestureIndex(min_train=50)
+    for i, vector in enumerate(clustered_templates(60)):
+        index.add(f'user{i}', vector)
+    assert index._centroids is not None
+    assert index.search(clustered_templates(60)[3], 1)[0][0] == 'user3'
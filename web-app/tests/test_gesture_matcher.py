@@ -0,0 +1,61 @@
+import numpy as np
+from bson.objectid import ObjectId
+from gesture_matcher import ANGLE_LABELS, angles_to_vector, score_samples
+from database import (
+    verify_gesture_angles, verify_gesture_samples, verify_gesture,
+    migrate_gesture_templates, create_user
+)
+
+stored = dict(zip(ANGLE_LABELS, [161.44, 133.85, 152.81, 70.18, 148.49,
+                                 69.31, 168.76, 40.95, 177.22, 47.28]))
+similar = dict(zip(ANGLE_LABELS, [165.23, 137.64, 155.32, 73.45, 150.11,
+                                  71.95, 170.32, 43.18, 175.45, 45.89]))
+different = dict(zip(ANGLE_LABELS, [100.44, 83.85, 102.81, 130.18, 98.49,
+                                    129.31, 108.76, 110.95, 117.22, 127.28]))
+
+def legacy_confidence(stored_angles, current_angles):
+    """The original per-label loop, kept as a reference implementation"""
+    diffs = []
+    for name, value in stored_angles.items():
+        if name in current_angles:
+            diff = abs(value - float(current_angles[name]))
+            diffs.append(360.0 - diff if diff > 180.0 else diff)
+    return min(1.0, max(0.0, 1.0 - (sum(diffs) / len(diffs)) / 45.0))
+
+def test_matches_legacy_scores():
+    for sample in (stored, similar, different, {"Thumb MCP→IP": 350.0}):
+        success, confidence = verify_gesture_angles(stored, sample, 0.85)
+        assert np.isclose(confidence, legacy_confidence(stored, sample), atol=1e-4)
+        assert isinstance(success, bool)
+    assert verify_gesture_angles(stored, {}, 0.85) == (False, 0.0)
+
+def test_batch_scoring_in_one_call():
+    successes, confidences = verify_gesture_samples(stored, [stored, similar, different], 0.85)
+    assert successes.tolist() == [True, True, False]
+    assert confidences.shape == (3,)
+
+def test_weights_and_tolerance():
+    template = angles_to_vector(stored)
+    sample = template.copy()
+    sample[0] += 30.0
+    weights = np.ones(10)
+    weights[0] = 0.0
+    assert score_samples(template, sample, 0.99, weights=weights)[1] == 1.0
+    assert score_samples(template, sample, 0.99, tolerance=30.0)[1] == 1.0
+    assert score_samples(template, sample, 0.99)[1] < 1.0
+
+def test_migration_converts_dict_templates(mock_mongo):
+    user_id = create_user('legacy_user', 'legacy@example.com')
+    mock_mongo.db.gesture_passwords.insert_one({
+        'user_id': ObjectId(user_id),
+        'gesture_data': {'storage_type': 'angles', 'angle_data': stored,
+                         'confidence_threshold': 0.85},
+        'active': True
+    })
+    assert verify_gesture(user_id, similar)[0]
+    assert migrate_gesture_templates() == 1
+    doc = mock_mongo.db.gesture_passwords.find_one({'user_id': ObjectId(user_id)})
+    assert 'angle_data' not in doc['gesture_data']
+    assert len(doc['gesture_data']['angle_vector']) == 40
+    assert verify_gesture(user_id, similar)[0]
+    assert not verify_gesture(user_id, different)[0]
@@ -0,0 +1,75 @@
+import time
+import numpy as np
+import database
+from app import app
+from gesture_matcher import ANGLE_LABELS
+from conftest import TEMPLATE
+
+templates = {
+    'peace': TEMPLATE,
+    'fist': [90.0, 80.0, 60.0, 50.0, 60.0, 50.0, 60.0, 50.0, 60.0, 50.0],
+}
+
+def test_identify_without_username(registered_user):
+    client = app.test_client()
+    registered_user('peace_user', templates['peace'])
+    response = client.post('/identify', json={'angle_data': dict(zip(ANGLE_LABELS, templates['fist']))})
+    assert response.status_code == 401
+
+    # Registered after the index was built: picked up incrementally
+    registered_user('fist_user', templates['fist'])
+    sample = dict(zip(ANGLE_LABELS, np.array(templates['fist']) + 2.0))
+    response = client.post('/identify', json={'angle_data': sample})
+    assert response.status_code == 200
+    assert response.get_json()['username'] == 'fist_user'
+
+    frames = (np.array(templates['peace']) + np.random.default_rng(0).normal(0, 2, (5, 10))).tolist()
+    response = client.post('/identify', json={'angle_frames': frames})
+    assert response.get_json()['username'] == 'peace_user'
+    assert client.post('/identify', json={}).status_code == 400
+
+def test_identical_templates_are_ambiguous(registered_user):
+    client = app.test_client()
+    registered_user('twin1', templates['peace'])
+    registered_user('twin2', templates['peace'])
+    response = client.post('/identify', json={'angle_data': dict(zip(ANGLE_LABELS, templates['peace']))})
+    assert response.status_code == 401
+
+def test_index_is_built_from_existing_templates(registered_user):
+    registered_user('stored_user', templates['fist'])
+    database.reset_gesture_index()
+    assert database.load_gesture_index() == 1
+    user_id, confidence = database.identify_gesture(dict(zip(ANGLE_LABELS, templates['fist'])))
+    assert database.get_user_by_id(user_id)['username'] == 'stored_user' and confidence == 1.0
+
+def test_stale_index_picks_up_other_processes_templates(mock_mongo, registered_user, monkeypatch):
+    registered_user('local_user', templates['peace'])
+    database.ensure_gesture_index()
+    # Another worker registers someone; this process never sees the write
+    gesture_data = database.build_gesture_data('kiosk', dict(zip(ANGLE_LABELS, templates['fist'])))
+    mock_mongo.db.gesture_passwords.insert_one(
+        {'user_id': database.ObjectId(), 'gesture_data': gesture_data, 'active': True})
+    assert len(database.gesture_index) == 1
+
+    monkeypatch.setattr(database, 'GESTURE_INDEX_TTL', 0.0)
+    database.ensure_gesture_index()
+    deadline = time.monotonic() + 5
+    while len(database.gesture_index) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(database.gesture_index) == 2
+
+def test_late_deactivation_of_old_password_keeps_new_one(mock_mongo, registered_user):
+    registered_user('rotator', templates['peace'])
+    database.ensure_gesture_index()
+    old = mock_mongo.db.gesture_passwords.find_one({'active': True})
+    user_id = old['user_id']
+    new_id = database.create_gesture_password(user_id, 'kiosk', dict(zip(ANGLE_LABELS, templates['fist'])))
+
+    # Change stream order: the new template's insert, then the old one going inactive
+    new = mock_mongo.db.gesture_passwords.find_one({'_id': new_id})
+    database.index_gesture_template(user_id, new['gesture_data'], True, new_id)
+    database.index_gesture_template(user_id, old['gesture_data'], False, old['_id'])
+    assert database.gesture_index.search(templates['fist'], 1)[0][0] == str(user_id)
+
+    database.index_gesture_template(user_id, new['gesture_data'], False, new_id)
+    assert len(database.gesture_index) == 0
@@ -0,0 +1,76 @@
+import mongomock
+from bson.objectid import ObjectId
+from log_writer import BatchLogWriter
+from database import auth_log_writer, log_authentication
+
+def make_writer(collection, **kwargs):
+    return BatchLogWriter(lambda: collection, **kwargs)
+
+def test_writes_are_batched_with_insert_many():
+    collection = mongomock.MongoClient().db.logs
+    writer = make_writer(collection, batch_size=10, flush_interval=60)
+    for i in range(25):
+        writer.write({'n': i})
+    assert writer.flush()
+    assert collection.count_documents({}) == 25
+    stats = writer.stats()
+    assert stats['written'] == 25 and stats['batches'] == 3
+    writer.close()
+
+def test_overflow_policies_bound_memory():
+    for policy, kept in (('drop_oldest', [2, 3]), ('drop_newest', [0, 1])):
+        collection = mongomock.MongoClient().db.logs
+        # The buffer stays full: it is below batch_size and the interval is long
+        writer = make_writer(collection, batch_size=100, flush_interval=60,
+                             max_pending=2, overflow=policy)
+        for i in range(4):
+            writer.write({'n': i})
+        assert writer.stats()['dropped'] == 2 and writer.stats()['pending'] == 2
+        writer.close()
+        assert [doc['n'] for doc in collection.find()] == kept
+
+def test_write_after_close_goes_straight_to_the_collection():
+    collection = mongomock.MongoClient().db.logs
+    writer = make_writer(collection)
+    writer.close()
+    assert writer.write({'n': 1})
+    assert collection.count_documents({}) == 1
+
+def test_close_flushes_pending_documents():
+    collection = mongomock.MongoClient().db.logs
+    writer = make_writer(collection, batch_size=100, flush_interval=60)
+    writer.write({'n': 1})
+    writer.close()
+    assert collection.count_documents({}) == 1
+
+def test_log_authentication_returns_before_write(mock_mongo):
+    log_id = log_authentication(ObjectId(), True, 0.97, '127.0.0.1', 'pytest')
+    assert isinstance(log_id, ObjectId)
+    assert auth_log_writer.flush()
+    assert mock_mongo.db.authentication_logs.find_one({'_id': log_id})['success']
+
+class FlakyCollection:
+    """Fails the first `failures` insert_many calls, then records documents"""
+    def __init__(self, failures):
+        self.failures = failures
+        self.documents = []
+
+    def insert_many(self, documents, ordered=True):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("server unavailable")
+        self.documents += documents
+
+def test_failed_batches_are_retried():
+    collection = FlakyCollection(failures=2)
+    writer = make_writer(collection, flush_interval=60, retries=2, retry_delay=0.01)
+    writer.write({'n': 1})
+    assert writer.flush()
+    assert collection.documents == [{'n': 1}]
+    assert writer.stats()['failed'] == 0
+
+    collection.failures = 3
+    writer.write({'n': 2})
+    writer.flush()
+    assert writer.stats()['failed'] == 1
+    writer.close()
@@ -0,0 +1,46 @@
+import numpy as np
+from app import app, ml_client
+from conftest import TEMPLATE as template
+
+def jittery_frames(count, noise, seed=0):
+    rng = np.random.default_rng(seed)
+    return (np.array(template) + rng.normal(0, noise, (count, 10))).tolist()
+
+def test_login_with_frame_window_tolerates_outliers(registered_user):
+    client = app.test_client()
+    registered_user('window_user')
+    frames = jittery_frames(9, noise=2.0)
+    frames[0] = [0.0] * 10  # one badly tracked frame
+    frames.append([None] * 10)  # and one without a hand
+    response = client.post('/login', json={'username': 'window_user', 'angle_frames': frames})
+    assert response.status_code == 200
+    assert response.get_json()['frames'] == 10
+
+def test_login_with_frame_window_rejects_wrong_gesture(registered_user):
+    client = app.test_client()
+    registered_user('window_user2')
+    frames = (np.array(jittery_frames(5, noise=2.0)) - 60.0).tolist()
+    response = client.post('/login', json={'username': 'window_user2', 'angle_frames': frames,
+                                           'aggregate': 'trimmed_mean'})
+    assert response.status_code == 401
+
+def test_login_pulls_live_frames_from_ml_client(registered_user, monkeypatch):
+    client = app.test_client()
+    registered_user('live_user')
+    requested = []
+    def fake_recent(k, consume=False):
+        requested.append((k, consume))
+        return jittery_frames(k, noise=1.0)
+    monkeypatch.setattr(ml_client, 'get_recent_frames', fake_recent)
+    response = client.post('/login', json={'username': 'live_user', 'live_frames': 500})
+    assert response.status_code == 200
+    assert requested == [(30, True)]
+
+def test_login_refuses_too_few_fresh_live_frames(registered_user, monkeypatch):
+    client = app.test_client()
+    registered_user('stale_user')
+    # The ML client drops frames older than its maximum age, so stale windows come back short
+    monkeypatch.setattr(ml_client, 'get_recent_frames', lambda k, consume=False: [])
+    response = client.post('/login', json={'username': 'stale_user', 'live_frames': 5})
+    assert response.status_code == 409
+    assert response.get_json()['frames'] == 0
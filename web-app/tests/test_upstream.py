@@ -0,0 +1,57 @@
+import sys
+import os
+import time
+import threading
+from types import SimpleNamespace
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from upstream import UpstreamClient
+
+class FakeSession:
+    """Answers like the ML client: 304 when If-None-Match matches the current seq"""
+    def __init__(self, delay=0.0):
+        self.seq = 1
+        self.calls = 0
+        self.delay = delay
+
+    def get(self, url, headers=None, timeout=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        etag = f'"{self.seq}"'
+        status = 304 if (headers or {}).get('If-None-Match') == etag else 200
+        body = b'' if status == 304 else b'{"seq": %d}' % self.seq
+        return SimpleNamespace(status_code=status, content=body,
+                               headers={'X-Frame-Seq': str(self.seq)},
+                               raise_for_status=lambda: None)
+
+def make_client(ttl, delay=0.0):
+    client = UpstreamClient('http://ml', ttl=ttl)
+    client.session = FakeSession(delay)
+    return client
+
+def test_requests_within_ttl_are_served_from_cache():
+    client = make_client(ttl=60)
+    assert client.get_hand_angles() == (b'{"seq": 1}', '1')
+    assert client.get_hand_angles() == (b'{"seq": 1}', '1')
+    assert client.session.calls == 1
+    assert client.get_metrics()['cache_hits'] == 1
+
+def test_expired_entry_is_revalidated_by_frame_seq():
+    client = make_client(ttl=0)
+    client.get_hand_angles()
+    assert client.get_hand_angles() == (b'{"seq": 1}', '1')
+    assert client.get_metrics()['upstream_not_modified'] == 1
+    client.session.seq = 2
+    assert client.get_hand_angles() == (b'{"seq": 2}', '2')
+
+def test_concurrent_misses_share_one_upstream_fetch():
+    client = make_client(ttl=60, delay=0.05)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.get_hand_angles()))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 8
+    assert client.session.calls == 1
+    assert client.get_metrics()['hit_rate'] > 0.8
@@ -0,0 +1,101 @@
+import io
+import json
+import database
+from app import app
+from gesture_matcher import ANGLE_LABELS
+from user_import import parse_rows
+from conftest import TEMPLATE as template
+
+def ndjson(rows):
+    return '\n'.join(row if isinstance(row, str) else json.dumps(row) for row in rows)
+
+def test_import_ndjson_reports_row_errors(mock_mongo, registered_user, monkeypatch):
+    monkeypatch.setenv('IMPORT_TOKEN', 'secret')
+    mock_mongo.db.users.create_index('username', unique=True)
+    client = app.test_client()
+    registered_user('existing')
+    body = ndjson([
+        {'username': 'alice', 'gesture_name': 'peace', 'angle_data': dict(zip(ANGLE_LABELS, template))},
+        {'username': 'bob', 'gesture_name': 'peace', 'angle_data': template, 'tolerance': 2},
+        '{not json',
+        {'username': 'carol', 'gesture_name': 'peace'},
+        {'username': 'existing', 'gesture_name': 'peace', 'angle_data': template},
+        {'username': 'alice', 'gesture_name': 'again', 'angle_data': template},
+        {'username': 'dave', 'gesture_name': 'peace', 'angle_data': [1.0, 2.0]},
+    ])
+    response = client.post('/users/import', data=body, content_type='application/x-ndjson',
+                           headers={'X-Import-Token': 'secret'})
+    report = response.get_json()
+    assert report['imported'] == 2 and report['failed'] == 5
+    assert [error['line'] for error in report['errors']] == [3, 4, 5, 6, 7]
+    assert report['rows_per_s'] > 0
+
+    bob = mock_mongo.db.users.find_one({'username': 'bob'})
+    gesture = mock_mongo.db.gesture_passwords.find_one({'_id': bob['gesture_password_id']})
+    assert gesture['user_id'] == bob['_id'] and gesture['gesture_data']['tolerance'] == 2.0
+    # Imported users can log in straight away
+    response = client.post('/login', json={'username': 'alice', 'angle_frames': [template] * 3})
+    assert response.status_code == 200
+
+def test_import_rejects_bad_joint_weights(mock_mongo):
+    rows = enumerate([
+        {'username': 'short', 'gesture_name': 'peace', 'angle_data': template, 'joint_weights': [1, 2, 3]},
+        {'username': 'negative', 'gesture_name': 'peace', 'angle_data': template,
+         'joint_weights': [1.0] * 9 + [-1.0]},
+        {'username': 'infinite', 'gesture_name': 'peace', 'angle_data': template,
+         'joint_weights': [1.0] * 9 + [float('inf')]},
+        {'username': 'weighted', 'gesture_name': 'peace', 'angle_data': template, 'joint_weights': [2.0] * 10},
+    ], start=1)
+    report = database.import_users(rows)
+    assert report['imported'] == 1 and report['failed'] == 3
+    assert [error['username'] for error in report['errors']] == ['short', 'negative', 'infinite']
+    assert 'joint_weights' in report['errors'][0]['error']
+    # The imported row still logs in
+    response = app.test_client().post('/login', json={'username': 'weighted', 'angle_frames': [template] * 3})
+    assert response.status_code == 200
+
+def test_import_rejects_bad_tolerance(mock_mongo):
+    rows = enumerate([
+        {'username': 'locked', 'gesture_name': 'peace', 'angle_data': template, 'tolerance': -500},
+        {'username': 'nan', 'gesture_name': 'peace', 'angle_data': template, 'tolerance': 'nan'},
+    ], start=1)
+    report = database.import_users(rows)
+    assert report['imported'] == 0 and report['failed'] == 2
+    assert all('tolerance' in error['error'] for error in report['errors'])
+    assert mock_mongo.db.users.count_documents({}) == 0
+
+def test_import_csv_in_batches(mock_mongo):
+    lines = ['username,gesture_name,angles,confidence_threshold']
+    lines += [f'user{i},wave,{" ".join(map(str, template))},0.9' for i in range(25)]
+    lines.append('broken,wave,1 2 x,0.9')
+    report = database.import_users(parse_rows(io.StringIO('\n'.join(lines), newline=''), 'csv'),
+                                   batch_size=10)
+    assert report['imported'] == 25 and report['errors'][0]['line'] == 27
+    assert mock_mongo.db.gesture_passwords.count_documents({'gesture_data.confidence_threshold': 0.9}) == 25
+
+def test_import_csv_with_joint_columns():
+    header = ','.join(['username', 'gesture_name'] + list(ANGLE_LABELS))
+    row = ','.join(['erin', 'fist'] + [str(v) for v in template])
+    (_, parsed), = parse_rows(io.StringIO(f'{header}\n{row}\n', newline=''), 'csv')
+    assert parsed['angle_data'] == dict(zip(ANGLE_LABELS, template))
+
+def test_import_token(mock_mongo, monkeypatch):
+    client = app.test_client()
+    # Disabled until a token is configured
+    assert client.post('/users/import', data='').status_code == 404
+    monkeypatch.setenv('IMPORT_TOKEN', 'secret')
+    assert client.post('/users/import', data='').status_code == 403
+    assert client.post('/users/import', data='', headers={'X-Import-Token': 'secreT'}).status_code == 403
+    response = client.post('/users/import?format=ndjson', data='', headers={'X-Import-Token': 'secret'})
+    assert response.get_json()['imported'] == 0
+
+def test_invalid_utf8_line_is_a_row_error(mock_mongo, monkeypatch):
+    monkeypatch.setenv('IMPORT_TOKEN', 'secret')
+    rows = [json.dumps({'username': name, 'gesture_name': 'wave', 'angle_data': template}).encode()
+            for name in ('first', 'second')]
+    body = rows[0] + b'\n{"username": "\xff"}\n' + rows[1]
+    response = app.test_client().post('/users/import?format=ndjson', data=body,
+                                      headers={'X-Import-Token': 'secret'})
+    report = response.get_json()
+    assert report['imported'] == 2
+    assert report['errors'] == [{'line': 2, 'username': None, 'error': 'Line is not valid UTF-8'}]
@@ -0,0 +1,158 @@
+"""
+Keep-alive client for the ML client's /hand-angles endpoint.
+
+- One pooled requests.Session, so proxied requests reuse TCP connections.
+- A micro-cache holding the last response body together with the ML client's
+  frame sequence number. Within the TTL (about one frame period) requests are
+  answered from memory; after that the entry is revalidated with
+  If-None-Match, so an unchanged frame costs an empty 304 instead of a body.
+- Concurrent cache misses are coalesced into a single upstream fetch.
+"""
+
+import time
+from threading import Event, Lock
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class _Flight:
+    """One upstream fetch that several waiting requests share"""
+
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.error = None
+
+
+class UpstreamClient:
+    """Pooled, cached and coalescing client for the ML client's angle API"""
+
+    def __init__(self, base_url, ttl=1 / 30, timeout=1, pool_size=10):
+        self.base_url = base_url.rstrip("/")
+        self.ttl = ttl
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = Lock()
+        self._cached = None  # (fetched_at, seq, body)
+        self._flight = None
+
+        self._stats = {
+            "requests": 0,
+            "cache_hits": 0,
+            "coalesced": 0,
+            "upstream_fetches": 0,
+            "upstream_not_modified": 0,
+            "upstream_errors": 0,
+            "upstream_latency_total": 0.0,
+            "upstream_latency_max": 0.0,
+        }
+
+    def get_hand_angles(self):
+        """
+        Return (body, seq) for the newest angle snapshot.
+
+        body is the raw JSON bytes served by the ML client. Raises
+        requests.exceptions.RequestException if the ML client is unreachable.
+        """
+        with self._lock:
+            self._stats["requests"] += 1
+            cached = self._cached
+            if cached is not None and time.monotonic() - cached[0] < self.ttl:
+                self._stats["cache_hits"] += 1
+                return cached[2], cached[1]
+
+            flight = self._flight
+            leader = flight is None
+            if leader:
+                flight = self._flight = _Flight()
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            flight.done.wait(self.timeout * 2)
+            if flight.error is not None:
+                raise flight.error
+            if flight.result is None:
+                raise requests.exceptions.Timeout("Timed out waiting for ML client")
+            return flight.result
+
+        try:
+            flight.result = self._fetch(cached)
+            return flight.result
+        except requests.exceptions.RequestException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flight = None
+            flight.done.set()
+
+    def get_recent_frames(self, k, consume=False):
+        """
+        Return the angle lists of up to `k` fresh frames with a visible hand.
+
+        Not cached: each login window needs the frames current at that moment.
+        consume=True empties the ML client's window so they are used only once.
+        """
+        params = {"k": k, "consume": "1"} if consume else {"k": k}
+        response = self.session.get(
+            f"{self.base_url}/hand-angles/recent", params=params, timeout=self.timeout
+        )
+        response.raise_for_status()
+        return [frame["angles"] for frame in response.json()["frames"]]
+
+    def _fetch(self, cached):
+        headers = {}
+        if cached is not None:
+            headers["If-None-Match"] = f'"{cached[1]}"'
+
+        started = time.perf_counter()
+        try:
+            response = self.session.get(
+                f"{self.base_url}/hand-angles", headers=headers, timeout=self.timeout
+            )
+            response.raise_for_status()
+        except requests.exceptions.RequestException:
+            with self._lock:
+                self._stats["upstream_errors"] += 1
+            raise
+        latency = time.perf_counter() - started
+
+        if response.status_code == 304 and cached is not None:
+            seq, body = cached[1], cached[2]
+        else:
+            seq, body = response.headers.get("X-Frame-Seq"), response.content
+
+        with self._lock:
+            self._cached = (time.monotonic(), seq, body)
+            self._stats["upstream_fetches"] += 1
+            if response.status_code == 304:
+                self._stats["upstream_not_modified"] += 1
+            self._stats["upstream_latency_total"] += latency
+            self._stats["upstream_latency_max"] = max(
+                self._stats["upstream_latency_max"], latency
+            )
+        return body, seq
+
+    def get_metrics(self):
+        """Hit rate and upstream latency figures (latencies in ms)"""
+        with self._lock:
+            stats = dict(self._stats)
+        fetches = stats.pop("upstream_fetches")
+        total = stats.pop("upstream_latency_total")
+        stats["upstream_fetches"] = fetches
+        stats["hit_rate"] = (
+            (stats["cache_hits"] + stats["coalesced"]) / stats["requests"]
+            if stats["requests"]
+            else 0.0
+        )
+        stats["upstream_latency_avg_ms"] = total / fetches * 1000.0 if fetches else 0.0
+        stats["upstream_latency_max_ms"] = stats.pop("upstream_latency_max") * 1000.0
+        stats["ttl_ms"] = self.ttl * 1000.0
+        return stats
@@ -0,0 +1,104 @@
+"""
+Row parsing for bulk user imports (POST /users/import and import_users.py).
+
+NDJSON: one object per line with username, gesture_name and angle_data (a
+dict keyed by joint label or a list of 10 angles), plus optional email,
+confidence_threshold, joint_weights and tolerance.
+
+CSV: a header row naming username, gesture_name and the optional email,
+confidence_threshold and tolerance columns. The angles come either from one
+column per joint label (as in ANGLE_LABELS) or from an `angles` column of 10
+space-separated values. An optional `joint_weights` column takes 10
+space-separated values as well.
+
+Both parsers yield (line number, row) pairs. A line that cannot be parsed
+yields a ValueError instead of a row, so that it can be reported with the
+rows that fail validation. parse_bytes() does the same for lines that are
+not valid UTF-8, so one bad line does not abort an import half-way.
+"""
+
+import csv
+import json
+
+from gesture_matcher import ANGLE_LABELS
+
+FORMATS = ('ndjson', 'csv')
+
+
+def parse_ndjson(lines):
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, ValueError(f"Invalid JSON: {e}")
+            continue
+        yield number, row if isinstance(row, dict) else ValueError("Row must be a JSON object")
+
+
+def parse_csv(lines):
+    reader = csv.DictReader(lines)
+    for row in reader:
+        try:
+            yield reader.line_num, csv_row(row)
+        except ValueError as e:
+            yield reader.line_num, e
+
+
+def csv_row(row):
+    """Convert one CSV record to the row format of parse_ndjson()"""
+    def values(text):
+        return [float(value) for value in text.replace(',', ' ').split()]
+
+    if row.get('angles'):
+        angle_data = values(row['angles'])
+    else:
+        angle_data = {label: float(row[label]) for label in ANGLE_LABELS if row.get(label)}
+    parsed = {
+        'username': (row.get('username') or '').strip(),
+        'email': (row.get('email') or '').strip() or None,
+        'gesture_name': (row.get('gesture_name') or '').strip(),
+        'angle_data': angle_data,
+    }
+    for column in ('confidence_threshold', 'tolerance'):
+        if row.get(column):
+            parsed[column] = float(row[column])
+    if row.get('joint_weights'):
+        parsed['joint_weights'] = values(row['joint_weights'])
+    return parsed
+
+
+def parse_rows(lines, fmt):
+    """Parse an iterable of text lines in one of FORMATS"""
+    if fmt == 'ndjson':
+        return parse_ndjson(lines)
+    if fmt == 'csv':
+        return parse_csv(lines)
+    raise ValueError(f"Unknown import format: {fmt}")
+
+
+def decode_lines(lines, invalid):
+    """
+    Decode UTF-8 byte lines. Lines that are not valid UTF-8 are decoded with
+    replacement characters and their (1-based) numbers added to `invalid`.
+    """
+    for number, line in enumerate(lines, 1):
+        try:
+            yield line.decode('utf-8')
+        except UnicodeDecodeError:
+            invalid.add(number)
+            yield line.decode('utf-8', errors='replace')
+
+
+def parse_bytes(lines, fmt):
+    """parse_rows() over byte lines; rows from lines that are not valid UTF-8 become ValueErrors"""
+    invalid = set()
+    for number, row in parse_rows(decode_lines(lines, invalid), fmt):
+        yield number, ValueError("Line is not valid UTF-8") if number in invalid else row
+
+
+def guess_format(name):
+    """Import format from a file name or Content-Type ('ndjson' unless it looks like CSV)"""
+    return 'csv' if name and ('csv' in name.lower()) else 'ndjson'